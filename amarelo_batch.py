@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Amarelo Mind - conversão e exportação em lote, sem interface gráfica.
+"""
+
+import sys
+import os
+
+# Plataforma offscreen: nenhuma janela é criada
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+if base_dir not in sys.path:
+    sys.path.insert(0, base_dir)
+
+from core.headless import main
+
+if __name__ == "__main__":
+    sys.exit(main())
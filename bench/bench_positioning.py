@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark da busca radial de posicionamento (core/positioning.py).
+
+Gera mapas sintéticos (árvores aleatórias de nós 200x100 ligados por linhas)
+com 100, 1.000 e 10.000 nós e mede o tempo de find_best_position_radial para
+fontes escolhidas ao acaso. Com --scalar, mede também a versão escalar
+anterior e informa em quantas consultas as duas escolhem a mesma posição
+(a versão vetorizada trata o próprio nó fonte como obstáculo, em vez dos
+seus itens filhos, então pequenas diferenças são esperadas).
+
+Uso:
+    python bench/bench_positioning.py [--sizes 100,1000,10000] [--queries 20] [--scalar]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QPointF
+from PySide6.QtGui import QPainterPath
+from PySide6.QtWidgets import QApplication, QGraphicsScene, QGraphicsRectItem, QGraphicsPathItem
+
+from core.positioning import find_best_position_radial, _find_best_position_radial_scalar
+
+NODE_W, NODE_H = 200, 100
+
+
+def build_scene(node_count, seed=0):
+    """Árvore aleatória espalhada em uma área proporcional ao número de nós."""
+    rng = random.Random(seed)
+    scene = QGraphicsScene(-100000, -100000, 200000, 200000)
+    side = math.sqrt(node_count) * 420
+    nodes = []
+    for i in range(node_count):
+        if nodes:
+            parent = nodes[rng.randrange(len(nodes))]
+            angle = rng.uniform(0, 2 * math.pi)
+            dist = rng.uniform(260, 520)
+            x = parent.x() + math.cos(angle) * dist
+            y = parent.y() + math.sin(angle) * dist
+            x = max(-side / 2, min(side / 2, x))
+            y = max(-side / 2, min(side / 2, y))
+        else:
+            parent, x, y = None, 0.0, 0.0
+        node = QGraphicsRectItem(0, 0, NODE_W, NODE_H)
+        node.setPos(x, y)
+        scene.addItem(node)
+        if parent is not None:
+            a = parent.sceneBoundingRect().center()
+            b = node.sceneBoundingRect().center()
+            path = QPainterPath(a)
+            path.lineTo(QPointF((a.x() + b.x()) / 2, a.y()))
+            path.lineTo(QPointF((a.x() + b.x()) / 2, b.y()))
+            path.lineTo(b)
+            scene.addItem(QGraphicsPathItem(path))
+        nodes.append(node)
+    return scene, nodes
+
+
+def time_queries(func, scene, sources):
+    results = []
+    started = time.perf_counter()
+    for source in sources:
+        results.append(func(source, scene))
+    return (time.perf_counter() - started) / len(sources), results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--scalar", action="store_true", help="compara com a versão escalar")
+    args = parser.parse_args(argv)
+
+    QApplication.instance() or QApplication([])
+    rng = random.Random(42)
+
+    print(f"{'nós':>7} {'vetorizado (ms)':>16} {'escalar (ms)':>13} {'ganho':>7} {'iguais':>7}")
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        scene, nodes = build_scene(size)
+        sources = [nodes[rng.randrange(len(nodes))] for _ in range(args.queries)]
+        # Aquece o índice espacial da cena
+        scene.items(scene.itemsBoundingRect())
+
+        vec_t, vec_res = time_queries(find_best_position_radial, scene, sources)
+        if args.scalar:
+            sca_t, sca_res = time_queries(_find_best_position_radial_scalar, scene, sources)
+            same = sum(1 for a, b in zip(vec_res, sca_res)
+                       if abs(a.x() - b.x()) < 1e-6 and abs(a.y() - b.y()) < 1e-6)
+            print(f"{size:>7} {vec_t * 1000:>16.2f} {sca_t * 1000:>13.2f} "
+                  f"{sca_t / vec_t:>6.1f}x {same:>3}/{len(sources)}")
+        else:
+            print(f"{size:>7} {vec_t * 1000:>16.2f} {'-':>13} {'-':>7} {'-':>7}")
+        scene.clear()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
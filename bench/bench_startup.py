@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização do aplicativo.
+
+Mede, em processos novos (QT_QPA_PLATFORM=offscreen):
+
+- o custo de `import main` com `python -X importtime`, listando os
+  módulos de maior tempo acumulado;
+- quais dependências pesadas foram carregadas na inicialização (devem
+  ficar para o primeiro uso: shapely, scipy, numpy, cv2, QtMultimedia,
+  sqlite3, urllib.request);
+- o tempo até a primeira janela: do primeiro import até o primeiro
+  ciclo do laço de eventos com AmareloMainWindow exibida (o tempo do
+  processo inteiro, com a partida do interpretador, é informado à parte).
+
+O alvo de tempo até a primeira janela fica em TARGET_FIRST_WINDOW_MS,
+para acompanhar entre versões. Com --check, sai com código 1 se o alvo
+for ultrapassado ou se alguma dependência pesada for importada cedo.
+
+Uso:
+    python bench/bench_startup.py [--runs 5] [--top 15] [--check]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Alvo de tempo até a primeira janela (mediana, em ms)
+TARGET_FIRST_WINDOW_MS = 1500
+
+# Módulos que não devem ser carregados antes do primeiro uso
+DEFERRED_MODULES = (
+    "shapely", "scipy", "numpy", "cv2",
+    "PySide6.QtMultimedia", "PySide6.QtMultimediaWidgets",
+    "sqlite3", "urllib.request",
+)
+
+# Executado em um processo novo; imprime uma linha JSON com os tempos
+_FIRST_WINDOW_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QApplication
+app = QApplication([])
+import main
+imported = time.perf_counter()
+window = main.AmareloMainWindow()
+window.show()
+deferred = sorted(m for m in {deferred!r} if m in sys.modules)
+
+def first_frame():
+    now = time.perf_counter()
+    print(json.dumps({{
+        "import_ms": (imported - started) * 1000,
+        "window_ms": (now - imported) * 1000,
+        "deferred_loaded": deferred,
+    }}))
+    app.quit()
+
+QTimer.singleShot(0, first_frame)
+app.exec()
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def import_times():
+    """
+    Roda `python -X importtime -c "import main"`.
+
+    Returns:
+        list: (módulo, self_us, cumulativo_us), na ordem do relatório
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "falha no import")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            # Após o separador vem um espaço e a indentação do aninhamento
+            rows.append((name.rstrip()[1:], int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+def first_window():
+    """Um processo novo até a primeira janela; tempos em ms."""
+    code = _FIRST_WINDOW_PROBE.format(root=ROOT, deferred=DEFERRED_MODULES)
+    launched = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT, env=_env(), capture_output=True, text=True,
+    )
+    total_ms = (time.perf_counter() - launched) * 1000
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("{"):
+            result = json.loads(line)
+    if result is None:
+        raise RuntimeError(proc.stderr.strip() or "a janela não foi exibida")
+    # Inclui a partida do interpretador e o encerramento do processo
+    result["process_ms"] = total_ms
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="módulos listados do -X importtime")
+    parser.add_argument("--check", action="store_true", help="falha se o alvo não for atingido")
+    args = parser.parse_args(argv)
+
+    rows = import_times()
+    top_level = [r for r in rows if not r[0].startswith(" ")]
+    main_row = next((r for r in top_level if r[0] == "main"), None)
+    print("import main (-X importtime):")
+    if main_row is not None:
+        print(f"  total acumulado: {main_row[2] / 1000:.1f} ms")
+    print(f"  {'módulo':<40} {'self (ms)':>10} {'acum. (ms)':>11}")
+    for name, self_us, cumulative_us in sorted(top_level, key=lambda r: -r[2])[:args.top]:
+        print(f"  {name:<40} {self_us / 1000:>10.1f} {cumulative_us / 1000:>11.1f}")
+
+    runs = [first_window() for _ in range(max(1, args.runs))]
+    first_ms = [r["import_ms"] + r["window_ms"] for r in runs]
+    median = statistics.median(first_ms)
+    deferred_loaded = runs[0]["deferred_loaded"]
+    print()
+    print(f"primeira janela ({len(runs)} execuções):")
+    print(f"  import (ms):   {statistics.median(r['import_ms'] for r in runs):>8.1f}")
+    print(f"  janela (ms):   {statistics.median(r['window_ms'] for r in runs):>8.1f}")
+    print(f"  total (ms):    {median:>8.1f}   alvo: {TARGET_FIRST_WINDOW_MS} ms")
+    print(f"  processo (ms): {statistics.median(r['process_ms'] for r in runs):>8.1f}")
+    if deferred_loaded:
+        print(f"  carregados cedo: {', '.join(deferred_loaded)}")
+
+    if args.check and (median > TARGET_FIRST_WINDOW_MS or deferred_loaded):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
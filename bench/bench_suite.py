@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Suíte de benchmarks com mapas sintéticos (bench/generate_map.py).
+
+Para cada tamanho de mapa, gera o .amind e roda um processo novo
+(QT_QPA_PLATFORM=offscreen) com a janela principal, medindo:
+
+- load_generated_ms: carregar o arquivo gerado (+ media_ms para as imagens)
+- save_ms / load_ms: salvar o mapa e recarregar o arquivo salvo (HTML completo)
+- drag_step_ms / drag_step_p95_ms: um passo de arrasto com reroteamento
+- drag_release_ms: rotas pendentes recalculadas ao soltar
+- placement_ms: find_best_position_radial para fontes sorteadas
+- search_index_ms / search_ms: montar o índice de busca e uma consulta
+- export_png_ms: exportação PNG em tiles (escala EXPORT_SCALE)
+- peak_rss_mb: pico de memória do processo (None onde não há resource)
+
+O resultado sai em JSON (--output), com o commit, as versões e os
+parâmetros; --compare compara com um resultado anterior e sai com código
+1 se alguma métrica piorar mais que --tolerance.
+
+Uso:
+    python bench/bench_suite.py [--sizes 100,1000,5000] [--degree tree] [--words 6]
+        [--media 0.05] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_map import DEGREES, generate_map, write_map
+
+DEFAULT_SIZES = "100,1000,5000"
+DRAG_NODES = 5
+DRAG_STEPS = 30
+DRAG_STEP_PX = 5
+QUERIES = 20
+EXPORT_SCALE = 0.25
+
+# Métricas comparadas por --compare (menor é melhor)
+COMPARED = (
+    "load_generated_ms", "media_ms", "save_ms", "load_ms", "drag_step_ms", "drag_step_p95_ms",
+    "drag_release_ms", "placement_ms", "search_index_ms", "search_ms", "export_png_ms", "peak_rss_mb",
+)
+
+
+def _ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def _p95(values):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.95))] if values else 0.0
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB, macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(map_path, seed):
+    """Mede um mapa no processo atual; retorna o dicionário de resultados."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    app_module = importlib.import_module("main")
+    from core.app_context import get_app_context
+    from core.clipboard import build_subgraph
+    from core.connection import SmartConnection, get_route_scheduler
+    from core.export import TiledPngExporter
+    from core.positioning import find_best_position_radial
+    from core.search_index import search_index_for
+    from items.shapes import StyledNode
+
+    rng = random.Random(seed)
+    result = {}
+    window = app_module.AmareloMainWindow()
+    # O autosave gravaria por cima do mapa gerado durante as medições
+    get_app_context().autosave.enabled = False
+    scene = window.scene
+    workdir = tempfile.mkdtemp(prefix="amarelo-bench-")
+    try:
+        start = time.perf_counter()
+        if not window.load_file(map_path):
+            raise RuntimeError(f"falha ao carregar {map_path}")
+        result["load_generated_ms"] = _ms(start)
+
+        with open(map_path, encoding="utf-8") as f:
+            media = json.load(f).get("media", [])
+        start = time.perf_counter()
+        items, _ = build_subgraph({"media": media}, window.persistence)
+        for item in items:
+            scene.addItem(item)
+        result["media_ms"] = _ms(start)
+        app.processEvents()
+
+        nodes = [i for i in scene.items() if isinstance(i, StyledNode)]
+        connections = [i for i in scene.items() if isinstance(i, SmartConnection)]
+        result.update(nodes=len(nodes), connections=len(connections), media=len(items))
+
+        saved = os.path.join(workdir, "saved.amind")
+        start = time.perf_counter()
+        window.persistence.save_to_file(saved, scene)
+        result["save_ms"] = _ms(start)
+
+        # Arrasto: passos pequenos em nós que são destino de conexões
+        targets = list({id(c.target): c.target for c in connections if isinstance(c.target, StyledNode)}.values())
+        steps, releases = [], []
+        for node in rng.sample(targets, min(DRAG_NODES, len(targets))):
+            for _ in range(DRAG_STEPS):
+                start = time.perf_counter()
+                node.setPos(node.pos().x() + DRAG_STEP_PX, node.pos().y())
+                steps.append(_ms(start))
+            start = time.perf_counter()
+            get_route_scheduler().flush()
+            releases.append(_ms(start))
+        result["drag_step_ms"] = statistics.mean(steps) if steps else 0.0
+        result["drag_step_p95_ms"] = _p95(steps)
+        result["drag_release_ms"] = statistics.mean(releases) if releases else 0.0
+
+        sources = [rng.choice(nodes) for _ in range(QUERIES)] if nodes else []
+        start = time.perf_counter()
+        for source in sources:
+            find_best_position_radial(source, scene)
+        result["placement_ms"] = _ms(start) / len(sources) if sources else 0.0
+
+        start = time.perf_counter()
+        index = search_index_for(scene)
+        index.search("a")
+        result["search_index_ms"] = _ms(start)
+        words = [w for n in rng.sample(nodes, min(QUERIES, len(nodes))) for w in n.get_text().split()[:1]]
+        start = time.perf_counter()
+        for word in words:
+            index.search(word)
+        result["search_ms"] = _ms(start) / len(words) if words else 0.0
+
+        start = time.perf_counter()
+        TiledPngExporter(scene, scale=EXPORT_SCALE).export(os.path.join(workdir, "export.png"))
+        result["export_png_ms"] = _ms(start)
+
+        start = time.perf_counter()
+        window.load_file(saved)
+        result["load_ms"] = _ms(start)
+
+        result["peak_rss_mb"] = _peak_rss_mb()
+        return result
+    finally:
+        # Mapa salvo e PNG exportado não interessam depois da medição
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _meta():
+    try:
+        import PySide6
+        pyside = PySide6.__version__
+    except ImportError:
+        pyside = None
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pyside6": pyside,
+        "platform": platform.platform(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Imprime a razão atual/base por métrica; retorna as regressões."""
+    base_by_size = {r["size"]: r for r in baseline.get("results", [])}
+    regressions = []
+    print(f"comparando com {baseline.get('meta', {}).get('commit')} (tolerância {tolerance:.0%})")
+    for result in results:
+        base = base_by_size.get(result["size"])
+        if base is None:
+            continue
+        print(f"  {result['size']} nós:")
+        for key in COMPARED:
+            new, old = result.get(key), base.get(key)
+            if not new or not old:
+                continue
+            ratio = new / old
+            flag = ""
+            if ratio > 1 + tolerance:
+                flag = "  << regressão"
+                regressions.append((result["size"], key, ratio))
+            print(f"    {key:<20} {old:>10.2f} -> {new:>10.2f}  {ratio:5.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    parser.add_argument("--degree", choices=DEGREES, default="tree")
+    parser.add_argument("--extra-edges", type=float, default=0.2)
+    parser.add_argument("--words", type=int, default=6)
+    parser.add_argument("--media", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="arquivo JSON de resultados")
+    parser.add_argument("--compare", help="resultado anterior (JSON) para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="piora aceita (0.2 = 20%%)")
+    parser.add_argument("--worker", nargs=2, metavar=("MAPA", "SAIDA"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        map_path, out_path = args.worker
+        result = run_worker(map_path, args.seed)
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return 0
+
+    params = {
+        "degree": args.degree, "extra_edges": args.extra_edges, "words": args.words,
+        "media": args.media, "seed": args.seed, "export_scale": EXPORT_SCALE,
+        "drag_nodes": DRAG_NODES, "drag_steps": DRAG_STEPS, "queries": QUERIES,
+    }
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    results = []
+    with tempfile.TemporaryDirectory(prefix="amarelo-bench-") as tmp:
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            map_path = write_map(
+                os.path.join(tmp, f"map_{size}.amind"),
+                generate_map(size, args.degree, args.extra_edges, args.words, args.media, args.seed),
+            )
+            out_path = os.path.join(tmp, f"result_{size}.json")
+            # Um processo por mapa: pico de memória e caches independentes
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--seed", str(args.seed),
+                 "--worker", map_path, out_path],
+                cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"{size} nós: falhou\n{proc.stderr.strip()}", file=sys.stderr)
+                continue
+            with open(out_path, encoding="utf-8") as f:
+                result = dict(size=size, **json.load(f))
+            results.append(result)
+            print(f"{size:>7} nós  carregar {result['load_ms']:8.1f} ms  salvar {result['save_ms']:8.1f} ms  "
+                  f"arrasto {result['drag_step_ms']:6.2f} ms  posicionar {result['placement_ms']:6.2f} ms  "
+                  f"busca {result['search_ms']:6.3f} ms  png {result['export_png_ms']:8.1f} ms  "
+                  f"rss {result['peak_rss_mb'] or 0:7.1f} MB")
+
+    report = {"meta": _meta(), "params": params, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"resultados: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != params:
+            print("Aviso: parâmetros diferentes dos da base; a comparação pode não ser válida")
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
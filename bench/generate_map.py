@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Gerador de mapas sintéticos .amind para os benchmarks.
+
+Os mapas são reprodutíveis (mesma semente, mesmo arquivo) e configuráveis:
+
+- número de nós;
+- distribuição de graus: "tree" (árvore com pai sorteado uniformemente),
+  "powerlaw" (ligação preferencial: poucos nós com muitos filhos) ou
+  "random" (árvore + conexões extras entre nós sorteados, --extra-edges
+  por nó);
+- tamanho do texto (palavras por nó);
+- densidade de mídia (imagens por nó).
+
+O .amind guarda só nós e conexões; as imagens vão em uma lista "media"
+no esquema da área de transferência (core.clipboard), ignorada pelo
+carregamento normal e adicionada pelo bench_suite com build_subgraph.
+
+Uso:
+    python bench/generate_map.py saida.amind [--nodes 1000] [--degree tree]
+        [--extra-edges 0.2] [--words 6] [--media 0.05] [--seed 0]
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import random
+import sys
+
+NODE_W, NODE_H = 200, 100
+MEDIA_SIZE = 160
+DEGREES = ("tree", "powerlaw", "random")
+
+_SYLLABLES = ("ma", "pa", "ta", "ri", "lo", "ne", "su", "vi", "co", "de", "ção", "ar", "es", "mu", "bo")
+
+
+def _word(rng):
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 4)))
+
+
+def _text(rng, words):
+    count = max(1, int(rng.gauss(words, words / 3))) if words > 0 else 0
+    return " ".join(_word(rng) for _ in range(count))
+
+
+def _parents(rng, count, degree):
+    """Pai de cada nó (None para a raiz) segundo a distribuição de graus."""
+    parents = [None]
+    # Ligação preferencial: cada nó aparece uma vez por conexão que tem
+    weighted = [0]
+    for i in range(1, count):
+        if degree == "powerlaw":
+            parent = rng.choice(weighted)
+            weighted.extend((parent, i))
+        else:
+            parent = rng.randrange(i)
+        parents.append(parent)
+    return parents
+
+
+def _image_png(rng, size):
+    """PNG pequeno com cor sorteada, em base64 (como na área de transferência)."""
+    from PySide6.QtCore import QBuffer, QIODevice
+    from PySide6.QtGui import QColor, QImage
+
+    image = QImage(size, size, QImage.Format_RGB32)
+    image.fill(QColor.fromHsv(rng.randrange(360), 160, 220))
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    return base64.b64encode(bytes(buffer.data())).decode("ascii")
+
+
+def generate_map(nodes=1000, degree="tree", extra_edges=0.2, words=6, media=0.0, seed=0):
+    """
+    Gera os dados de um mapa sintético.
+
+    Returns:
+        dict: esquema .amind (nodes, connections) + lista "media"
+    """
+    if degree not in DEGREES:
+        raise ValueError(f"Distribuição desconhecida: {degree}")
+    rng = random.Random(seed)
+    side = math.sqrt(max(1, nodes)) * 420
+    parents = _parents(rng, nodes, degree)
+
+    positions = []
+    data = {"version": 1, "nodes": [], "connections": [], "media": []}
+    for i, parent in enumerate(parents):
+        if parent is None:
+            x, y = 0.0, 0.0
+        else:
+            px, py = positions[parent]
+            angle = rng.uniform(0, 2 * math.pi)
+            dist = rng.uniform(260, 520)
+            x = max(-side / 2, min(side / 2, px + math.cos(angle) * dist))
+            y = max(-side / 2, min(side / 2, py + math.sin(angle) * dist))
+            data["connections"].append({"source_id": parent + 1, "target_id": i + 1})
+        positions.append((x, y))
+        data["nodes"].append({
+            "id": i + 1, "x": x, "y": y, "w": NODE_W, "h": NODE_H,
+            "text": _text(rng, words), "type": "Normal", "shadow": True,
+            "custom_color": None,
+        })
+
+    if degree == "random" and nodes > 2:
+        linked = {(c["source_id"], c["target_id"]) for c in data["connections"]}
+        for _ in range(int(nodes * extra_edges)):
+            a, b = rng.sample(range(1, nodes + 1), 2)
+            if (a, b) not in linked and (b, a) not in linked:
+                linked.add((a, b))
+                data["connections"].append({"source_id": a, "target_id": b})
+
+    # Imagens perto de nós sorteados; o mesmo PNG é reutilizado por cor
+    palette = {}
+    for j in range(int(nodes * media)):
+        x, y = positions[rng.randrange(nodes)]
+        key = rng.randrange(8)
+        if key not in palette:
+            palette[key] = _image_png(rng, MEDIA_SIZE)
+        data["media"].append({
+            "id": nodes + j + 1, "kind": "image",
+            "x": x + rng.uniform(-300, 300), "y": y + rng.uniform(-300, 300),
+            "w": MEDIA_SIZE, "h": MEDIA_SIZE, "images": [palette[key]],
+        })
+    return data
+
+
+def write_map(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output")
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--degree", choices=DEGREES, default="tree")
+    parser.add_argument("--extra-edges", type=float, default=0.2, help="conexões extras por nó (random)")
+    parser.add_argument("--words", type=int, default=6, help="palavras por nó (média)")
+    parser.add_argument("--media", type=float, default=0.0, help="imagens por nó")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    data = generate_map(args.nodes, args.degree, args.extra_edges, args.words, args.media, args.seed)
+    write_map(args.output, data)
+    print(f"{args.output}: {len(data['nodes'])} nós, {len(data['connections'])} conexões, "
+          f"{len(data['media'])} imagens")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Recursos do processo compartilhados por todas as janelas.
+
+Cada janela (documento) mantém só o que é dela: cena, pilha de desfazer,
+PersistenceManager e índice de busca da cena. O resto vem do AppContext:
+
+- images: cache de imagens decodificadas (QImage por arquivo, QPixmap por
+  origem), limitado em bytes;
+- autosave: um único temporizador que grava apenas as janelas alteradas;
+- project_index(): uma conexão ao índice de projetos e no máximo uma
+  atualização em segundo plano por vez;
+- routes: o agendador de roteamento de conexões (core.connection);
+- windows: as janelas abertas, mantidas vivas enquanto não forem fechadas.
+
+Os ícones já são compartilhados pelo cache do IconManager e o QSS pela
+memoização de generate_qss.
+"""
+import os
+import time
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtGui import QImage, QPixmap
+
+from core.connection import get_route_scheduler
+
+# Intervalo sem alterações antes de gravar uma janela
+AUTOSAVE_MS = 2000
+
+# Memória máxima das imagens em cache (as em uso continuam vivas nos itens)
+IMAGE_CACHE_BYTES = 128 * 1024 * 1024
+
+
+class ImageCache:
+    """LRU de imagens por arquivo (caminho + mtime + tamanho) e pixmaps por origem."""
+
+    def __init__(self, max_bytes=IMAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # chave -> (QImage | QPixmap, bytes)
+        self._bytes = 0
+
+    @staticmethod
+    def _file_key(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return ("file", os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _put(self, key, value, size):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _key, (_value, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+
+    def load(self, path):
+        """QImage do arquivo; a mesma imagem (compartilhada pelo Qt) para o mesmo arquivo."""
+        key = self._file_key(path)
+        if key is None:
+            return QImage()
+        image = self._get(key)
+        if image is None:
+            image = QImage(path)
+            if image.isNull():
+                return image
+            self._put(key, image, image.sizeInBytes())
+        return image
+
+    def pixmap(self, image, source=""):
+        """QPixmap da imagem; com origem, reaproveitado entre itens e janelas."""
+        if image.isNull():
+            return QPixmap()
+        if not source:
+            return QPixmap.fromImage(image)
+        key = ("pixmap", source, image.cacheKey())
+        pix = self._get(key)
+        if pix is None:
+            pix = QPixmap.fromImage(image)
+            self._put(key, pix, image.sizeInBytes())
+        return pix
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    @property
+    def memory_cost(self):
+        return self._bytes
+
+
+class AutosaveScheduler(QObject):
+    """
+    Autosave de todas as janelas com um único temporizador.
+
+    mark_dirty(janela) agenda a gravação AUTOSAVE_MS após a última
+    alteração daquela janela; o temporizador só roda enquanto há alguma
+    gravação pendente.
+    """
+
+    def __init__(self, interval_ms=AUTOSAVE_MS, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.enabled = True
+        self._due = {}  # id(janela) -> (janela, instante em que grava)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def mark_dirty(self, window):
+        if not self.enabled:
+            return
+        self._due[id(window)] = (window, time.monotonic() + self.interval_ms / 1000)
+        self._schedule()
+
+    def discard(self, window):
+        self._due.pop(id(window), None)
+        self._schedule()
+
+    def flush(self, window):
+        """Grava já a janela, se houver gravação pendente (ex.: ao fechá-la)."""
+        entry = self._due.pop(id(window), None)
+        self._schedule()
+        if entry is not None:
+            window._autosave()
+
+    def pending(self):
+        return len(self._due)
+
+    def _schedule(self):
+        if not self._due:
+            self._timer.stop()
+            return
+        next_due = min(due for _window, due in self._due.values())
+        self._timer.start(max(0, int((next_due - time.monotonic()) * 1000)))
+
+    def _on_timeout(self):
+        now = time.monotonic()
+        for key, (window, due) in list(self._due.items()):
+            if due > now:
+                continue
+            del self._due[key]
+            try:
+                window._autosave()
+            except RuntimeError:
+                pass  # Janela destruída
+        self._schedule()
+
+
+class AppContext(QObject):
+    """Recursos do processo (ver docstring do módulo)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.images = ImageCache()
+        self.autosave = AutosaveScheduler(parent=self)
+        self.routes = get_route_scheduler()
+        self.windows = []
+        self._project_index = None
+        self._project_index_worker = None
+
+    def register_window(self, window):
+        if window not in self.windows:
+            self.windows.append(window)
+            window.destroyed.connect(lambda *_args, w=window: self.unregister_window(w))
+
+    def unregister_window(self, window):
+        self.autosave.discard(window)
+        if window in self.windows:
+            self.windows.remove(window)
+
+    def project_index(self):
+        """Índice de projetos compartilhado (aberto no primeiro uso)."""
+        if self._project_index is None:
+            from core.project_index import ProjectIndex
+            self._project_index = ProjectIndex()
+        return self._project_index
+
+    def start_project_index_update(self, on_progress=None, on_done=None):
+        """
+        Inicia a atualização do índice, ou acompanha a que já está em
+        andamento (de qualquer janela). Os callbacks são ligados antes do
+        início, para não perder sinais.
+        """
+        worker = self._project_index_worker
+        running = worker is not None and worker.isRunning()
+        if not running:
+            from core.project_index import ProjectIndexWorker
+            worker = ProjectIndexWorker(self.project_index().db_path, self)
+            worker.finished.connect(lambda: self._forget_worker(worker))
+            self._project_index_worker = worker
+        if on_progress is not None:
+            worker.progress.connect(on_progress)
+        if on_done is not None:
+            worker.finished_update.connect(on_done)
+        if not running:
+            worker.start()
+        return worker
+
+    def _forget_worker(self, worker):
+        if self._project_index_worker is worker:
+            self._project_index_worker = None
+        worker.deleteLater()
+
+
+_app_context = None
+
+
+def get_app_context():
+    global _app_context
+    if _app_context is None:
+        _app_context = AppContext()
+    return _app_context
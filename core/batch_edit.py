@@ -0,0 +1,152 @@
+"""
+Edição em lote da cena.
+
+    with BatchEdit(scene, view, undo_stack, "Excluir objetos") as batch:
+        for item in items:
+            batch.push(RemoveItemCommand(scene, item))
+        batch.reroute(*nodes_que_mudaram)
+
+Dentro do bloco: os comandos entram em um único passo de desfazer
+(BatchCommand: um só indexChanged, logo um só disparo de autosave), o
+roteamento de conexões fica suspenso, as estatísticas da cena adiam as
+notificações e a view não redesenha. Ao sair, as conexões afetadas são
+recalculadas uma única vez e a view é redesenhada inteira. Desfazer e
+refazer o passo também rodam em lote.
+"""
+from contextlib import ExitStack
+
+from PySide6.QtGui import QUndoCommand
+
+from core.connection import SmartConnection, get_route_scheduler
+from core.scene_stats import attached_stats
+
+
+def _deferred_updates(scene):
+    """Roteamento suspenso e estatísticas adiadas (ExitStack a ser fechado)."""
+    stack = ExitStack()
+    stats = attached_stats(scene)
+    if stats is not None:
+        stack.enter_context(stats.deferred())
+    stack.enter_context(get_route_scheduler().suspend())
+    return stack
+
+
+def _reroute(scene, item_ids, connections):
+    """Recalcula uma vez as conexões dadas e as dos nós em item_ids."""
+    if not item_ids and not connections:
+        return
+    done = set()
+    targets = list(connections)
+    if item_ids:
+        # Uma única varredura para todas as conexões dos nós marcados
+        targets += [
+            conn for conn in scene.items()
+            if isinstance(conn, SmartConnection)
+            and (id(conn.source) in item_ids or id(conn.target) in item_ids)
+        ]
+    for conn in targets:
+        if id(conn) in done or conn.scene() is not scene:
+            continue
+        done.add(id(conn))
+        conn.update_path()
+
+
+class BatchCommand(QUndoCommand):
+    """
+    Passo de desfazer de um BatchEdit. Ao contrário de uma macro do
+    QUndoStack, desfazer e refazer rodam com o roteamento suspenso e
+    recalculam as conexões marcadas uma única vez ao final, como
+    PasteItemsCommand.
+    """
+
+    def __init__(self, scene, description, commands, item_ids, connections):
+        super().__init__(description)
+        self.scene = scene
+        self.commands = commands
+        self._item_ids = set(item_ids)
+        self._connections = list(connections)
+        # Os comandos já foram executados dentro do bloco
+        self._skip_redo = True
+
+    def redo(self):
+        if self._skip_redo:
+            self._skip_redo = False
+            return
+        with _deferred_updates(self.scene):
+            for cmd in self.commands:
+                cmd.redo()
+        _reroute(self.scene, self._item_ids, self._connections)
+
+    def undo(self):
+        with _deferred_updates(self.scene):
+            for cmd in reversed(self.commands):
+                cmd.undo()
+        _reroute(self.scene, self._item_ids, self._connections)
+
+
+class BatchEdit:
+    """Contexto de edição em lote (ver docstring do módulo)."""
+
+    def __init__(self, scene, view=None, undo_stack=None, description=""):
+        self.scene = scene
+        self.view = view
+        self.undo_stack = undo_stack
+        self.description = description
+        self._reroute_items = set()
+        self._reroute_connections = []
+        self._stack = None
+        self._commands = None  # comandos do passo único (com descrição)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        viewport = self.view.viewport() if self.view is not None else None
+        if viewport is not None:
+            viewport.setUpdatesEnabled(False)
+            self._stack.callback(self._repaint, viewport)
+        self._stack.enter_context(_deferred_updates(self.scene))
+        if self.undo_stack is not None and self.description:
+            self._commands = []
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        command = None
+        if self._commands:
+            command = BatchCommand(
+                self.scene, self.description, self._commands,
+                self._reroute_items, self._reroute_connections
+            )
+        self._commands = None
+        # Roteamento volta antes do recálculo consolidado
+        self._stack.close()
+        self._flush_reroute()
+        if command is not None:
+            self.undo_stack.push(command)
+        return False
+
+    @staticmethod
+    def _repaint(viewport):
+        viewport.setUpdatesEnabled(True)
+        viewport.update()
+
+    def push(self, cmd):
+        """Executa o comando e o guarda no passo único (ou o empilha, sem descrição)."""
+        if self._commands is not None:
+            cmd.redo()
+            self._commands.append(cmd)
+        elif self.undo_stack is not None:
+            self.undo_stack.push(cmd)
+        else:
+            cmd.redo()
+
+    def reroute(self, *items):
+        """Marca nós (suas conexões) ou conexões para o recálculo final."""
+        for item in items:
+            if isinstance(item, SmartConnection):
+                self._reroute_connections.append(item)
+            else:
+                self._reroute_items.add(id(item))
+
+    def _flush_reroute(self):
+        _reroute(self.scene, self._reroute_items, self._reroute_connections)
+        self._reroute_items = set()
+        self._reroute_connections = []
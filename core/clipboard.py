@@ -0,0 +1,178 @@
+"""
+Área de transferência de subgrafos (nós, mídias e conexões).
+
+O conteúdo copiado usa o mesmo esquema do arquivo .amind (nodes /
+connections, via PersistenceManager) mais uma lista "media", em JSON
+compacto comprimido com zlib sob o tipo MIME próprio. Junto vai o texto
+dos nós em text/plain, para colar em outros programas.
+"""
+import base64
+import json
+import zlib
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QMimeData, QPointF, QRectF
+from PySide6.QtGui import QImage
+
+from core.app_context import get_app_context
+from core.connection import SmartConnection
+from items.shapes import StyledNode
+from items.media import MediaItem, MediaImageItem, MediaSliderImageItem, MediaAVItem, MediaAVSliderItem
+
+MIME_TYPE = "application/x-amarelo-mind"
+CLIPBOARD_VERSION = 1
+
+
+def _encode_image(pix):
+    """PNG em base64 para imagens sem arquivo de origem."""
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    pix.toImage().save(buffer, "PNG")
+    return base64.b64encode(bytes(buffer.data())).decode("ascii")
+
+
+def _decode_image(data):
+    image = QImage()
+    image.loadFromData(QByteArray(base64.b64decode(data)), "PNG")
+    return image
+
+
+def _media_to_dict(item):
+    data = {"id": id(item), "x": item.pos().x(), "y": item.pos().y()}
+    if isinstance(item, MediaImageItem):
+        data["kind"] = "image"
+        data["w"], data["h"] = item._rect.width(), item._rect.height()
+        if item.source:
+            data["sources"] = [item.source]
+        else:
+            data["images"] = [_encode_image(item._pix)]
+    elif isinstance(item, MediaSliderImageItem):
+        data["kind"] = "image_slider"
+        data["sources"] = [entry["source"] for entry in item._entries]
+        data["images"] = [
+            "" if entry["source"] else _encode_image(entry["pix"]) for entry in item._entries
+        ]
+    elif isinstance(item, MediaAVItem):
+        data["kind"] = "av"
+        data["sources"] = [item.source]
+    elif isinstance(item, MediaAVSliderItem):
+        data["kind"] = "av_slider"
+        data["sources"] = list(item._sources)
+    else:
+        return None
+    return data
+
+
+def _media_from_dict(data):
+    kind = data.get("kind")
+    sources = data.get("sources") or []
+    images = data.get("images") or []
+    if kind == "image":
+        image = _decode_image(images[0]) if images else get_app_context().images.load(sources[0])
+        item = MediaImageItem(image, source=sources[0] if sources else "")
+        if data.get("w") and data.get("h"):
+            item._rect = QRectF(0, 0, data["w"], data["h"])
+            item._update_handle_positions()
+    elif kind == "image_slider":
+        pics = [
+            _decode_image(images[i]) if i < len(images) and images[i] else get_app_context().images.load(src)
+            for i, src in enumerate(sources)
+        ]
+        item = MediaSliderImageItem(pics, sources)
+    elif kind == "av":
+        item = MediaAVItem(sources[0])
+    elif kind == "av_slider":
+        item = MediaAVSliderItem(sources)
+    else:
+        return None
+    item.setPos(data["x"], data["y"])
+    return item
+
+
+def selection_to_mime(items, persistence):
+    """
+    Serializa os itens copiados; conexões entram quando os dois extremos
+    foram copiados.
+
+    Returns:
+        QMimeData ou None se não há nada copiável
+    """
+    nodes = [i for i in items if isinstance(i, StyledNode)]
+    media = [i for i in items if isinstance(i, MediaItem)]
+    if not nodes and not media:
+        return None
+    copied = {id(i) for i in nodes} | {id(i) for i in media}
+    scene = (nodes or media)[0].scene()
+
+    data = {
+        "version": CLIPBOARD_VERSION,
+        "nodes": [persistence.node_to_dict(node) for node in nodes],
+        "media": [d for d in (_media_to_dict(m) for m in media) if d is not None],
+        "connections": [],
+    }
+    if scene is not None:
+        for conn in scene.items():
+            if isinstance(conn, SmartConnection) and id(conn.source) in copied and id(conn.target) in copied:
+                data["connections"].append({"source_id": id(conn.source), "target_id": id(conn.target)})
+
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    mime = QMimeData()
+    mime.setData(MIME_TYPE, QByteArray(zlib.compress(raw, 6)))
+    mime.setText("\n".join(node.get_text() for node in nodes if node.get_text()))
+    return mime
+
+
+def mime_has_subgraph(mime):
+    return mime is not None and mime.hasFormat(MIME_TYPE)
+
+
+def subgraph_from_mime(mime):
+    """Dados copiados, ou None se o conteúdo não é deste aplicativo/é inválido."""
+    if not mime_has_subgraph(mime):
+        return None
+    try:
+        return json.loads(zlib.decompress(bytes(mime.data(MIME_TYPE))).decode("utf-8"))
+    except (zlib.error, ValueError) as e:
+        print(f"Aviso: conteúdo inválido na área de transferência: {e}")
+        return None
+
+
+def subgraph_bounds(data):
+    """Retângulo (aproximado) ocupado pelos itens copiados."""
+    rect = None
+    for entry in data.get("nodes", []) + data.get("media", []):
+        r = QRectF(entry["x"], entry["y"], entry.get("w", 200), entry.get("h", 100))
+        rect = r if rect is None else rect.united(r)
+    return rect or QRectF()
+
+
+def build_subgraph(data, persistence, offset=QPointF(), window=None):
+    """
+    Cria (sem adicionar à cena) os itens e conexões dos dados copiados,
+    deslocados por `offset`.
+
+    Returns:
+        tuple: (itens, conexões)
+    """
+    created = {}
+    items = []
+    for node_data in data.get("nodes", []):
+        node = persistence.node_from_dict(node_data, window)
+        node.setPos(node.pos() + offset)
+        created[node_data["id"]] = node
+        items.append(node)
+    for media_data in data.get("media", []):
+        try:
+            item = _media_from_dict(media_data)
+        except Exception as e:
+            print(f"Aviso: mídia não pôde ser colada: {e}")
+            continue
+        if item is not None:
+            item.setPos(item.pos() + offset)
+            created[media_data["id"]] = item
+            items.append(item)
+    connections = [
+        SmartConnection(created[c["source_id"]], created[c["target_id"]])
+        for c in data.get("connections", [])
+        if c.get("source_id") in created and c.get("target_id") in created
+    ]
+    return items, connections
@@ -1,37 +1,164 @@
 from PySide6.QtWidgets import QGraphicsPathItem, QStyle, QGraphicsRectItem
-from PySide6.QtCore import Qt, QPointF, QRectF
+from PySide6.QtCore import Qt, QPointF, QRectF, QObject, QTimer
 from PySide6.QtGui import QPen, QColor, QPainterPath, QPainter
 import heapq
 import math
-import numpy as np
-try:
-    from shapely.geometry import LineString, Polygon, Point, box
-    from shapely.ops import unary_union
-    SHAPELY_AVAILABLE = True
-except ImportError:
-    SHAPELY_AVAILABLE = False
-    
-try:
+from contextlib import contextmanager
+
+from core.scene_stats import attached_stats
+
+# Dependências opcionais (shapely, scipy, numpy) só são importadas no
+# primeiro roteamento avançado: o caminho rápido e a inicialização do
+# aplicativo não pagam o custo delas.
+_optional_modules = {}
+
+
+def _optional_import(name, loader):
+    """Importa uma vez e memoriza; None se o pacote não estiver instalado."""
+    if name not in _optional_modules:
+        try:
+            _optional_modules[name] = loader()
+        except ImportError:
+            _optional_modules[name] = None
+    return _optional_modules[name]
+
+
+def _load_shapely():
+    from shapely import geometry, ops
+    return geometry, ops
+
+
+def _load_splines():
+    import numpy as np
     from scipy.interpolate import splprep, splev
-    from scipy.interpolate import BSpline
-    SCIPY_AVAILABLE = True
-except ImportError:
-    SCIPY_AVAILABLE = False
+    return np, splprep, splev
+
+
+# Tempo sem edições antes de recalcular as rotas adiadas
+ROUTE_IDLE_MS = 300
+
+
+def connections_of(node):
+    """Conexões da cena que têm o nó como origem ou destino."""
+    scene = node.scene()
+    if scene is None:
+        return []
+    stats = attached_stats(scene)
+    if stats is not None:
+        return stats.connections_of(node)
+    return [
+        item for item in scene.items()
+        if isinstance(item, SmartConnection) and (item.source is node or item.target is node)
+    ]
+
+
+class RouteScheduler(QObject):
+    """
+    Adia o roteamento completo de conexões até que as edições parem.
+
+    Enquanto o usuário digita, as conexões afetadas recebem apenas uma linha
+    reta provisória; o roteamento com desvio de obstáculos roda uma única vez,
+    `idle_ms` após a última solicitação.
+    """
+
+    def __init__(self, idle_ms=ROUTE_IDLE_MS, parent=None):
+        super().__init__(parent)
+        self._pending = {}
+        self._suspended = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(idle_ms)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def suspended(self):
+        return self._suspended > 0
+
+    @contextmanager
+    def suspend(self):
+        """
+        Suspende o roteamento disparado por movimento de nós. Quem suspende
+        fica responsável por recalcular as conexões afetadas ao final.
+        """
+        self._suspended += 1
+        try:
+            yield
+        finally:
+            self._suspended -= 1
+
+    def defer(self, connections):
+        for conn in connections:
+            conn.set_placeholder_path()
+            self._pending[id(conn)] = conn
+        if self._pending:
+            self._timer.start()  # reinicia a contagem a cada chamada
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def flush(self):
+        """Executa imediatamente os roteamentos pendentes."""
+        self._timer.stop()
+        pending, self._pending = self._pending, {}
+        for conn in pending.values():
+            try:
+                if conn.scene():
+                    conn.prepareGeometryChange()
+                    conn.update_path()
+            except RuntimeError:
+                # Conexão já destruída
+                pass
+
+
+_route_scheduler = None
+
+
+def routing_suspended():
+    """True enquanto uma operação em lote suspendeu o roteamento."""
+    return _route_scheduler is not None and _route_scheduler.suspended
+
+
+def get_route_scheduler():
+    """Agendador compartilhado (criado sob demanda, após a QApplication)."""
+    global _route_scheduler
+    if _route_scheduler is None:
+        _route_scheduler = RouteScheduler()
+    return _route_scheduler
+
 
 class SmartConnection(QGraphicsPathItem):
     """Conexão curva ou reta entre objetos"""
+    # Azul conforme solicitado para o ícone de conexão
+    LINE_COLOR = "#0078d4"
+    LINE_WIDTH = 3
+
     def __init__(self, source, target):
         super().__init__()
         self.source = source
         self.target = target
-        # Azul conforme solicitado para o ícone de conexão
-        self.setPen(QPen(QColor("#0078d4"), 3, Qt.SolidLine, Qt.RoundCap))
+        self.setPen(self.style_pen())
         self.setZValue(-1) # Garante que a linha fique por baixo dos nós
         
         # Não selecionável por padrão (só via double-click)
         self.setAcceptHoverEvents(True)
         
         self.update_path()
+
+    def style_pen(self):
+        """Caneta da linha sem o destaque de seleção (pen() fica laranja enquanto selecionada)"""
+        return QPen(QColor(self.LINE_COLOR), self.LINE_WIDTH, Qt.SolidLine, Qt.RoundCap)
+
+    def itemChange(self, change, value):
+        # Contagem de conexões e graus nas estatísticas da cena
+        if change == QGraphicsPathItem.ItemSceneChange:
+            stats = attached_stats(self.scene())
+            if stats is not None:
+                stats.connection_removed(self)
+        elif change == QGraphicsPathItem.ItemSceneHasChanged:
+            stats = attached_stats(value)
+            if stats is not None:
+                stats.connection_added(self)
+        return super().itemChange(change, value)
     
     def mouseDoubleClickEvent(self, event):
         """Permite selecionar a linha apenas com duplo clique."""
@@ -63,6 +190,19 @@ class SmartConnection(QGraphicsPathItem):
             return
         
         self._update_path_fast(start, end)
+
+    def set_placeholder_path(self):
+        """Linha reta entre as âncoras, usada enquanto o roteamento está adiado."""
+        if not self.source.scene() or not self.target.scene():
+            return
+        start, end = self._calculate_optimal_anchors(
+            self.source.sceneBoundingRect(), self.target.sceneBoundingRect()
+        )
+        if not (self._is_valid_point(start) and self._is_valid_point(end)):
+            return
+        path = QPainterPath(start)
+        path.lineTo(end)
+        self.setPath(path)
     
     def _calculate_optimal_anchors(self, source_rect, target_rect):
         """Calcula pontos de ancoragem ótimos nas bordas dos objetos."""
@@ -400,12 +540,14 @@ class SmartConnection(QGraphicsPathItem):
 
     def _create_forbidden_areas(self, start, end):
         """Cria áreas proibidas usando Shapely"""
-        if not self.source.scene() or not SHAPELY_AVAILABLE:
+        shapely = _optional_import("shapely", _load_shapely)
+        if not self.source.scene() or shapely is None:
             return None
+        geometry, ops = shapely
         
         # Expansão da área de busca
         margin = 50
-        search_bounds = box(
+        search_bounds = geometry.box(
             min(start.x(), end.x()) - margin,
             min(start.y(), end.y()) - margin,
             max(start.x(), end.x()) + margin,
@@ -420,15 +562,12 @@ class SmartConnection(QGraphicsPathItem):
             if hasattr(item, 'sceneBoundingRect'):
                 rect = item.sceneBoundingRect()
                 # Criar polígono Shapely para o obstáculo
-                if 'Polygon' in globals():
-                    poly = Polygon([
-                        (rect.left(), rect.top()),
-                        (rect.right(), rect.top()),
-                        (rect.right(), rect.bottom()),
-                        (rect.left(), rect.bottom())
-                    ])
-                else:
-                    continue
+                poly = geometry.Polygon([
+                    (rect.left(), rect.top()),
+                    (rect.right(), rect.top()),
+                    (rect.right(), rect.bottom()),
+                    (rect.left(), rect.bottom())
+                ])
                 
                 # Expandir ligeiramente o obstáculo (buffer)
                 if hasattr(poly, 'buffer'):
@@ -441,11 +580,7 @@ class SmartConnection(QGraphicsPathItem):
             return None
         
         # Unir todos os obstáculos em uma área proibida
-        if 'unary_union' in globals():
-            forbidden_area = unary_union(obstacles)
-        else:
-            # Fallback simples: juntar geometrias manualmente
-            forbidden_area = obstacles[0] if obstacles else None
+        forbidden_area = ops.unary_union(obstacles)
         
         # Verificar se a área de busca intersecta os obstáculos
         if search_bounds.intersects(forbidden_area):
@@ -505,6 +640,10 @@ class SmartConnection(QGraphicsPathItem):
                                     resolution, forbidden_area):
         """Cria mapa de colisão usando geometria precisa Shapely"""
         collision_map = [[False for _ in range(width)] for _ in range(height)]
+        shapely = _optional_import("shapely", _load_shapely)
+        if shapely is None:
+            return collision_map
+        Point = shapely[0].Point
         
         for gy in range(height):
             for gx in range(width):
@@ -512,8 +651,7 @@ class SmartConnection(QGraphicsPathItem):
                 cell_center_x = min_x + gx * resolution + resolution / 2
                 cell_center_y = min_y + gy * resolution + resolution / 2
                 
-                if 'Point' in globals():
-                    cell_center = Point(cell_center_x, cell_center_y)
+                cell_center = Point(cell_center_x, cell_center_y)
                 
                 # Verificar se célula intersecta área proibida
                 if forbidden_area and hasattr(forbidden_area, 'intersects'):
@@ -578,6 +716,12 @@ class SmartConnection(QGraphicsPathItem):
             self._create_elegant_bezier_fallback(points[0], points[1])
             return
         
+        splines = _optional_import("scipy", _load_splines)
+        if splines is None:
+            self._create_elegant_bezier_fallback(points[0], points[-1])
+            return
+        np, splprep, splev = splines
+        
         try:
             # Preparar pontos para spline
             points_array = np.array([(p.x(), p.y()) for p in points])
@@ -595,15 +739,11 @@ class SmartConnection(QGraphicsPathItem):
                     return
             
             # Criar spline paramétrico
-            if 'splprep' in globals() and 'splev' in globals():
-                tck, u = splprep(points_array, s=0, k=min(3, len(points)-1))
-                
-                # Avaliar spline em mais pontos para curva suave
-                u_new = np.linspace(0, 1, max(20, len(points) * 5))
-                smooth_points = splev(u_new, tck)
-            else:
-                # Fallback sem scipy
-                smooth_points = points_array
+            tck, u = splprep(points_array, s=0, k=min(3, len(points)-1))
+            
+            # Avaliar spline em mais pontos para curva suave
+            u_new = np.linspace(0, 1, max(20, len(points) * 5))
+            smooth_points = splev(u_new, tck)
             
             # Criar QPainterPath a partir dos pontos suavizados
             path = QPainterPath()
@@ -1212,6 +1352,6 @@ class SmartConnection(QGraphicsPathItem):
             pen.setWidth(5)
             self.setPen(pen)
         else:
-            self.setPen(QPen(QColor("#0078d4"), 3, Qt.SolidLine, Qt.RoundCap))
+            self.setPen(self.style_pen())
         
         super().paint(painter, option, widget)
\ No newline at end of file
@@ -1,9 +1,17 @@
 import os
 import sys
+import json
+import time
 import datetime
-from typing import List
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
 
 LOG_BASENAME = "diagnostics.log"
+TRACE_BASENAME = "startup_trace.json"
+
+# Set to "1" to profile startup, or to a .json path for the trace file
+PROFILE_ENV = "AMARELO_PROFILE_STARTUP"
 
 
 def _ensure_dir(path: str) -> None:
@@ -142,3 +150,130 @@ def run_startup_checks() -> None:
         _try_import(m)
 
     _write(["===== end diagnostics =====\n"])
+
+
+class StartupProfiler:
+    """Span-based startup profiler (monotonic clock, no-op when disabled).
+
+    Spans are recorded until finish(), which writes a Chrome trace
+    (chrome://tracing, Perfetto) and appends the slowest phases to
+    diagnostics.log. watch_first_paint() calls finish() once the main
+    window has painted for the first time.
+    """
+
+    def __init__(self, enabled: bool = False, trace_path: Optional[str] = None):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self._origin_ns = time.perf_counter_ns()
+        self._events: List[Tuple[str, str, int, int, int]] = []
+        self._open: Dict[str, Tuple[str, int]] = {}
+        self._finished = False
+        self._paint_filter = None
+
+    @classmethod
+    def from_env(cls) -> "StartupProfiler":
+        value = os.environ.get(PROFILE_ENV, "").strip()
+        if not value or value == "0":
+            return cls(enabled=False)
+        trace_path = value if value.lower().endswith(".json") else None
+        return cls(enabled=True, trace_path=trace_path)
+
+    def _record(self, name: str, category: str, start_ns: int, end_ns: int) -> None:
+        if self.enabled and not self._finished:
+            self._events.append((name, category, start_ns, end_ns, threading.get_ident()))
+
+    @contextmanager
+    def span(self, name: str, category: str = "startup") -> Iterator[None]:
+        """Time the enclosed block."""
+        if not self.enabled or self._finished:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._record(name, category, start, time.perf_counter_ns())
+
+    def begin(self, name: str, category: str = "startup") -> None:
+        """Open a span that does not fit a with-block (closed by end())."""
+        if self.enabled and not self._finished:
+            self._open[name] = (category, time.perf_counter_ns())
+
+    def end(self, name: str) -> None:
+        opened = self._open.pop(name, None)
+        if opened is not None:
+            self._record(name, opened[0], opened[1], time.perf_counter_ns())
+
+    def watch_first_paint(self, widget) -> None:
+        """Span from now until `widget` finishes its first paint, then finish()."""
+        if not self.enabled or self._finished:
+            return
+        from PySide6.QtCore import QObject, QEvent, QTimer
+
+        profiler = self
+
+        class _FirstPaintFilter(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Paint and profiler._paint_filter is self:
+                    profiler._paint_filter = None
+                    obj.removeEventFilter(self)
+                    # Closes after the paint event itself has been handled
+                    QTimer.singleShot(0, profiler._on_first_paint)
+                return False
+
+        self._paint_filter = _FirstPaintFilter(widget)
+        widget.installEventFilter(self._paint_filter)
+        self.begin("first paint")
+
+    def _on_first_paint(self) -> None:
+        self.end("first paint")
+        self.finish()
+
+    def summary(self, limit: int = 5) -> List[str]:
+        """Slowest spans, longest first, with the time since process start."""
+        total_ms = (time.perf_counter_ns() - self._origin_ns) / 1e6
+        lines = [f"startup total = {total_ms:.1f} ms (since diagnostics import)"]
+        slowest = sorted(self._events, key=lambda e: e[2] - e[3])[:limit]
+        for name, _category, start, end, _tid in slowest:
+            lines.append(
+                f"  {(end - start) / 1e6:8.1f} ms  {name}"
+                f"  (at +{(start - self._origin_ns) / 1e6:.1f} ms)"
+            )
+        return lines
+
+    def write_trace(self, path: Optional[str] = None) -> Optional[str]:
+        """Write the spans as Chrome trace JSON; returns the path or None."""
+        path = path or self.trace_path or os.path.join(os.path.dirname(get_log_path()), TRACE_BASENAME)
+        pid = os.getpid()
+        events = [
+            {
+                "name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                "ts": (start - self._origin_ns) / 1000, "dur": (end - start) / 1000,
+            }
+            for name, category, start, end, tid in self._events
+        ]
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        except Exception:
+            return None
+        return path
+
+    def finish(self) -> None:
+        """Stop recording, write the trace and log the slowest phases."""
+        if not self.enabled or self._finished:
+            return
+        # Spans still open (e.g. no paint happened) are closed here
+        for name in list(self._open):
+            self.end(name)
+        self._finished = True
+        path = self.write_trace()
+        lines = self.summary()
+        if path:
+            lines.append(f"trace = {path}")
+        _hdr("Startup profile")
+        _write(lines)
+        print("\n".join(lines))
+
+
+profiler = StartupProfiler.from_env()
@@ -0,0 +1,443 @@
+"""
+Exportação da cena para arquivos.
+
+O PNG é gerado em blocos (tiles) de tamanho fixo e gravado linha a linha
+em um fluxo zlib, de modo que a memória usada depende apenas da largura
+da imagem e da altura do bloco, nunca da área total exportada.
+
+SVG e PDF são gerados desenhando cada nó e conexão como primitivas
+vetoriais (retângulos, elipses, caminhos e texto), sem passar pelos
+efeitos de sombra, que forçariam a rasterização dos itens.
+"""
+import os
+import struct
+import zlib
+from typing import Callable, Optional
+
+from PySide6.QtCore import Qt, QRectF, QSizeF, QSize, QMarginsF, QThread, Signal
+from PySide6.QtGui import (
+    QColor, QImage, QPainter, QPicture, QPen, QPalette, QPdfWriter,
+    QPageSize, QPageLayout, QAbstractTextDocumentLayout
+)
+from PySide6.QtWidgets import QGraphicsProxyWidget, QStyleOptionGraphicsItem
+
+DEFAULT_BACKGROUND = "#0f1621"
+DEFAULT_TILE_SIZE = 1024
+DEFAULT_MEMORY_BUDGET = 128 * 1024 * 1024  # bytes por faixa de tiles
+BASE_DPI = 96.0
+EXPORT_MARGIN = 30
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_IDAT_FLUSH_SIZE = 256 * 1024
+
+
+def scene_export_rect(scene, margin=EXPORT_MARGIN) -> QRectF:
+    """Retângulo da cena usado nas exportações (itens + margem)."""
+    return scene.itemsBoundingRect().adjusted(-margin, -margin, margin, margin)
+
+
+class _PngStreamWriter:
+    """Escreve um PNG RGBA de 8 bits recebendo uma linha de pixels por vez."""
+
+    def __init__(self, file_obj, width, height, dpi=BASE_DPI, level=6):
+        self._f = file_obj
+        self._compressor = zlib.compressobj(level)
+        self._pending = []
+        self._pending_size = 0
+
+        self._f.write(_PNG_SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        ppm = int(round(dpi / 0.0254))
+        self._chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1))
+
+    def _chunk(self, kind, data):
+        self._f.write(struct.pack(">I", len(data)))
+        self._f.write(kind)
+        self._f.write(data)
+        self._f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+
+    def _push(self, data):
+        if not data:
+            return
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= _IDAT_FLUSH_SIZE:
+            self._flush_idat()
+
+    def _flush_idat(self):
+        if self._pending:
+            self._chunk(b"IDAT", b"".join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def write_row(self, row_bytes):
+        # Filtro 0 (None) em todas as linhas: simples e rápido
+        self._push(self._compressor.compress(b"\x00"))
+        self._push(self._compressor.compress(row_bytes))
+
+    def close(self):
+        self._push(self._compressor.flush())
+        self._flush_idat()
+        self._chunk(b"IEND", b"")
+
+
+class TiledPngExporter:
+    """
+    Renderiza a cena em tiles e grava o PNG em fluxo.
+
+    A cena (ou um snapshot QPicture dela) é desenhada faixa por faixa; cada
+    faixa tem a largura total da imagem e altura limitada pelo orçamento de
+    memória, e suas linhas são enviadas ao compressor assim que ficam prontas.
+    """
+
+    def __init__(self, scene=None, source_rect=None, scale=1.0,
+                 tile_size=DEFAULT_TILE_SIZE, memory_budget=DEFAULT_MEMORY_BUDGET,
+                 background=DEFAULT_BACKGROUND, picture=None):
+        if scene is None and picture is None:
+            raise ValueError("É necessário informar a cena ou um snapshot")
+        self.scene = scene
+        self.picture = picture
+        if source_rect is None:
+            source_rect = scene_export_rect(scene)
+        self.source_rect = QRectF(source_rect)
+        self.scale = max(0.01, float(scale))
+        self.tile_size = max(64, int(tile_size))
+        self.memory_budget = max(1024 * 1024, int(memory_budget))
+        self.background = QColor(background)
+        self._cancelled = False
+
+    @classmethod
+    def from_snapshot(cls, scene, source_rect=None, **kwargs):
+        """
+        Grava a cena em um QPicture (thread principal) para que a
+        renderização dos tiles possa acontecer em outra thread.
+        """
+        if source_rect is None:
+            source_rect = scene_export_rect(scene)
+        source_rect = QRectF(source_rect)
+        picture = QPicture()
+        painter = QPainter(picture)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        scene.render(
+            painter,
+            QRectF(0, 0, source_rect.width(), source_rect.height()),
+            source_rect,
+            Qt.IgnoreAspectRatio
+        )
+        painter.end()
+        return cls(scene=None, source_rect=source_rect, picture=picture, **kwargs)
+
+    # --------------------------------------------------
+    def output_size(self):
+        """Tamanho final em pixels (largura, altura)."""
+        w = max(1, int(round(self.source_rect.width() * self.scale)))
+        h = max(1, int(round(self.source_rect.height() * self.scale)))
+        return w, h
+
+    def band_height(self):
+        """Altura da faixa de tiles que cabe no orçamento de memória."""
+        w, _ = self.output_size()
+        return max(1, min(self.tile_size, self.memory_budget // (w * 4)))
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _render_tile(self, x, y, tw, th):
+        image = QImage(tw, th, QImage.Format_RGBA8888)
+        image.fill(self.background)
+
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        if self.picture is not None:
+            painter.translate(-x, -y)
+            painter.scale(self.scale, self.scale)
+            painter.drawPicture(0, 0, self.picture)
+        else:
+            src = QRectF(
+                self.source_rect.left() + x / self.scale,
+                self.source_rect.top() + y / self.scale,
+                tw / self.scale,
+                th / self.scale
+            )
+            self.scene.render(painter, QRectF(0, 0, tw, th), src, Qt.IgnoreAspectRatio)
+        painter.end()
+        return image
+
+    def export(self, path: str, progress: Optional[Callable[[int, int], bool]] = None) -> bool:
+        """
+        Exporta para `path`. `progress(feitos, total)` é chamado após cada
+        tile; se retornar False a exportação é cancelada.
+
+        Returns:
+            bool: True se o arquivo foi gravado por completo
+        """
+        width, height = self.output_size()
+        band_h = self.band_height()
+        tile_w = self.tile_size
+        cols = (width + tile_w - 1) // tile_w
+        rows = (height + band_h - 1) // band_h
+        total = cols * rows
+        done = 0
+        self._cancelled = False
+
+        try:
+            with open(path, "wb") as f:
+                writer = _PngStreamWriter(f, width, height, dpi=BASE_DPI * self.scale)
+                for y in range(0, height, band_h):
+                    th = min(band_h, height - y)
+                    band = []
+                    for x in range(0, width, tile_w):
+                        tw = min(tile_w, width - x)
+                        tile = self._render_tile(x, y, tw, th)
+                        band.append((tile, tile.constBits(), tile.bytesPerLine(), tw * 4))
+                        done += 1
+                        if progress is not None and progress(done, total) is False:
+                            self._cancelled = True
+                        if self._cancelled:
+                            break
+                    if self._cancelled:
+                        break
+                    for row in range(th):
+                        writer.write_row(b"".join(
+                            bits[row * bpl: row * bpl + row_len]
+                            for _, bits, bpl, row_len in band
+                        ))
+                    band = None
+                if not self._cancelled:
+                    writer.close()
+        except Exception as e:
+            print(f"Erro ao exportar PNG: {e}")
+            self._cancelled = True
+
+        if self._cancelled:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return False
+        return True
+
+
+class TiledExportWorker(QThread):
+    """Executa um TiledPngExporter (criado com from_snapshot) fora da thread da interface."""
+    progress = Signal(int, int)
+    finished_export = Signal(bool, str)
+
+    def __init__(self, exporter, path, parent=None):
+        super().__init__(parent)
+        if exporter.picture is None:
+            raise ValueError("O worker exige um exportador criado a partir de um snapshot")
+        self.exporter = exporter
+        self.path = path
+
+    def run(self):
+        def report(done, total):
+            self.progress.emit(done, total)
+            return not self.isInterruptionRequested()
+
+        ok = self.exporter.export(self.path, report)
+        self.finished_export.emit(ok, self.path)
+
+
+# ======================================================
+# EXPORTAÇÃO VETORIAL (SVG / PDF)
+# ======================================================
+def _paint_node(painter, node):
+    """Desenha um StyledNode: forma, imagem incorporada e texto."""
+    r = node.rect()
+    painter.setBrush(node.brush())
+    if node._is_title:
+        # Como em StyledNode.paint: título sem contorno
+        painter.setPen(QPen(Qt.NoPen))
+        painter.drawEllipse(r)
+    else:
+        painter.setPen(node.pen())
+        painter.drawRect(r)
+
+    painter.save()
+    painter.setClipPath(node.shape())
+
+    if node._embedded_image:
+        img_y = 40
+        scaled = node._embedded_image.scaled(
+            int(r.width() - 10), int(r.height() - img_y - 5),
+            Qt.KeepAspectRatio, Qt.SmoothTransformation
+        )
+        painter.drawPixmap(5, img_y, scaled)
+
+    text_item = node.text
+    painter.translate(text_item.pos())
+    ctx = QAbstractTextDocumentLayout.PaintContext()
+    ctx.palette.setColor(QPalette.Text, text_item.defaultTextColor())
+    ctx.clip = text_item.boundingRect()
+    text_item.document().documentLayout().draw(painter, ctx)
+    painter.restore()
+
+    if node._media_proxy is not None:
+        painter.save()
+        painter.translate(node._media_proxy.pos())
+        _paint_generic(painter, node._media_proxy)
+        painter.restore()
+
+
+def _paint_connection(painter, connection):
+    """Desenha o caminho de uma SmartConnection com a caneta do estilo dela."""
+    # Não usa pen(): paint() a troca pela caneta laranja de seleção
+    painter.setPen(connection.style_pen())
+    painter.setBrush(Qt.NoBrush)
+    painter.drawPath(connection.path())
+
+
+def _paint_generic(painter, item):
+    """
+    Fallback para itens sem serialização vetorial própria (mídias): usa o
+    paint() do item e, para widgets embutidos, uma captura do widget.
+    O painter já deve estar no sistema de coordenadas do item.
+    """
+    if isinstance(item, QGraphicsProxyWidget):
+        widget = item.widget()
+        if widget is not None:
+            painter.drawPixmap(0, 0, widget.grab())
+        return
+    item.paint(painter, QStyleOptionGraphicsItem(), None)
+    for child in item.childItems():
+        if not child.isVisible():
+            continue
+        painter.save()
+        painter.translate(child.pos())
+        _paint_generic(painter, child)
+        painter.restore()
+
+
+def paint_scene_vector(painter, scene, source_rect):
+    """
+    Desenha em `painter` os itens de `source_rect` como primitivas vetoriais,
+    em ordem de empilhamento, com a origem do painter em source_rect.topLeft().
+    """
+    from items.shapes import StyledNode
+    from core.connection import SmartConnection
+    from items.media import MediaImageItem
+
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.TextAntialiasing)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+    painter.translate(-source_rect.left(), -source_rect.top())
+
+    items = scene.items(source_rect, Qt.IntersectsItemBoundingRect, Qt.AscendingOrder)
+    for item in items:
+        if item.parentItem() is not None or not item.isVisible():
+            continue
+        painter.save()
+        painter.setTransform(item.sceneTransform(), True)
+        if isinstance(item, StyledNode):
+            _paint_node(painter, item)
+        elif isinstance(item, SmartConnection):
+            _paint_connection(painter, item)
+        elif isinstance(item, MediaImageItem):
+            target = item.boundingRect().toRect()
+            pix = item._movie.currentPixmap() if item._movie is not None else item._pix
+            if not pix.isNull():
+                painter.drawPixmap(target, pix.scaled(target.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        else:
+            _paint_generic(painter, item)
+        painter.restore()
+
+
+def export_scene_svg(scene, path: str, source_rect=None, background=DEFAULT_BACKGROUND) -> bool:
+    """Exporta a cena como SVG vetorial (1 unidade da cena = 1 px)."""
+    try:
+        from PySide6.QtSvg import QSvgGenerator
+    except ImportError:
+        print("Erro ao exportar SVG: módulo PySide6.QtSvg indisponível")
+        return False
+
+    if source_rect is None:
+        source_rect = scene_export_rect(scene)
+    w = max(1, int(source_rect.width()))
+    h = max(1, int(source_rect.height()))
+
+    try:
+        generator = QSvgGenerator()
+        generator.setFileName(path)
+        generator.setSize(QSize(w, h))
+        generator.setViewBox(QRectF(0, 0, w, h))
+        generator.setResolution(int(BASE_DPI))
+        generator.setTitle(os.path.splitext(os.path.basename(path))[0])
+        generator.setDescription("Amarelo Mind")
+
+        painter = QPainter(generator)
+        if background:
+            painter.fillRect(QRectF(0, 0, w, h), QColor(background))
+        paint_scene_vector(painter, scene, source_rect)
+        painter.end()
+        return True
+    except Exception as e:
+        print(f"Erro ao exportar SVG: {e}")
+        return False
+
+
+def export_scene_pdf(scene, path: str, source_rect=None, page_tiling=False,
+                     page_size=QPageSize.A4, scale=1.0, background=DEFAULT_BACKGROUND) -> bool:
+    """
+    Exporta a cena como PDF vetorial.
+
+    Sem `page_tiling`, gera uma única página do tamanho do mapa. Com
+    `page_tiling`, divide o mapa em páginas `page_size` (orientação
+    escolhida pela proporção do mapa), cada uma cobrindo uma parte dele.
+    """
+    if source_rect is None:
+        source_rect = scene_export_rect(scene)
+    w = max(1.0, source_rect.width())
+    h = max(1.0, source_rect.height())
+    scale = max(0.01, float(scale))
+
+    try:
+        writer = QPdfWriter(path)
+        writer.setResolution(72)  # 1 unidade do painter = 1 pt
+        writer.setCreator("Amarelo Mind")
+        writer.setTitle(os.path.splitext(os.path.basename(path))[0])
+
+        if page_tiling:
+            orientation = QPageLayout.Landscape if w >= h else QPageLayout.Portrait
+            writer.setPageLayout(QPageLayout(
+                QPageSize(page_size), orientation, QMarginsF(0, 0, 0, 0)
+            ))
+        else:
+            writer.setPageLayout(QPageLayout(
+                QPageSize(QSizeF(w * scale, h * scale), QPageSize.Point, "", QPageSize.ExactMatch),
+                QPageLayout.Portrait, QMarginsF(0, 0, 0, 0)
+            ))
+
+        page_w = writer.width() / scale
+        page_h = writer.height() / scale
+        cols = max(1, int(-(-w // page_w))) if page_tiling else 1
+        rows = max(1, int(-(-h // page_h))) if page_tiling else 1
+
+        painter = QPainter(writer)
+        first = True
+        for row in range(rows):
+            for col in range(cols):
+                if not first:
+                    writer.newPage()
+                first = False
+                page_rect = QRectF(
+                    source_rect.left() + col * page_w,
+                    source_rect.top() + row * page_h,
+                    page_w, page_h
+                ) if page_tiling else QRectF(source_rect)
+                painter.save()
+                painter.scale(scale, scale)
+                painter.setClipRect(QRectF(0, 0, page_rect.width(), page_rect.height()))
+                if background:
+                    painter.fillRect(QRectF(0, 0, page_rect.width(), page_rect.height()), QColor(background))
+                paint_scene_vector(painter, scene, page_rect)
+                painter.restore()
+        painter.end()
+        return True
+    except Exception as e:
+        print(f"Erro ao exportar PDF: {e}")
+        return False
@@ -0,0 +1,90 @@
+"""
+Modo foco: mantém visível apenas a vizinhança de k saltos dos objetos
+selecionados.
+
+A adjacência é montada com uma única varredura de scene.items(); a
+vizinhança sai de uma busca em largura a partir de todas as sementes e a
+troca de visibilidade é feita em lote, com o roteamento de conexões
+suspenso e a view sem redesenhos até o fim.
+"""
+from collections import deque
+
+from core.batch_edit import BatchEdit
+from core.connection import SmartConnection
+
+# Profundidade padrão (1 = só os vizinhos diretos, como o antigo Ocultar)
+DEFAULT_FOCUS_DEPTH = 1
+
+
+class FocusGraph:
+    """Adjacência objeto → [(vizinho, conexão)] e lista dos objetos focáveis."""
+
+    def __init__(self, scene, node_types):
+        self.objects = []
+        self.connections = []
+        self.adjacency = {}
+        for item in scene.items():
+            if isinstance(item, SmartConnection):
+                self.connections.append(item)
+            elif isinstance(item, node_types):
+                self.objects.append(item)
+        for conn in self.connections:
+            self.adjacency.setdefault(conn.source, []).append((conn.target, conn))
+            self.adjacency.setdefault(conn.target, []).append((conn.source, conn))
+
+    def neighbourhood(self, seeds, depth):
+        """
+        BFS de até `depth` saltos a partir de todas as sementes.
+
+        Returns:
+            tuple: (objetos alcançados, conexões entre eles)
+        """
+        reached = set(seeds)
+        edges = set()
+        queue = deque((seed, 0) for seed in seeds)
+        while queue:
+            node, dist = queue.popleft()
+            if dist >= depth:
+                continue
+            for other, conn in self.adjacency.get(node, ()):
+                edges.add(conn)
+                if other not in reached:
+                    reached.add(other)
+                    queue.append((other, dist + 1))
+        # Conexões entre dois objetos alcançados também ficam visíveis
+        for conn in self.connections:
+            if conn not in edges and conn.source in reached and conn.target in reached:
+                edges.add(conn)
+        return reached, edges
+
+
+def apply_focus(scene, view, seeds, depth, node_types):
+    """
+    Oculta tudo fora da vizinhança de `depth` saltos das sementes.
+
+    Returns:
+        list: itens ocultados (para restore_focus)
+    """
+    graph = FocusGraph(scene, node_types)
+    keep, keep_edges = graph.neighbourhood(seeds, depth)
+    hidden = []
+    with BatchEdit(scene, view):
+        for item in graph.objects:
+            if item not in keep and item.isVisible():
+                item.setVisible(False)
+                hidden.append(item)
+        for conn in graph.connections:
+            if conn not in keep_edges and conn.isVisible():
+                conn.setVisible(False)
+                hidden.append(conn)
+    return hidden
+
+
+def restore_focus(scene, view, hidden):
+    """Reexibe os itens ocultados; custo proporcional apenas a eles."""
+    with BatchEdit(scene, view):
+        for item in hidden:
+            try:
+                item.setVisible(True)
+            except RuntimeError:
+                pass  # Item destruído enquanto oculto
@@ -0,0 +1,236 @@
+"""
+Processamento de arquivos .amind sem interface gráfica.
+
+Carrega mapas pelo PersistenceManager em uma QApplication com a plataforma
+"offscreen", recalcula as rotas das conexões e exporta para PNG, SVG, PDF,
+JSON ou .amind compacto. Diretórios inteiros são processados em paralelo,
+um mapa por processo.
+
+Uso:
+    python amarelo_batch.py mapas/ -o saida/ -f png,svg -j 8
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple, Union
+
+FORMATS = ("png", "svg", "pdf", "json", "compact")
+INPUT_EXTENSIONS = (".amind", ".json")
+
+_app = None
+
+
+def _ensure_app():
+    """Cria (uma vez por processo) a QApplication na plataforma offscreen."""
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication(["amarelo-batch"])
+    return _app
+
+
+def collect_inputs(paths: List[str], recursive: bool = False) -> List[Tuple[str, str]]:
+    """
+    Expande arquivos e diretórios em uma lista ordenada de mapas.
+
+    Returns:
+        list: (caminho, caminho relativo à raiz informada), para espelhar
+        os subdiretórios na saída; arquivos avulsos ficam só com o nome
+    """
+    found = {}
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                for root, _dirs, files in os.walk(path):
+                    for name in files:
+                        if name.lower().endswith(INPUT_EXTENSIONS):
+                            full = os.path.join(root, name)
+                            found.setdefault(full, os.path.relpath(full, path))
+            else:
+                for name in os.listdir(path):
+                    full = os.path.join(path, name)
+                    if os.path.isfile(full) and name.lower().endswith(INPUT_EXTENSIONS):
+                        found.setdefault(full, name)
+        elif os.path.isfile(path):
+            found.setdefault(path, os.path.basename(path))
+    return sorted(found.items())
+
+
+def reroute_connections(scene) -> int:
+    """Recalcula o caminho de todas as conexões da cena."""
+    from core.connection import SmartConnection
+    count = 0
+    for item in scene.items():
+        if isinstance(item, SmartConnection):
+            item.update_path()
+            count += 1
+    return count
+
+
+def convert_file(path: str, output_dir: str, formats: List[str], scale: float = 1.0,
+                 reroute: bool = True, quiet: bool = True, rel_path: Optional[str] = None) -> Dict:
+    """
+    Converte um único mapa. Executado dentro dos processos do pool.
+
+    As saídas vão para output_dir/rel_path (sem a extensão); sem rel_path,
+    só o nome do arquivo.
+
+    Returns:
+        dict: {"input", "outputs", "ok", "error", "seconds"}
+    """
+    started = time.perf_counter()
+    result = {"input": path, "outputs": [], "ok": False, "error": None, "seconds": 0.0}
+    try:
+        _ensure_app()
+        from PySide6.QtWidgets import QGraphicsScene
+        from core.persistence import PersistenceManager
+        from core.export import TiledPngExporter, export_scene_svg, export_scene_pdf
+
+        scene = QGraphicsScene(-100000, -100000, 200000, 200000)
+        persistence = PersistenceManager(scene)
+
+        # O carregamento imprime mensagens de depuração por nó
+        sink = io.StringIO() if quiet else None
+        with contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext():
+            loaded = persistence.load_from_file(path, scene)
+        if not loaded:
+            result["error"] = "falha ao carregar"
+            return result
+
+        if reroute:
+            reroute_connections(scene)
+
+        base = os.path.join(output_dir, os.path.splitext(rel_path or os.path.basename(path))[0])
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+
+        for fmt in formats:
+            if fmt == "png":
+                out = base + ".png"
+                ok = TiledPngExporter(scene, scale=scale).export(out)
+            elif fmt == "svg":
+                out = base + ".svg"
+                ok = export_scene_svg(scene, out)
+            elif fmt == "pdf":
+                out = base + ".pdf"
+                ok = export_scene_pdf(scene, out, scale=scale)
+            elif fmt == "json":
+                out = base + ".json"
+                with open(out, "w", encoding="utf-8") as f:
+                    json.dump(persistence.scene_to_dict(scene), f, indent=2, ensure_ascii=False)
+                ok = True
+            elif fmt == "compact":
+                out = base + PersistenceManager.FILE_EXTENSION
+                if os.path.abspath(out) == os.path.abspath(path):
+                    result["error"] = "saída compacta sobrescreveria a entrada"
+                    return result
+                ok = persistence.save_to_file(out, scene, compact=True)
+            else:
+                continue
+            if not ok:
+                result["error"] = f"falha ao gerar {fmt}"
+                return result
+            result["outputs"].append(out)
+
+        scene.clear()
+        result["ok"] = True
+        return result
+    except Exception as e:
+        result["error"] = repr(e)
+        return result
+    finally:
+        result["seconds"] = round(time.perf_counter() - started, 3)
+
+
+def run_batch(inputs: List[Union[str, Tuple[str, str]]], output_dir: str, formats: List[str], jobs: int = 0,
+              scale: float = 1.0, reroute: bool = True, quiet: bool = True,
+              progress=None) -> List[Dict]:
+    """
+    Processa vários mapas. Com `jobs` > 1 usa um pool de processos (cada
+    processo tem a sua própria QApplication offscreen); com 1, roda no
+    processo atual. `inputs` aceita caminhos ou os pares de collect_inputs.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    inputs = [(entry, None) if isinstance(entry, str) else entry for entry in inputs]
+    results = []
+    if jobs <= 1 or len(inputs) <= 1:
+        for path, rel_path in inputs:
+            res = convert_file(path, output_dir, formats, scale, reroute, quiet, rel_path)
+            results.append(res)
+            if progress:
+                progress(res, len(results), len(inputs))
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(inputs))) as pool:
+        futures = [
+            pool.submit(convert_file, path, output_dir, formats, scale, reroute, quiet, rel_path)
+            for path, rel_path in inputs
+        ]
+        for future in as_completed(futures):
+            res = future.result()
+            results.append(res)
+            if progress:
+                progress(res, len(results), len(inputs))
+    results.sort(key=lambda r: r["input"])
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="amarelo-batch",
+        description="Converte e exporta mapas .amind sem abrir a interface."
+    )
+    parser.add_argument("inputs", nargs="+", help="arquivos .amind ou diretórios")
+    parser.add_argument("-o", "--output", default="export", help="diretório de saída (padrão: export)")
+    parser.add_argument("-f", "--formats", default="png",
+                        help=f"formatos separados por vírgula: {', '.join(FORMATS)} (padrão: png)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="percorre subdiretórios")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="processos paralelos (padrão: nº de CPUs)")
+    parser.add_argument("-s", "--scale", type=float, default=1.0, help="escala para PNG/PDF (padrão: 1.0)")
+    parser.add_argument("--no-reroute", action="store_true", help="não recalcula as rotas das conexões")
+    parser.add_argument("--report", help="grava um relatório JSON com o resultado de cada arquivo")
+    parser.add_argument("-v", "--verbose", action="store_true", help="mostra as mensagens de carregamento")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    formats = [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+    invalid = [f for f in formats if f not in FORMATS]
+    if invalid or not formats:
+        print(f"Formato(s) inválido(s): {', '.join(invalid) or '(nenhum)'}", file=sys.stderr)
+        return 2
+
+    inputs = collect_inputs(args.inputs, args.recursive)
+    if not inputs:
+        print("Nenhum arquivo .amind encontrado.", file=sys.stderr)
+        return 1
+
+    def report(res, done, total):
+        status = "ok" if res["ok"] else f"ERRO: {res['error']}"
+        print(f"[{done}/{total}] {res['input']} ({res['seconds']:.2f}s) {status}")
+
+    started = time.perf_counter()
+    results = run_batch(
+        inputs, args.output, formats, jobs=args.jobs, scale=args.scale,
+        reroute=not args.no_reroute, quiet=not args.verbose, progress=report
+    )
+    failed = [r for r in results if not r["ok"]]
+    print(f"{len(results) - len(failed)}/{len(results)} mapas convertidos em "
+          f"{time.perf_counter() - started:.2f}s")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
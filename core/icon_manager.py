@@ -8,12 +8,37 @@ class IconManager:
     """Gerencia ícones dos botões e inserção de emojis nos nós"""
     
     _icons_dir = None
+    # Cache do processo: ícones já criados e listagem do diretório (lido uma vez)
+    _icon_cache = {}
+    _listing = None
     
     @staticmethod
     def set_icons_base(base_dir):
         """Define o diretório base do projeto (ex.: pasta do main.py). Ícones em base_dir/assets/icons."""
         resolved = os.path.abspath(base_dir)
-        IconManager._icons_dir = os.path.normpath(os.path.join(resolved, "assets", "icons"))
+        icons_dir = os.path.normpath(os.path.join(resolved, "assets", "icons"))
+        if icons_dir != IconManager._icons_dir:
+            IconManager._icons_dir = icons_dir
+            IconManager.clear_cache()
+    
+    @staticmethod
+    def clear_cache():
+        """Esquece os ícones e a listagem (ex.: ícones alterados em disco)."""
+        IconManager._icon_cache = {}
+        IconManager._listing = None
+    
+    @staticmethod
+    def _resolve(filename):
+        """Caminho do ícone com busca sem diferenciar maiúsculas (Windows), ou None."""
+        if IconManager._listing is None:
+            icons_dir = IconManager._get_icons_dir()
+            try:
+                IconManager._listing = {
+                    f.lower(): os.path.join(icons_dir, f) for f in os.listdir(icons_dir)
+                }
+            except OSError:
+                IconManager._listing = {}
+        return IconManager._listing.get(filename.lower())
     
     @staticmethod
     def _get_icons_dir():
@@ -70,23 +95,18 @@ class IconManager:
     
     @staticmethod
     def load_icon(filename, fallback_text=""):
-        """Carrega um ícone do diretório assets/icons ou cria um fallback"""
-        icons_dir = IconManager._get_icons_dir()
-        icon_path = os.path.join(icons_dir, filename)
-        
-        # Tenta também com diferentes variações de case (Windows)
-        if not os.path.exists(icon_path):
-            # Lista arquivos no diretório para encontrar correspondência case-insensitive
-            try:
-                if os.path.exists(icons_dir):
-                    for f in os.listdir(icons_dir):
-                        if f.lower() == filename.lower():
-                            icon_path = os.path.join(icons_dir, f)
-                            break
-            except:
-                pass
-        
-        if os.path.exists(icon_path):
+        """Carrega um ícone do diretório assets/icons ou cria um fallback (com cache)"""
+        key = (filename, fallback_text)
+        icon = IconManager._icon_cache.get(key)
+        if icon is None:
+            icon = IconManager._create_icon(filename, fallback_text)
+            IconManager._icon_cache[key] = icon
+        return icon
+    
+    @staticmethod
+    def _create_icon(filename, fallback_text):
+        icon_path = IconManager._resolve(filename)
+        if icon_path is not None:
             return QIcon(icon_path)
         else:
             # Fallback: cria um ícone simples com texto
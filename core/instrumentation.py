@@ -0,0 +1,241 @@
+"""
+Instrumentação opcional dos caminhos quentes e HUD de desempenho.
+
+Desligada, não custa nada: as funções medidas (HOT_PATHS) só são
+embrulhadas por enable() e voltam às originais em disable(). Ligada,
+cada chamada soma contagem, tempo total e tempo máximo; os quadros da
+view (InfiniteCanvas.paintEvent) são medidos à parte, com o número de
+itens pintados em cada um. PerformanceHud mostra FPS, ms por quadro,
+reroteamentos por segundo e itens pintados; report() gera o relatório
+exportável (JSON).
+
+Liga na inicialização com AMARELO_INSTRUMENT=1, ou pelo HUD (Ctrl+Shift+P).
+"""
+import functools
+import importlib
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QLabel
+
+INSTRUMENT_ENV = "AMARELO_INSTRUMENT"
+
+# Intervalo de atualização do HUD
+HUD_REFRESH_MS = 500
+
+# Quadros guardados para o relatório
+FRAME_HISTORY = 600
+
+# (módulo, classe ou None para função do módulo, atributo, métrica, é pintura de item)
+HOT_PATHS = (
+    ("core.connection", "SmartConnection", "update_path", "connection.update_path", False),
+    ("core.connection", "SmartConnection", "paint", "connection.paint", True),
+    ("items.shapes", "StyledNode", "paint", "node.paint", True),
+    ("core.positioning", None, "find_best_position_radial", "positioning.find_best_position_radial", False),
+    ("items.alignment_guides", "AlignmentGuidesManager", "show_guides", "guides.show_guides", False),
+    ("core.persistence", "PersistenceManager", "load_from_file", "persistence.load", False),
+    ("core.persistence", "PersistenceManager", "save_to_file", "persistence.save", False),
+    ("items.media", "MediaAVItem", "_update_video_frame", "media.video_frame", False),
+)
+
+# Métrica usada para "reroteamentos por segundo"
+REROUTE_METRIC = "connection.update_path"
+
+
+class Metric:
+    """Contagem e tempos acumulados de um caminho medido."""
+    __slots__ = ("calls", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, elapsed_ns):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.total_ns / self.calls / 1e6 if self.calls else 0.0,
+            "max_ms": self.max_ns / 1e6,
+        }
+
+
+class Instrumentation:
+    """Contadores e temporizadores dos caminhos quentes (ver docstring do módulo)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.metrics = {}
+        self.frames = deque(maxlen=FRAME_HISTORY)  # (duração em ns, itens pintados)
+        self.frame_count = 0
+        self.frame_total_ns = 0
+        self.painted_total = 0
+        self._painted = 0
+        self._patched = []
+        self._started_ns = None
+
+    def enable(self):
+        if self.enabled:
+            return
+        for module_name, class_name, attr, name, painted in HOT_PATHS:
+            try:
+                owner = importlib.import_module(module_name)
+                if class_name is not None:
+                    owner = getattr(owner, class_name)
+                original = owner.__dict__[attr]
+            except (ImportError, AttributeError, KeyError) as e:
+                print(f"Aviso: caminho não instrumentado ({module_name}.{attr}): {e}")
+                continue
+            setattr(owner, attr, self._wrap(name, original, painted))
+            self._patched.append((owner, attr, original))
+        self._started_ns = time.perf_counter_ns()
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        for owner, attr, original in reversed(self._patched):
+            setattr(owner, attr, original)
+        self._patched = []
+        self.enabled = False
+
+    def reset(self):
+        # Zera no lugar: os embrulhos instalados guardam as instâncias
+        for metric in self.metrics.values():
+            metric.calls = metric.total_ns = metric.max_ns = 0
+        self.frames.clear()
+        self.frame_count = 0
+        self.frame_total_ns = 0
+        self.painted_total = 0
+        self._painted = 0
+        self._started_ns = time.perf_counter_ns() if self.enabled else None
+
+    def _wrap(self, name, func, painted):
+        metric = self.metrics.setdefault(name, Metric())
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metric.add(time.perf_counter_ns() - start)
+                if painted:
+                    self._painted += 1
+        return wrapper
+
+    @contextmanager
+    def frame(self):
+        """Mede um quadro da view e os itens pintados nele."""
+        self._painted = 0
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self.frames.append((elapsed, self._painted))
+            self.frame_count += 1
+            self.frame_total_ns += elapsed
+            self.painted_total += self._painted
+
+    def calls(self, name):
+        metric = self.metrics.get(name)
+        return metric.calls if metric is not None else 0
+
+    def report(self):
+        """Relatório exportável: métricas por caminho e resumo dos quadros."""
+        durations = sorted(d for d, _ in self.frames)
+        elapsed_s = (time.perf_counter_ns() - self._started_ns) / 1e9 if self._started_ns else 0.0
+        return {
+            "elapsed_s": elapsed_s,
+            "frames": {
+                "count": self.frame_count,
+                "mean_ms": self.frame_total_ns / self.frame_count / 1e6 if self.frame_count else 0.0,
+                "p95_ms": durations[min(len(durations) - 1, int(len(durations) * 0.95))] / 1e6 if durations else 0.0,
+                "max_ms": durations[-1] / 1e6 if durations else 0.0,
+                "items_painted_mean": self.painted_total / self.frame_count if self.frame_count else 0.0,
+            },
+            "metrics": {
+                name: metric.to_dict()
+                for name, metric in sorted(self.metrics.items(), key=lambda kv: -kv[1].total_ns)
+            },
+        }
+
+    def write_report(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+
+metrics = Instrumentation()
+
+
+def enable_from_env():
+    if os.environ.get(INSTRUMENT_ENV, "").strip() not in ("", "0"):
+        metrics.enable()
+    return metrics.enabled
+
+
+class PerformanceHud(QLabel):
+    """Sobreposição no canto da view com as taxas desde a última atualização."""
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAutoFillBackground(True)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 190); color: #9fe870;"
+            "font-family: monospace; padding: 6px; border-radius: 4px;"
+        )
+        self.move(10, 10)
+        self._last = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(HUD_REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def showEvent(self, event):
+        self._last = None
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        now = time.perf_counter_ns()
+        current = (now, metrics.frame_count, metrics.frame_total_ns,
+                   metrics.painted_total, metrics.calls(REROUTE_METRIC))
+        if self._last is None:
+            self._last = current
+            self.setText("Medindo...")
+            self.adjustSize()
+            return
+        dt = (now - self._last[0]) / 1e9 or 1e-9
+        frames = current[1] - self._last[1]
+        frame_ns = current[2] - self._last[2]
+        painted = current[3] - self._last[3]
+        reroutes = current[4] - self._last[4]
+        self._last = current
+
+        lines = [
+            f"FPS {frames / dt:5.1f}   {frame_ns / frames / 1e6 if frames else 0.0:6.2f} ms/quadro",
+            f"rotas/s {reroutes / dt:6.1f}   itens pintados {painted / frames if frames else 0:6.0f}",
+        ]
+        slowest = sorted(metrics.metrics.items(), key=lambda kv: -kv[1].total_ns)[:3]
+        for name, metric in slowest:
+            if metric.calls:
+                lines.append(f"{name:<36} {metric.total_ns / metric.calls / 1e6:7.3f} ms")
+        self.setText("\n".join(lines))
+        self.adjustSize()
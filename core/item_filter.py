@@ -1,89 +1,572 @@
 """
 Filtro e seleção de registros/itens
+
+As consultas são compostas por cláusulas (tipo, texto, cor, região, grau,
+ligado a, mídia, sombra) e compiladas em um plano: cada cláusula é
+resolvida por um índice (tipo → conjunto, índice espacial da cena para
+região, índice invertido para texto, adjacência para grau/ligações) e os
+conjuntos são intersectados do menor para o maior. Quando sobram poucos
+candidatos, as cláusulas restantes viram testes item a item.
+
+Linguagem de consulta (termos soltos são texto):
+    tipo:Azul  cor:#ff0000  grau:>=2  grau:1..3  ligado:"texto do vizinho"
+    midia:sim  sombra:nao  regiao:x,y,largura,altura
 """
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
 from typing import List, Callable
+
+from PySide6.QtCore import QRectF, Qt
+
 from items.shapes import StyledNode
+from items.node_styles import NODE_COLORS
+from items.media import MediaItem
+from core.connection import SmartConnection
+from core.search_index import search_index_for, normalize
+from core.scene_stats import attached_stats
+
+# Abaixo disso, cláusulas caras viram testes por item em vez de consultas ao índice
+PREDICATE_THRESHOLD = 32
+
+_CLAUSE_RE = re.compile(r'(\w+):("[^"]*"|\S+)')
+_KEY_ALIASES = {
+    "tipo": "type", "type": "type",
+    "cor": "color", "color": "color",
+    "grau": "degree", "degree": "degree",
+    "ligado": "connected", "connected": "connected",
+    "midia": "media", "media": "media",
+    "sombra": "shadow", "shadow": "shadow",
+    "regiao": "region", "region": "region",
+    "texto": "text", "text": "text",
+}
+_YES = {"sim", "s", "yes", "y", "true", "1"}
+
+
+def node_color_key(node):
+    """Cor de fundo efetiva do nó em hex minúsculo."""
+    if node.custom_color:
+        return node.custom_color.lower()
+    colors = NODE_COLORS.get(node.node_type)
+    return colors["light"].lower() if colors else ""
+
+
+def _parse_degree(value):
+    """'2', '>=2', '<3', '1..3' → (mínimo, máximo)."""
+    value = value.strip()
+    if ".." in value:
+        lo, hi = value.split("..", 1)
+        return int(lo or 0), int(hi) if hi else None
+    for op, bounds in ((">=", lambda n: (n, None)), ("<=", lambda n: (0, n)),
+                       (">", lambda n: (n + 1, None)), ("<", lambda n: (0, n - 1))):
+        if value.startswith(op):
+            return bounds(int(value[len(op):]))
+    n = int(value)
+    return n, n
+
+
+class SceneSnapshot:
+    """
+    Índices por atributo dos nós de uma cena (tipo, cor, vizinhança).
+
+    Montado com uma varredura de scene.items(); associado à cena por
+    snapshot_for, passa a ser mantido pelos eventos das estatísticas da
+    cena (SceneStatistics.add_observer) em vez de remontado por consulta.
+    """
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.clear()
+        for item in scene.items():
+            if isinstance(item, StyledNode):
+                self.node_added(item)
+        for item in scene.items():
+            if isinstance(item, SmartConnection):
+                self.connection_added(item)
+
+    def clear(self):
+        self.nodes = {}
+        self.connections = {}
+        self._by_type = {}
+        self._by_color = {}
+        self._indexed = {}       # chave do nó → (tipo, cor) sob os quais está indexado
+        self._links = {}         # chave do nó → Counter das chaves dos nós vizinhos
+        self._media_links = Counter()  # chave do nó → conexões com itens de mídia
+
+    # -------------------------------
+    # EVENTOS (SceneStatistics)
+    # -------------------------------
+    def node_added(self, node):
+        key = id(node)
+        if key in self.nodes:
+            return
+        self.nodes[key] = node
+        self._index(key, node)
+
+    def node_removed(self, node):
+        key = id(node)
+        if self.nodes.pop(key, None) is None:
+            return
+        self._unindex(key)
+
+    def node_type_changed(self, node, _old_type=None, _new_type=None):
+        key = id(node)
+        if key in self.nodes:
+            self._unindex(key)
+            self._index(key, node)
+
+    node_color_changed = node_type_changed
+
+    def connection_added(self, connection):
+        if id(connection) in self.connections:
+            return
+        self.connections[id(connection)] = connection
+        self._link(connection, +1)
+
+    def connection_removed(self, connection):
+        if self.connections.pop(id(connection), None) is not None:
+            self._link(connection, -1)
+
+    def _index(self, key, node):
+        node_type, color = node.node_type, node_color_key(node)
+        self._indexed[key] = (node_type, color)
+        self._by_type.setdefault(node_type, set()).add(key)
+        self._by_color.setdefault(color, set()).add(key)
+
+    def _unindex(self, key):
+        node_type, color = self._indexed.pop(key)
+        for index, value in ((self._by_type, node_type), (self._by_color, color)):
+            keys = index.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[value]
+
+    def _link(self, connection, delta):
+        source, target = connection.source, connection.target
+        for end, other in ((source, target), (target, source)):
+            if not isinstance(end, StyledNode):
+                continue
+            key = id(end)
+            if isinstance(other, MediaItem):
+                counter, other_key = self._media_links, key
+            elif isinstance(other, StyledNode):
+                counter, other_key = self._links.setdefault(key, Counter()), id(other)
+            else:
+                continue
+            counter[other_key] += delta
+            if counter[other_key] <= 0:
+                del counter[other_key]
+            if not self._links.get(key, True):
+                del self._links[key]
+
+    # -------------------------------
+    # CONSULTA
+    # -------------------------------
+    def all_keys(self):
+        return set(self.nodes)
+
+    def by_type(self):
+        return self._by_type
+
+    def by_color(self):
+        return self._by_color
+
+    def neighbours(self, key):
+        """Chaves dos nós ligados ao nó (conexões entre StyledNode)."""
+        return [k for k in self._links.get(key, ()) if k in self.nodes]
+
+    def degree(self, key):
+        return len(self.neighbours(key))
+
+    def has_media_neighbour(self, key):
+        return key in self._media_links
+
+
+def attached_snapshot(scene):
+    """Snapshot já associado à cena, ou None (não cria)."""
+    if scene is None:
+        return None
+    return getattr(scene, "_scene_snapshot", None)
+
+
+def snapshot_for(scene):
+    """
+    Snapshot mantido da cena. Sem estatísticas associadas (nenhum evento
+    chega), monta um novo a cada chamada.
+    """
+    snap = attached_snapshot(scene)
+    if snap is not None:
+        return snap
+    snap = SceneSnapshot(scene)
+    stats = attached_stats(scene)
+    if stats is not None:
+        stats.add_observer(snap)
+        scene._scene_snapshot = snap
+    return snap
+
+
+class Clause(ABC):
+    """Cláusula de consulta: consulta ao índice (`lookup`) ou teste por item (`matches`)."""
+    # Custo relativo da consulta ao índice; cláusulas baratas rodam primeiro
+    cost = 1
+
+    @abstractmethod
+    def lookup(self, snap):
+        """Chaves dos nós do snapshot que satisfazem a cláusula."""
+
+    def matches(self, node, snap):
+        return id(node) in self.lookup(snap)
+
+    def reset(self):
+        """Descarta resultados guardados de uma execução anterior."""
+
+
+class TypeClause(Clause):
+    def __init__(self, node_type):
+        self.node_type = node_type
+
+    def lookup(self, snap):
+        return snap.by_type().get(self.node_type, set())
+
+    def matches(self, node, snap):
+        return node.node_type == self.node_type
+
+
+class ColorClause(Clause):
+    def __init__(self, color):
+        self.color = color.lower()
+
+    def lookup(self, snap):
+        return snap.by_color().get(self.color, set())
+
+    def matches(self, node, snap):
+        return node_color_key(node) == self.color
+
+
+class ShadowClause(Clause):
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+    def lookup(self, snap):
+        return {k for k, n in snap.nodes.items() if bool(n.has_shadow) == self.enabled}
+
+    def matches(self, node, snap):
+        return bool(node.has_shadow) == self.enabled
+
+
+class MediaClause(Clause):
+    """Nó com imagem/vídeo incorporado ou ligado a um item de mídia."""
+    cost = 2
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+    def _has_media(self, key, node, snap):
+        return bool(node._embedded_image or node._media_proxy) or snap.has_media_neighbour(key)
+
+    def lookup(self, snap):
+        return {k for k, n in snap.nodes.items() if self._has_media(k, n, snap) == self.enabled}
+
+    def matches(self, node, snap):
+        return self._has_media(id(node), node, snap) == self.enabled
+
+
+class DegreeClause(Clause):
+    cost = 2
+
+    def __init__(self, minimum=0, maximum=None):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def _ok(self, degree):
+        return degree >= self.minimum and (self.maximum is None or degree <= self.maximum)
+
+    def lookup(self, snap):
+        return {k for k in snap.nodes if self._ok(snap.degree(k))}
+
+    def matches(self, node, snap):
+        return self._ok(snap.degree(id(node)))
+
+
+class ConnectedToClause(Clause):
+    """Vizinhos de um nó, ou de qualquer nó que case com um texto."""
+    cost = 3
+
+    def __init__(self, target):
+        self.target = target
+        self._cached = None
+
+    def reset(self):
+        self._cached = None
+
+    def matches(self, node, snap):
+        if self._cached is None:
+            self._cached = self.lookup(snap)
+        return id(node) in self._cached
+
+    def lookup(self, snap):
+        if isinstance(self.target, str):
+            anchors = [id(n) for n in search_index_for(snap.scene).search(self.target)]
+        else:
+            anchors = [id(self.target)]
+        result = set()
+        for key in anchors:
+            result.update(snap.neighbours(key))
+        return result
+
+
+class RegionClause(Clause):
+    """Nós cuja posição está dentro do retângulo (índice espacial da cena)."""
+    cost = 3
+
+    def __init__(self, rect):
+        self.rect = QRectF(rect)
+
+    def lookup(self, snap):
+        return {
+            id(item) for item in snap.scene.items(self.rect, Qt.IntersectsItemBoundingRect)
+            if id(item) in snap.nodes and self.matches(item, snap)
+        }
+
+    def matches(self, node, snap):
+        pos = node.pos()
+        r = self.rect
+        return r.left() <= pos.x() <= r.right() and r.top() <= pos.y() <= r.bottom()
+
+
+class TextClause(Clause):
+    """Texto pelo índice invertido; define a ordem de relevância do resultado."""
+    cost = 4
+
+    def __init__(self, text):
+        self.text = text
+        self._cached = None
+
+    def reset(self):
+        self._cached = None
+
+    def ranked(self, snap):
+        if self._cached is None:
+            self._cached = [id(n) for n in search_index_for(snap.scene).search(self.text)]
+        return self._cached
+
+    def lookup(self, snap):
+        return set(self.ranked(snap))
+
+
+class PredicateClause(Clause):
+    """Função arbitrária (filtros antigos de add_filter)."""
+    cost = 10
+
+    def __init__(self, func):
+        self.func = func
+
+    def lookup(self, snap):
+        return {k for k, n in snap.nodes.items() if self.func(n)}
+
+    def matches(self, node, snap):
+        return self.func(node)
+
+
+class Query:
+    """Consulta composta; cada método acrescenta uma cláusula (AND)."""
+
+    def __init__(self, clauses=None):
+        self.clauses = list(clauses or [])
+
+    def __bool__(self):
+        return bool(self.clauses)
+
+    def type(self, node_type):
+        self.clauses.append(TypeClause(node_type))
+        return self
+
+    def text(self, text):
+        if text.strip():
+            self.clauses.append(TextClause(text))
+        return self
+
+    def color(self, color):
+        self.clauses.append(ColorClause(color))
+        return self
+
+    def region(self, rect):
+        self.clauses.append(RegionClause(rect))
+        return self
+
+    def degree(self, minimum=0, maximum=None):
+        self.clauses.append(DegreeClause(minimum, maximum))
+        return self
+
+    def connected_to(self, target):
+        self.clauses.append(ConnectedToClause(target))
+        return self
+
+    def has_media(self, enabled=True):
+        self.clauses.append(MediaClause(enabled))
+        return self
+
+    def has_shadow(self, enabled=True):
+        self.clauses.append(ShadowClause(enabled))
+        return self
+
+    def where(self, func: Callable[[StyledNode], bool]):
+        self.clauses.append(PredicateClause(func))
+        return self
+
+    @classmethod
+    def parse(cls, text):
+        """Converte a linguagem de consulta em Query; chaves inválidas viram texto."""
+        query = cls()
+        free = []
+        pos = 0
+        for m in _CLAUSE_RE.finditer(text):
+            free.append(text[pos:m.start()])
+            pos = m.end()
+            key = _KEY_ALIASES.get(normalize(m.group(1)))
+            value = m.group(2).strip('"')
+            try:
+                if key is None:
+                    raise ValueError(m.group(0))
+                if key == "type":
+                    match = [t for t in NODE_COLORS if normalize(t) == normalize(value)]
+                    query.type(match[0] if match else value)
+                elif key == "color":
+                    query.color(value if value.startswith("#") else "#" + value)
+                elif key == "degree":
+                    query.degree(*_parse_degree(value))
+                elif key == "connected":
+                    query.connected_to(value)
+                elif key == "media":
+                    query.has_media(normalize(value) in _YES)
+                elif key == "shadow":
+                    query.has_shadow(normalize(value) in _YES)
+                elif key == "region":
+                    x, y, w, h = (float(v) for v in value.split(","))
+                    query.region(QRectF(x, y, w, h))
+                else:
+                    query.text(value)
+            except ValueError:
+                free.append(m.group(0))
+        free.append(text[pos:])
+        query.text(" ".join(part.strip() for part in free if part.strip()))
+        return query
+
+    def compile(self):
+        """Plano: cláusulas ordenadas pelo custo da consulta ao índice."""
+        return sorted(self.clauses, key=lambda c: c.cost)
+
+    def execute(self, scene, limit=None) -> List[StyledNode]:
+        snap = snapshot_for(scene)
+        plan = self.compile()
+        for clause in plan:
+            clause.reset()
+        candidates = None
+        for clause in plan:
+            if candidates is not None and len(candidates) <= PREDICATE_THRESHOLD \
+                    and not isinstance(clause, TextClause):
+                candidates = {k for k in candidates if clause.matches(snap.nodes[k], snap)}
+            else:
+                found = clause.lookup(snap)
+                candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return []
+        if candidates is None:
+            candidates = snap.all_keys()
+
+        text = next((c for c in plan if isinstance(c, TextClause)), None)
+        if text is not None:
+            keys = [k for k in text.ranked(snap) if k in candidates]
+        else:
+            # Ordem estável: de cima para baixo, da esquerda para a direita
+            keys = sorted(candidates, key=lambda k: (snap.nodes[k].y(), snap.nodes[k].x()))
+        if limit is not None:
+            keys = keys[:limit]
+        return [snap.nodes[k] for k in keys]
 
 
 class ItemFilter:
     """Filtro para seleção de itens da cena"""
-    
+
     def __init__(self, scene):
         self.scene = scene
         self.filters = []
-    
-    def add_filter(self, filter_func: Callable[[StyledNode], bool]):
-        """Adiciona um filtro à lista"""
+
+    def add_filter(self, filter_func):
+        """Adiciona um filtro (função ou Query) à lista"""
         self.filters.append(filter_func)
-    
+
     def clear_filters(self):
         """Remove todos os filtros"""
         self.filters = []
-    
+
+    def query(self, query, limit=None) -> List[StyledNode]:
+        """Executa uma Query ou um texto na linguagem de consulta"""
+        if isinstance(query, str):
+            query = Query.parse(query)
+        return query.execute(self.scene, limit)
+
     def get_filtered_items(self) -> List[StyledNode]:
         """Retorna itens que passam em todos os filtros"""
-        items = [item for item in self.scene.items() if isinstance(item, StyledNode)]
-        
-        for filter_func in self.filters:
-            items = [item for item in items if filter_func(item)]
-        
-        return items
-    
+        combined = Query()
+        for f in self.filters:
+            if isinstance(f, Query):
+                combined.clauses.extend(f.clauses)
+            else:
+                combined.where(f)
+        return combined.execute(self.scene)
+
     def select_filtered_items(self):
         """Seleciona itens que passam nos filtros"""
+        self._select(self.get_filtered_items())
+
+    def _select(self, items):
         self.scene.clearSelection()
-        for item in self.get_filtered_items():
+        for item in items:
             item.setSelected(True)
-    
+
     # Filtros predefinidos
     def filter_by_type(self, node_type: str) -> List[StyledNode]:
         """Filtra por tipo de nó"""
-        return [item for item in self.scene.items() 
-                if isinstance(item, StyledNode) and item.node_type == node_type]
-    
+        return Query().type(node_type).execute(self.scene)
+
     def filter_by_text(self, search_text: str) -> List[StyledNode]:
-        """Filtra por texto contido no nó"""
+        """Filtra por texto contido no nó (trecho, sem diferenciar maiúsculas)"""
+        # Trecho literal, não a busca por termos de Query.text: "ap" encontra "mapa"
         search_text = search_text.lower()
-        return [item for item in self.scene.items() 
-                if isinstance(item, StyledNode) and search_text in item.get_text().lower()]
-    
+        return Query().where(lambda node: search_text in node.get_text().lower()).execute(self.scene)
+
     def filter_by_position(self, x_min: float, y_min: float, x_max: float, y_max: float) -> List[StyledNode]:
         """Filtra por posição/região"""
-        return [item for item in self.scene.items() 
-                if isinstance(item, StyledNode) 
-                and x_min <= item.pos().x() <= x_max 
-                and y_min <= item.pos().y() <= y_max]
-    
+        rect = QRectF(x_min, y_min, x_max - x_min, y_max - y_min)
+        return Query().region(rect).execute(self.scene)
+
     def filter_with_shadow(self) -> List[StyledNode]:
         """Filtra itens com sombra"""
-        return [item for item in self.scene.items() 
-                if isinstance(item, StyledNode) and item.has_shadow]
-    
+        return Query().has_shadow().execute(self.scene)
+
     def select_by_type(self, node_type: str):
         """Seleciona todos os itens de um tipo específico"""
-        self.scene.clearSelection()
-        for item in self.filter_by_type(node_type):
-            item.setSelected(True)
-    
+        self._select(self.filter_by_type(node_type))
+
     def select_by_text(self, search_text: str):
         """Seleciona todos os itens que contêm o texto"""
-        self.scene.clearSelection()
-        for item in self.filter_by_text(search_text):
-            item.setSelected(True)
-    
+        self._select(self.filter_by_text(search_text))
+
     def get_statistics(self) -> dict:
         """Retorna estatísticas sobre os itens da cena"""
-        items = [item for item in self.scene.items() if isinstance(item, StyledNode)]
-        
-        type_counts = {}
-        for item in items:
-            type_counts[item.node_type] = type_counts.get(item.node_type, 0) + 1
-        
-        shadow_count = len([item for item in items if item.has_shadow])
-        
+        stats = attached_stats(self.scene)
+        if stats is not None:
+            # Contadores incrementais: sem varrer a cena
+            return stats.snapshot()
+        snap = SceneSnapshot(self.scene)
+        type_counts = {t: len(keys) for t, keys in snap.by_type().items()}
+        shadow_count = len(ShadowClause(True).lookup(snap))
+
         return {
-            "total_items": len(items),
+            "total_items": len(snap.nodes),
             "type_breakdown": type_counts,
             "items_with_shadow": shadow_count,
-            "items_without_shadow": len(items) - shadow_count
+            "items_without_shadow": len(snap.nodes) - shadow_count
         }
@@ -0,0 +1,537 @@
+"""
+Layout automático do mapa (árvore hierárquica, radial e dirigido por forças).
+
+Os algoritmos trabalham apenas sobre arrays NumPy (centros, tamanhos e
+arestas) extraídos da cena pelo build_layout_graph, por isso podem rodar
+em uma thread de trabalho (LayoutWorker) sem tocar em itens gráficos. A
+aplicação das posições (animação e undo) fica a cargo da janela principal.
+
+Novos algoritmos podem ser adicionados com register_layout().
+"""
+import math
+import time
+
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+
+# Espaçamento padrão entre nós
+LAYOUT_GAP = 40.0
+# Tempo máximo da simulação de forças (segundos)
+FORCE_TIME_BUDGET = 8.0
+
+
+class LayoutGraph:
+    """
+    Instantâneo do grafo da cena.
+
+    Attributes:
+        items: itens gráficos, na mesma ordem dos arrays (uso na thread principal)
+        centers: (n, 2) centros atuais em coordenadas de cena
+        sizes: (n, 2) largura e altura
+        edges: (m, 2) índices (origem, destino) das conexões
+    """
+
+    def __init__(self, items, centers, sizes, edges):
+        self.items = items
+        self.centers = centers
+        self.sizes = sizes
+        self.edges = edges
+
+    def __len__(self):
+        return len(self.items)
+
+
+def build_layout_graph(scene, items=None):
+    """
+    Extrai nós (StyledNode e mídias de topo) e conexões da cena.
+
+    Args:
+        scene: QGraphicsScene
+        items: restringe o layout a estes itens (as conexões consideradas são
+            apenas as que ligam dois deles)
+    """
+    from items.shapes import StyledNode
+    from items.media import MediaItem
+    from core.connection import SmartConnection
+
+    if items is None:
+        items = [it for it in scene.items()
+                 if isinstance(it, (StyledNode, MediaItem)) and it.parentItem() is None]
+    # Ordem estável entre execuções (scene.items() depende do índice espacial)
+    items = sorted(items, key=lambda it: (it.scenePos().y(), it.scenePos().x()))
+    index = {id(it): i for i, it in enumerate(items)}
+
+    centers = np.zeros((len(items), 2))
+    sizes = np.zeros((len(items), 2))
+    for i, it in enumerate(items):
+        r = it.sceneBoundingRect()
+        centers[i] = (r.center().x(), r.center().y())
+        sizes[i] = (r.width(), r.height())
+
+    edges = []
+    for it in scene.items():
+        if isinstance(it, SmartConnection):
+            a = index.get(id(it.source))
+            b = index.get(id(it.target))
+            if a is not None and b is not None and a != b:
+                edges.append((a, b))
+    edges = np.array(edges, dtype=int).reshape(-1, 2)
+    return LayoutGraph(items, centers, sizes, edges)
+
+
+# ------------------------------------------------------------------
+# Estrutura de árvore comum aos layouts hierárquico e radial
+# ------------------------------------------------------------------
+def _adjacency(n, edges):
+    out = [[] for _ in range(n)]
+    und = [[] for _ in range(n)]
+    for a, b in edges:
+        out[a].append(b)
+        und[a].append(b)
+        und[b].append(a)
+    return out, und
+
+
+def _spanning_forest(n, edges, root_order, child_key):
+    """
+    Floresta geradora por BFS. Segue primeiro a direção das conexões
+    (origem → destino) e depois as ligações no sentido inverso, para que
+    nenhum nó fique de fora.
+
+    Returns:
+        (roots, parent, children, order) com `order` em ordem de BFS
+    """
+    out, und = _adjacency(n, edges)
+    parent = np.full(n, -1, dtype=int)
+    visited = np.zeros(n, dtype=bool)
+    children = [[] for _ in range(n)]
+    roots, order = [], []
+
+    for root in root_order:
+        if visited[root]:
+            continue
+        visited[root] = True
+        roots.append(root)
+        queue = [root]
+        head = 0
+        while head < len(queue):
+            v = queue[head]
+            head += 1
+            order.append(v)
+            kids = []
+            for w in out[v] + und[v]:
+                if not visited[w]:
+                    visited[w] = True
+                    parent[w] = v
+                    kids.append(w)
+            kids.sort(key=child_key)
+            children[v] = kids
+            queue.extend(kids)
+    return roots, parent, children, order
+
+
+def _depths(roots, children, n):
+    depth = np.zeros(n, dtype=int)
+    stack = list(roots)
+    while stack:
+        v = stack.pop()
+        for w in children[v]:
+            depth[w] = depth[v] + 1
+            stack.append(w)
+    return depth
+
+
+def _keep_anchor(new_centers, old_centers, anchor):
+    """Translada o resultado para que o nó âncora não saia do lugar."""
+    return new_centers + (old_centers[anchor] - new_centers[anchor])
+
+
+def tree_layout(centers, sizes, edges, gap=LAYOUT_GAP, level_gap=None, **_):
+    """Árvore hierárquica de cima para baixo (subárvores lado a lado)."""
+    n = len(centers)
+    if n == 0:
+        return centers.copy()
+    level_gap = level_gap if level_gap is not None else gap * 2
+
+    indeg = np.bincount(edges[:, 1], minlength=n) if len(edges) else np.zeros(n, dtype=int)
+    # Raízes: sem conexões de entrada, de cima para baixo e da esquerda para a direita
+    root_order = sorted(range(n), key=lambda i: (indeg[i] > 0, centers[i, 1], centers[i, 0]))
+    roots, _parent, children, order = _spanning_forest(
+        n, edges, root_order, child_key=lambda i: centers[i, 0]
+    )
+    depth = _depths(roots, children, n)
+
+    # Largura de cada subárvore (folhas primeiro)
+    span = sizes[:, 0].copy()
+    for v in reversed(order):
+        kids = children[v]
+        if kids:
+            total = sum(span[w] for w in kids) + gap * (len(kids) - 1)
+            span[v] = max(span[v], total)
+
+    # Altura de cada nível
+    level_h = np.zeros(depth.max() + 1)
+    np.maximum.at(level_h, depth, sizes[:, 1])
+    level_y = np.concatenate(([0.0], np.cumsum(level_h + level_gap)[:-1])) + level_h / 2
+
+    new = np.zeros_like(centers)
+    cursor = 0.0
+    for root in roots:
+        new[root, 0] = cursor + span[root] / 2
+        cursor += span[root] + gap * 2
+    for v in order:
+        new[v, 1] = level_y[depth[v]]
+        kids = children[v]
+        if kids:
+            total = sum(span[w] for w in kids) + gap * (len(kids) - 1)
+            x = new[v, 0] - total / 2
+            for w in kids:
+                new[w, 0] = x + span[w] / 2
+                x += span[w] + gap
+    return _keep_anchor(new, centers, roots[0])
+
+
+def radial_layout(centers, sizes, edges, gap=LAYOUT_GAP, **_):
+    """Mapa mental radial: raiz no centro, cada nível em um anel."""
+    n = len(centers)
+    if n == 0:
+        return centers.copy()
+
+    degree = np.zeros(n, dtype=int)
+    if len(edges):
+        degree += np.bincount(edges[:, 0], minlength=n) + np.bincount(edges[:, 1], minlength=n)
+    root_order = sorted(range(n), key=lambda i: (-degree[i], centers[i, 1], centers[i, 0]))
+
+    # Filhos ordenados pelo ângulo atual em torno do centro do mapa
+    cx, cy = centers.mean(axis=0)
+
+    def angle_key(i):
+        return math.atan2(centers[i, 1] - cy, centers[i, 0] - cx)
+
+    roots, _parent, children, order = _spanning_forest(n, edges, root_order, angle_key)
+    depth = _depths(roots, children, n)
+    diag = np.hypot(sizes[:, 0], sizes[:, 1])
+
+    # Peso de cada subárvore = número de folhas
+    leaves = np.ones(n)
+    for v in reversed(order):
+        if children[v]:
+            leaves[v] = sum(leaves[w] for w in children[v])
+
+    # Componente de cada vértice e a ordem de visita repartida por componente
+    # (uma passada só, em vez de filtrar `order` inteira para cada raiz)
+    component_of = np.empty(n, dtype=int)
+    for c, root in enumerate(roots):
+        stack = [root]
+        while stack:
+            v = stack.pop()
+            component_of[v] = c
+            stack.extend(children[v])
+    visits = [[] for _ in roots]
+    for v in order:
+        visits[component_of[v]].append(v)
+
+    new = np.zeros_like(centers)
+    components = []
+    for root, visit in zip(roots, visits):
+        members = np.array(visit)
+
+        # Raio de cada anel: afastado do anterior e com perímetro suficiente
+        max_depth = depth[members].max()
+        radius = np.zeros(max_depth + 1)
+        for d in range(1, max_depth + 1):
+            ring = members[depth[members] == d]
+            prev = members[depth[members] == d - 1]
+            min_step = (diag[prev].max() + diag[ring].max()) / 2 + gap
+            perimeter = (diag[ring].sum() + gap * len(ring)) / (2 * math.pi)
+            radius[d] = max(radius[d - 1] + min_step, perimeter)
+
+        # Setores angulares proporcionais às folhas
+        wedge = {root: (0.0, 2 * math.pi)}
+        for v in visit:
+            start, end = wedge[v]
+            kids = children[v]
+            if not kids:
+                continue
+            total = sum(leaves[w] for w in kids)
+            a = start
+            for w in kids:
+                share = (end - start) * leaves[w] / total
+                wedge[w] = (a, a + share)
+                mid = a + share / 2
+                new[w] = (radius[depth[w]] * math.cos(mid), radius[depth[w]] * math.sin(mid))
+                a += share
+        components.append(members)
+
+    # Componentes desconexos lado a lado, em ordem
+    offset_x = 0.0
+    for members in components:
+        half_w = sizes[members, 0] / 2
+        left = (new[members, 0] - half_w).min()
+        right = (new[members, 0] + half_w).max()
+        new[members, 0] += offset_x - left
+        offset_x += (right - left) + gap * 3
+    return _keep_anchor(new, centers, roots[0])
+
+
+# ------------------------------------------------------------------
+# Dirigido por forças (Fruchterman-Reingold com grade espacial)
+# ------------------------------------------------------------------
+def neighbour_pairs(pos, cell):
+    """
+    Pares (i, j), i != j, de pontos em células vizinhas de uma grade de lado
+    `cell`. Cada par não ordenado aparece nos dois sentidos.
+    """
+    n = len(pos)
+    if n < 2:
+        empty = np.zeros(0, dtype=int)
+        return empty, empty
+    origin = pos.min(axis=0)
+    gx = np.floor((pos[:, 0] - origin[0]) / cell).astype(np.int64) + 1
+    gy = np.floor((pos[:, 1] - origin[1]) / cell).astype(np.int64) + 1
+    stride = gy.max() + 2
+    key = gx * stride + gy
+
+    order = np.argsort(key, kind="stable")
+    uniq, start, counts = np.unique(key[order], return_index=True, return_counts=True)
+
+    pi, pj = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            target = key + dx * stride + dy
+            slot = np.searchsorted(uniq, target)
+            slot_c = np.minimum(slot, len(uniq) - 1)
+            found = (slot < len(uniq)) & (uniq[slot_c] == target)
+            src = np.nonzero(found)[0]
+            if src.size == 0:
+                continue
+            s = start[slot_c[src]]
+            c = counts[slot_c[src]]
+            # Expansão vetorizada dos intervalos [s, s + c)
+            first = np.repeat(np.cumsum(c) - c, c)
+            offs = np.arange(c.sum()) - first
+            pi.append(np.repeat(src, c))
+            pj.append(order[np.repeat(s, c) + offs])
+    i = np.concatenate(pi)
+    j = np.concatenate(pj)
+    keep = i != j
+    return i[keep], j[keep]
+
+
+def remove_overlaps(centers, sizes, gap=LAYOUT_GAP / 2, iterations=50, movable=None,
+                    deadline=None):
+    """Afasta retângulos sobrepostos pelo eixo de menor sobreposição."""
+    pos = centers.copy()
+    n = len(pos)
+    if n < 2:
+        return pos
+    if movable is None:
+        movable = np.ones(n, dtype=bool)
+    cell = sizes.max() + gap
+    for _ in range(iterations):
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        i, j = neighbour_pairs(pos, cell)
+        keep = i < j
+        i, j = i[keep], j[keep]
+        d = pos[i] - pos[j]
+        ox = (sizes[i, 0] + sizes[j, 0]) / 2 + gap - np.abs(d[:, 0])
+        oy = (sizes[i, 1] + sizes[j, 1]) / 2 + gap - np.abs(d[:, 1])
+        hit = (ox > 0) & (oy > 0)
+        if not hit.any():
+            break
+        i, j, d, ox, oy = i[hit], j[hit], d[hit], ox[hit], oy[hit]
+        along_x = ox < oy
+        sx = np.where(d[:, 0] >= 0, 1.0, -1.0)
+        sy = np.where(d[:, 1] >= 0, 1.0, -1.0)
+        push = np.zeros((len(i), 2))
+        push[along_x, 0] = sx[along_x] * ox[along_x]
+        push[~along_x, 1] = sy[~along_x] * oy[~along_x]
+
+        # Quem não pode se mover transfere todo o deslocamento ao outro
+        share_i = np.where(movable[j], 0.5, 1.0) * movable[i]
+        share_j = np.where(movable[i], 0.5, 1.0) * movable[j]
+        disp = np.zeros_like(pos)
+        for axis in (0, 1):
+            disp[:, axis] += np.bincount(i, weights=push[:, axis] * share_i, minlength=n)
+            disp[:, axis] -= np.bincount(j, weights=push[:, axis] * share_j, minlength=n)
+        pos += disp
+    return pos
+
+
+def force_step(pos, sizes, edges, k, temperature, movable=None, gravity=0.02):
+    """Uma iteração de Fruchterman-Reingold; retorna o novo array de posições."""
+    n = len(pos)
+    disp = np.zeros_like(pos)
+
+    # Repulsão apenas entre vizinhos da grade (alcance 2k)
+    i, j = neighbour_pairs(pos, 2 * k)
+    if i.size:
+        delta = pos[i] - pos[j]
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        near = dist < 2 * k
+        i, delta, dist = i[near], delta[near], np.maximum(dist[near], 0.01)
+        force = (k * k) / dist
+        for axis in (0, 1):
+            disp[:, axis] += np.bincount(i, weights=delta[:, axis] / dist * force, minlength=n)
+
+    # Atração ao longo das conexões
+    if len(edges):
+        a, b = edges[:, 0], edges[:, 1]
+        delta = pos[a] - pos[b]
+        dist = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 0.01)
+        force = dist * dist / k
+        for axis in (0, 1):
+            f = delta[:, axis] / dist * force
+            disp[:, axis] -= np.bincount(a, weights=f, minlength=n)
+            disp[:, axis] += np.bincount(b, weights=f, minlength=n)
+
+    # Leve gravidade para manter componentes desconexos próximos
+    disp -= (pos - pos.mean(axis=0)) * gravity
+
+    length = np.maximum(np.hypot(disp[:, 0], disp[:, 1]), 0.01)
+    step = disp / length[:, None] * np.minimum(length, temperature)[:, None]
+    if movable is not None:
+        step[~movable] = 0.0
+    return pos + step
+
+
+def force_layout(centers, sizes, edges, iterations=None, gap=LAYOUT_GAP,
+                 time_budget=FORCE_TIME_BUDGET, seed=0, **_):
+    """Layout dirigido por forças, partindo das posições atuais."""
+    n = len(centers)
+    if n < 2:
+        return centers.copy()
+    if iterations is None:
+        iterations = 250 if n <= 1000 else 120
+
+    rng = np.random.default_rng(seed)
+    pos = centers + rng.uniform(-1.0, 1.0, centers.shape)
+    k = float(np.hypot(sizes[:, 0], sizes[:, 1]).mean()) + gap
+    temperature = k * 2
+    cooling = (0.02 / 2) ** (1.0 / iterations)  # de 2k até ~0.02k
+
+    deadline = time.perf_counter() + time_budget
+    for _ in range(iterations):
+        pos = force_step(pos, sizes, edges, k, temperature)
+        temperature *= cooling
+        if time.perf_counter() > deadline:
+            break
+
+    pos = remove_overlaps(pos, sizes, gap / 2)
+    # Mantém o centro de massa onde estava
+    return pos + (centers.mean(axis=0) - pos.mean(axis=0))
+
+
+# ------------------------------------------------------------------
+# Layout incremental (vizinhança de uma edição)
+# ------------------------------------------------------------------
+# Orçamento de tempo por inserção (segundos)
+INCREMENTAL_TIME_BUDGET = 0.03
+
+
+def relax_neighbourhood(scene, item, fixed=(), hops=2, gap=LAYOUT_GAP,
+                        time_budget=INCREMENTAL_TIME_BUDGET, max_nodes=300):
+    """
+    Relaxamento local após inserir `item`: os nós a até `hops` conexões de
+    distância se afastam para abrir espaço, enquanto o próprio item, os
+    nós em `fixed` e todo o resto do mapa permanecem parados (servem apenas
+    de obstáculo).
+
+    Returns:
+        list: (item, dx, dy) dos nós que precisam ser deslocados
+    """
+    from items.shapes import StyledNode
+    from items.media import MediaItem
+    from core.connection import connections_of
+
+    deadline = time.perf_counter() + time_budget
+
+    # Vizinhança de k saltos (BFS), limitada para hubs muito grandes; só as
+    # conexões da fronteira são consultadas (índice das estatísticas da cena)
+    hood = {id(item): item}
+    frontier = [item]
+    for _ in range(hops):
+        nxt = []
+        for v in frontier:
+            for conn in connections_of(v):
+                w = conn.target if conn.source is v else conn.source
+                if id(w) not in hood and len(hood) < max_nodes:
+                    hood[id(w)] = w
+                    nxt.append(w)
+        frontier = nxt
+    if len(hood) < 2:
+        return []
+
+    region = None
+    for v in hood.values():
+        r = v.sceneBoundingRect()
+        region = r if region is None else region.united(r)
+    margin = max(region.width(), region.height()) * 0.25 + gap
+    region = region.adjusted(-margin, -margin, margin, margin)
+
+    nodes = list(hood.values())
+    for other in scene.items(region):
+        if (isinstance(other, (StyledNode, MediaItem)) and other.parentItem() is None
+                and id(other) not in hood):
+            nodes.append(other)
+
+    pinned = {id(item)} | {id(f) for f in fixed}
+    movable = np.array([id(v) in hood and id(v) not in pinned for v in nodes])
+    if not movable.any():
+        return []
+
+    centers = np.zeros((len(nodes), 2))
+    sizes = np.zeros((len(nodes), 2))
+    for i, v in enumerate(nodes):
+        r = v.sceneBoundingRect()
+        centers[i] = (r.center().x(), r.center().y())
+        sizes[i] = (r.width(), r.height())
+
+    new = remove_overlaps(centers, sizes, gap, iterations=100, movable=movable, deadline=deadline)
+    delta = new - centers
+    return [
+        (nodes[i], float(delta[i, 0]), float(delta[i, 1]))
+        for i in np.nonzero(movable & (np.abs(delta).max(axis=1) > 0.5))[0]
+    ]
+
+
+# ------------------------------------------------------------------
+# Registro de algoritmos
+# ------------------------------------------------------------------
+LAYOUTS = {}
+
+
+def register_layout(key, name, func):
+    """Registra um algoritmo: func(centers, sizes, edges, **options) -> centers."""
+    LAYOUTS[key] = (name, func)
+
+
+register_layout("tree", "Árvore hierárquica", tree_layout)
+register_layout("radial", "Radial (mapa mental)", radial_layout)
+register_layout("force", "Dirigido por forças", force_layout)
+
+
+def run_layout(key, graph, **options):
+    _name, func = LAYOUTS[key]
+    return func(graph.centers, graph.sizes, graph.edges, **options)
+
+
+class LayoutWorker(QThread):
+    """Calcula um layout fora da thread da interface."""
+    finished_layout = Signal(object)  # array (n, 2) com os novos centros
+    failed = Signal(str)
+
+    def __init__(self, key, graph, parent=None, **options):
+        super().__init__(parent)
+        self.key = key
+        self.graph = graph
+        self.options = options
+
+    def run(self):
+        try:
+            result = run_layout(self.key, self.graph, **self.options)
+            self.finished_layout.emit(result)
+        except Exception as e:
+            print(f"Erro ao calcular layout: {e}")
+            self.failed.emit(str(e))
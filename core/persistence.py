@@ -2,6 +2,8 @@ import json
 import os
 from typing import Dict, List, Any
 from PySide6.QtGui import QColor
+from core.search_index import attached_index
+from core.scene_stats import attached_stats
 
 class PersistenceManager:
     """Gerencia salvamento e carregamento de projetos Amarelo Mind"""
@@ -29,67 +31,122 @@ class PersistenceManager:
             current_font.setPointSize(size)
             node.text.setFont(current_font)
     
-    def save_to_file(self, file_path: str, scene) -> bool:
+    def scene_to_dict(self, scene) -> Dict[str, Any]:
+        """
+        Serializa nós e conexões da cena no esquema de arquivo .amind
+        
+        Args:
+            scene: Cena a ser serializada
+        
+        Returns:
+            dict: Dados prontos para json.dump
+        """
+        from items.shapes import StyledNode
+        from core.connection import SmartConnection
+        
+        data = {
+            "version": self.FILE_VERSION,
+            "nodes": [],
+            "connections": []
+        }
+        
+        # Separar itens para salvar na ordem correta
+        for item in scene.items():
+            if isinstance(item, StyledNode):
+                data["nodes"].append(self.node_to_dict(item))
+            
+            elif isinstance(item, SmartConnection):
+                try:
+                    conn_data = {
+                        "source_id": id(item.source),
+                        "target_id": id(item.target)
+                    }
+                    data["connections"].append(conn_data)
+                except:
+                    pass  # Ignora conexões órfãs
+        
+        return data
+    
+    def node_to_dict(self, item) -> Dict[str, Any]:
+        """Registro de um StyledNode no esquema .amind (também usado pela área de transferência)"""
+        return {
+            "id": id(item),
+            "x": item.pos().x(),
+            "y": item.pos().y(),
+            "w": item.rect().width(),
+            "h": item.rect().height(),
+            "text": item.get_text(),
+            "html": item.text.document().toHtml(),  # Salvar HTML completo com formatação
+            "type": item.node_type,
+            "shadow": item.has_shadow,
+            "custom_color": item.custom_color
+        }
+
+    def node_from_dict(self, node_data: Dict[str, Any], window=None):
+        """Cria (sem adicionar à cena) o StyledNode descrito por um registro .amind"""
+        from items.shapes import StyledNode
+
+        node = StyledNode(
+            node_data["x"],
+            node_data["y"],
+            int(node_data.get("w", 200)),
+            int(node_data.get("h", 100)),
+            node_data.get("type", "Normal")
+        )
+        # Usar HTML se disponível para preservar formatação
+        html_content = node_data.get("html")
+        if html_content:
+            node.text.setHtml(html_content)
+            # Forçar atualização da fonte do widget baseada no HTML
+            self._update_font_from_html(node, html_content)
+        else:
+            node.set_text(node_data.get("text", ""))
+        node.update_color()
+
+        custom_color = node_data.get("custom_color")
+        if custom_color:
+            node.set_background(QColor(custom_color))
+
+        if not node_data.get("shadow", True):
+            node.toggle_shadow()
+
+        # Conectar sinais de seleção de texto se houver janela
+        if window and hasattr(node.text, 'selectionChanged'):
+            node.text.selectionChanged.connect(window.update_button_states)
+        return node
+
+    def save_to_file(self, file_path: str, scene, compact: bool = False) -> bool:
         """
         Varre a cena e salva todos os dados em formato JSON
         
         Args:
             file_path: Caminho do arquivo para salvar
             scene: Cena a ser salva
+            compact: Grava JSON sem indentação nem espaços (arquivo menor)
         
         Returns:
             bool: True se salvo com sucesso
         """
         try:
-            from items.shapes import StyledNode
-            from core.connection import SmartConnection
-            
             if not file_path.endswith(self.FILE_EXTENSION):
                 file_path += self.FILE_EXTENSION
             
-            data = {
-                "version": self.FILE_VERSION,
-                "nodes": [],
-                "connections": []
-            }
-            
-            nodes_by_id = {}
-            
-            # Separar itens para salvar na ordem correta
-            for item in scene.items():
-                if isinstance(item, StyledNode):
-                    node_id = id(item)
-                    node_data = {
-                        "id": node_id,
-                        "x": item.pos().x(),
-                        "y": item.pos().y(),
-                        "w": item.rect().width(),
-                        "h": item.rect().height(),
-                        "text": item.get_text(),
-                        "html": item.text.document().toHtml(),  # Salvar HTML completo com formatação
-                        "type": item.node_type,
-                        "shadow": item.has_shadow,
-                        "custom_color": item.custom_color
-                    }
-                    data["nodes"].append(node_data)
-                    nodes_by_id[node_id] = node_data
-                
-                elif isinstance(item, SmartConnection):
-                    try:
-                        conn_data = {
-                            "source_id": id(item.source),
-                            "target_id": id(item.target)
-                        }
-                        data["connections"].append(conn_data)
-                    except:
-                        pass  # Ignora conexões órfãs
+            data = self.scene_to_dict(scene)
             
             # Criar diretório se não existir
             os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
             
             with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
+                if compact:
+                    json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                else:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+
+            # O arquivo agora grava id(item) dos nós vivos: o mapa do carregamento
+            # deixa de valer para quem resolve ids lidos do disco (busca em projetos)
+            from items.shapes import StyledNode
+            self.nodes_map = {id(item): item for item in scene.items() if isinstance(item, StyledNode)}
+
             return True
         except Exception as e:
             print(f"Erro ao salvar projeto: {e}")
@@ -118,6 +175,13 @@ class PersistenceManager:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
+            # Índice de busca não recebe notificação dos itens destruídos por clear()
+            index = attached_index(scene)
+            if index is not None:
+                index.clear()
+            stats = attached_stats(scene)
+            if stats is not None:
+                stats.clear()
             scene.clear()
             self.nodes_map = {}
             
@@ -127,35 +191,9 @@ class PersistenceManager:
             
             for node_data in nodes_list:
                 print(f"DEBUG: Criando nó ID {node_data.get('id')} em ({node_data.get('x')}, {node_data.get('y')})")
-                node = StyledNode(
-                    node_data["x"],
-                    node_data["y"],
-                    int(node_data.get("w", 200)),
-                    int(node_data.get("h", 100)),
-                    node_data.get("type", "Normal")
-                )
-                # Usar HTML se disponível para preservar formatação
-                html_content = node_data.get("html")
-                if html_content:
-                    node.text.setHtml(html_content)
-                    # Forçar atualização da fonte do widget baseada no HTML
-                    self._update_font_from_html(node, html_content)
-                else:
-                    node.set_text(node_data.get("text", ""))
-                node.update_color()
-                
-                custom_color = node_data.get("custom_color")
-                if custom_color:
-                    node.set_background(QColor(custom_color))
-                
-                if not node_data.get("shadow", True):
-                    node.toggle_shadow()
+                node = self.node_from_dict(node_data, window)
                 scene.addItem(node)
                 self.nodes_map[node_data["id"]] = node
-                
-                # Conectar sinais de seleção de texto se houver janela
-                if window and hasattr(node.text, 'selectionChanged'):
-                    node.text.selectionChanged.connect(window.update_button_states)
             
             # Reconstruir conexões
             connections_list = data.get("connections", [])
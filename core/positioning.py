@@ -3,14 +3,207 @@ Módulo de posicionamento inteligente de nós e conexões.
 Fornece algoritmos de busca radial para posicionamento e verificação de interseção para conexões.
 """
 import math
-from PySide6.QtCore import QPointF, QRectF
+import numpy as np
+from PySide6.QtCore import Qt, QPointF, QRectF
 from PySide6.QtWidgets import QGraphicsPathItem
 
 
+# Grade de candidatos da busca radial
+RADIAL_ANGLES = 36
+RADIAL_DISTANCE_STEP = 20
+
+
 def find_best_position_radial(source, scene, node_width=200, node_height=100, min_distance=30, max_distance=500, collision_margin=15):
     """
     Encontra a melhor posição para um novo nó usando busca radial.
     
+    Regras de validação:
+        1. Hard Constraint: Posição não pode sobrepor objetos nem linhas de conexão existentes
+        2. Soft Constraint: Prioriza posições com menor número de cruzamentos de linhas
+    
+    Todos os candidatos (ângulos × distâncias) são avaliados de uma vez com
+    NumPy, apenas contra os obstáculos devolvidos pelo índice espacial da
+    cena na vizinhança do nó fonte.
+    
+    Args:
+        source: O nó fonte (objeto existente selecionado)
+        scene: A cena do PyQt onde os objetos estão
+        node_width: Largura do novo nó
+        node_height: Altura do novo nó
+        min_distance: Distância mínima do nó fonte
+        max_distance: Distância máxima de busca
+        collision_margin: Margem de segurança para detecção de colisão
+    
+    Returns:
+        QPointF: Posição (x, y) do canto superior esquerdo do novo nó
+    """
+    source_rect = source.sceneBoundingRect()
+    source_center = source_rect.center()
+    scx, scy = source_center.x(), source_center.y()
+    
+    distances = np.arange(int(min_distance), int(max_distance), RADIAL_DISTANCE_STEP, dtype=float)
+    if distances.size == 0:
+        return _fallback_position(source_center, node_width, node_height, min_distance)
+    angles = 2 * np.pi * np.arange(RADIAL_ANGLES) / RADIAL_ANGLES
+    
+    # Candidatos: matriz (ângulo, distância) de retângulos
+    cx = scx + np.cos(angles)[:, None] * distances[None, :]
+    cy = scy + np.sin(angles)[:, None] * distances[None, :]
+    left = (cx - node_width / 2).ravel()
+    top = (cy - node_height / 2).ravel()
+    right = left + node_width
+    bottom = top + node_height
+    
+    # Consulta espacial: só o que pode alcançar algum candidato
+    reach = max_distance + max(node_width, node_height) + collision_margin
+    search_rect = QRectF(scx - reach, scy - reach, 2 * reach, 2 * reach)
+    obstacles, segments, segment_owner = _collect_obstacles(scene, search_rect, source)
+    
+    blocked = np.zeros(left.shape, dtype=bool)
+    
+    # 1. Retângulos (com margem) contra os retângulos dos objetos
+    if len(obstacles):
+        m = collision_margin
+        blocked |= (
+            ((left - m)[:, None] < obstacles[None, :, 2]) &
+            (obstacles[None, :, 0] < (right + m)[:, None]) &
+            ((top - m)[:, None] < obstacles[None, :, 3]) &
+            (obstacles[None, :, 1] < (bottom + m)[:, None])
+        ).any(axis=1)
+    
+    # 2. Retângulos (sem margem) contra os segmentos das conexões
+    if len(segments):
+        blocked |= _rects_hit_segments(left, top, right, bottom, segments, ~blocked)
+    
+    blocked = blocked.reshape(RADIAL_ANGLES, distances.size)
+    free = ~blocked
+    has_free = free.any(axis=1)
+    if not has_free.any():
+        return _fallback_position(source_center, node_width, node_height, min_distance)
+    
+    # Para cada ângulo, a primeira distância livre (como na busca sequencial)
+    angle_idx = np.nonzero(has_free)[0]
+    dist_idx = free[angle_idx].argmax(axis=1)
+    best_x = cx[angle_idx, dist_idx]
+    best_y = cy[angle_idx, dist_idx]
+    
+    # 3. Cruzamentos da nova conexão (centro a centro) com as existentes
+    crossings = np.zeros(angle_idx.size, dtype=int)
+    if len(segments):
+        hits = _segments_cross(scx, scy, best_x, best_y, segments)
+        for i in range(angle_idx.size):
+            crossings[i] = np.unique(segment_owner[hits[i]]).size
+    
+    # Menos cruzamentos; depois menor distância; depois ordem do ângulo
+    order = np.lexsort((angle_idx, distances[dist_idx], crossings))
+    best = order[0]
+    return QPointF(float(best_x[best] - node_width / 2), float(best_y[best] - node_height / 2))
+
+
+def _fallback_position(source_center, node_width, node_height, min_distance):
+    fallback_dist = min_distance + 50
+    return QPointF(source_center.x() + fallback_dist - node_width / 2,
+                   source_center.y() - node_height / 2)
+
+
+def _collect_obstacles(scene, search_rect, source):
+    """
+    Obstáculos na região de busca: retângulos (N, 4) dos itens de topo
+    (inclui o próprio nó fonte), segmentos (S, 4) dos caminhos de conexão e,
+    para cada segmento, o índice da conexão a que pertence.
+    """
+    rects = []
+    segments = []
+    owners = []
+    conn_index = 0
+    for item in scene.items(search_rect, Qt.IntersectsItemBoundingRect):
+        if isinstance(item, QGraphicsPathItem):
+            path = item.path()
+            count = path.elementCount()
+            if count < 2:
+                continue
+            prev = path.elementAt(0)
+            for i in range(1, count):
+                el = path.elementAt(i)
+                segments.append((prev.x, prev.y, el.x, el.y))
+                owners.append(conn_index)
+                prev = el
+            conn_index += 1
+        elif item.parentItem() is None:
+            r = item.sceneBoundingRect()
+            rects.append((r.left(), r.top(), r.right(), r.bottom()))
+    return (
+        np.array(rects, dtype=float).reshape(-1, 4),
+        np.array(segments, dtype=float).reshape(-1, 4),
+        np.array(owners, dtype=int),
+    )
+
+
+def _ccw(ax, ay, bx, by, px, py):
+    """Teste de orientação vetorizado (mesma convenção de _segments_intersect)."""
+    return (py - ay) * (bx - ax) > (by - ay) * (px - ax)
+
+
+def _segments_cross(ax, ay, bx, by, segments):
+    """
+    Matriz (len(bx), S): o segmento (a → b[i]) cruza o segmento j?
+    `a` é um ponto único; `b` é um vetor de pontos.
+    """
+    bx = np.asarray(bx, dtype=float)[:, None]
+    by = np.asarray(by, dtype=float)[:, None]
+    x1, y1, x2, y2 = (segments[None, :, k] for k in range(4))
+    return (
+        (_ccw(ax, ay, x1, y1, x2, y2) != _ccw(bx, by, x1, y1, x2, y2)) &
+        (_ccw(ax, ay, bx, by, x1, y1) != _ccw(ax, ay, bx, by, x2, y2))
+    )
+
+
+def _rects_hit_segments(left, top, right, bottom, segments, active):
+    """
+    Para cada retângulo ativo, verifica se algum segmento tem extremidade
+    dentro dele ou cruza uma de suas bordas. Pares cujas caixas não se
+    sobrepõem são descartados antes dos testes de orientação.
+    """
+    hit = np.zeros(left.shape, dtype=bool)
+    rect_idx = np.nonzero(active)[0]
+    if rect_idx.size == 0:
+        return hit
+    x1, y1, x2, y2 = (segments[:, k] for k in range(4))
+    sx0, sx1 = np.minimum(x1, x2), np.maximum(x1, x2)
+    sy0, sy1 = np.minimum(y1, y2), np.maximum(y1, y2)
+    
+    l, t, r, b = left[rect_idx], top[rect_idx], right[rect_idx], bottom[rect_idx]
+    near = (
+        (sx0[None, :] <= r[:, None]) & (l[:, None] <= sx1[None, :]) &
+        (sy0[None, :] <= b[:, None]) & (t[:, None] <= sy1[None, :])
+    )
+    ri, si = np.nonzero(near)
+    if ri.size == 0:
+        return hit
+    
+    l, t, r, b = l[ri], t[ri], r[ri], b[ri]
+    ax, ay, bx, by = x1[si], y1[si], x2[si], y2[si]
+    
+    inside = (
+        ((l <= ax) & (ax <= r) & (t <= ay) & (ay <= b)) |
+        ((l <= bx) & (bx <= r) & (t <= by) & (by <= b))
+    )
+    crosses = np.zeros(ri.size, dtype=bool)
+    for ex1, ey1, ex2, ey2 in ((l, t, r, t), (r, t, r, b), (r, b, l, b), (l, b, l, t)):
+        crosses |= (
+            (_ccw(ax, ay, ex1, ey1, ex2, ey2) != _ccw(bx, by, ex1, ey1, ex2, ey2)) &
+            (_ccw(ax, ay, bx, by, ex1, ey1) != _ccw(ax, ay, bx, by, ex2, ey2))
+        )
+    
+    hit[rect_idx[ri[inside | crosses]]] = True
+    return hit
+
+
+def _find_best_position_radial_scalar(source, scene, node_width=200, node_height=100, min_distance=30, max_distance=500, collision_margin=15):
+    """
+    Versão escalar (um candidato por vez) da busca radial. Mantida como
+    referência para comparação em bench/bench_positioning.py.
+    
     Regras de validação:
         1. Hard Constraint: Posição não pode sobrepor objetos nem linhas de conexão existentes
         2. Soft Constraint: Prioriza posições com menor número de cruzamentos de linhas
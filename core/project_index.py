@@ -0,0 +1,255 @@
+"""
+Índice de busca persistente sobre pastas de projetos .amind.
+
+Guarda o texto de cada nó de cada arquivo em um banco SQLite local
+(~/.config/amarelo-mind/project_index.sqlite), com FTS5 quando disponível
+e LIKE sobre texto normalizado como alternativa. A atualização é
+incremental: arquivos com mesmo mtime/tamanho são ignorados e, se só o
+mtime mudou, o hash do conteúdo evita re-indexar.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+from PySide6.QtCore import QThread, Signal
+
+from core.search_index import normalize
+
+INDEX_EXTENSIONS = (".amind",)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def default_index_path():
+    config_dir = os.path.join(os.path.expanduser("~"), ".config", "amarelo-mind")
+    os.makedirs(config_dir, exist_ok=True)
+    return os.path.join(config_dir, "project_index.sqlite")
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _node_texts(path):
+    """(id, texto) de cada nó do arquivo."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    result = []
+    for node in data.get("nodes", []):
+        text = node.get("text")
+        if not text and node.get("html"):
+            text = _TAG_RE.sub(" ", node["html"])
+        if text and text.strip():
+            result.append((node.get("id"), text))
+    return result
+
+
+def _plain_words(text):
+    """Texto normalizado só com as palavras separadas por espaço (busca com LIKE)."""
+    return " ".join(re.findall(r"\w+", normalize(text)))
+
+
+class ProjectIndex:
+    """Índice SQLite dos nós de todos os .amind das pastas configuradas."""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_index_path()
+        self.conn = sqlite3.connect(self.db_path)
+        self.fts = self._create_schema()
+
+    def close(self):
+        self.conn.close()
+
+    def _create_schema(self):
+        cur = self.conn.cursor()
+        cur.execute("CREATE TABLE IF NOT EXISTS folders (path TEXT PRIMARY KEY)")
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, mtime REAL, size INTEGER, hash TEXT, indexed_at REAL)"
+        )
+        try:
+            cur.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS nodes USING fts5("
+                " path UNINDEXED, node_id UNINDEXED, text,"
+                " tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            fts = True
+        except sqlite3.OperationalError:
+            # SQLite sem FTS5: tabela comum com texto normalizado
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS nodes_plain ("
+                " path TEXT, node_id INTEGER, text TEXT, norm TEXT)"
+            )
+            cur.execute("CREATE INDEX IF NOT EXISTS nodes_plain_path ON nodes_plain(path)")
+            fts = False
+        self.conn.commit()
+        return fts
+
+    @property
+    def _nodes_table(self):
+        return "nodes" if self.fts else "nodes_plain"
+
+    # -------------------------------
+    # PASTAS
+    # -------------------------------
+    def folders(self):
+        return [row[0] for row in self.conn.execute("SELECT path FROM folders ORDER BY path")]
+
+    def add_folder(self, path):
+        self.conn.execute("INSERT OR IGNORE INTO folders(path) VALUES (?)", (os.path.abspath(path),))
+        self.conn.commit()
+
+    def remove_folder(self, path):
+        self.conn.execute("DELETE FROM folders WHERE path = ?", (path,))
+        self.conn.commit()
+
+    def _scan(self):
+        found = []
+        for folder in self.folders():
+            for root, _dirs, files in os.walk(folder):
+                for name in files:
+                    if name.lower().endswith(INDEX_EXTENSIONS):
+                        found.append(os.path.join(root, name))
+        return sorted(set(found))
+
+    # -------------------------------
+    # ATUALIZAÇÃO INCREMENTAL
+    # -------------------------------
+    def update(self, progress=None, should_stop=None):
+        """
+        Sincroniza o índice com o disco.
+
+        Returns:
+            dict: {"indexed", "skipped", "removed", "failed"}
+        """
+        stats = {"indexed": 0, "skipped": 0, "removed": 0, "failed": 0}
+        known = {
+            row[0]: (row[1], row[2], row[3])
+            for row in self.conn.execute("SELECT path, mtime, size, hash FROM files")
+        }
+        paths = self._scan()
+        table = self._nodes_table
+
+        for i, path in enumerate(paths):
+            if should_stop and should_stop():
+                break
+            if progress:
+                progress(i, len(paths), path)
+            try:
+                st = os.stat(path)
+                old = known.get(path)
+                if old and old[0] == st.st_mtime and old[1] == st.st_size:
+                    stats["skipped"] += 1
+                    continue
+                digest = _file_hash(path)
+                if old and old[2] == digest:
+                    # Só o mtime mudou (cópia, touch): conteúdo igual
+                    self.conn.execute(
+                        "UPDATE files SET mtime = ?, size = ? WHERE path = ?",
+                        (st.st_mtime, st.st_size, path)
+                    )
+                    stats["skipped"] += 1
+                    continue
+                self._index_file(path, table)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO files(path, mtime, size, hash, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                    (path, st.st_mtime, st.st_size, digest, time.time())
+                )
+                stats["indexed"] += 1
+            except Exception as e:
+                print(f"Aviso: não foi possível indexar {path}: {e}")
+                stats["failed"] += 1
+            if (i + 1) % 50 == 0:
+                self.conn.commit()
+
+        # Arquivos removidos ou fora das pastas configuradas
+        current = set(paths)
+        for path in set(known) - current:
+            self.conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+            self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            stats["removed"] += 1
+        self.conn.commit()
+        return stats
+
+    def _index_file(self, path, table):
+        nodes = _node_texts(path)
+        self.conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+        if self.fts:
+            self.conn.executemany(
+                "INSERT INTO nodes(path, node_id, text) VALUES (?, ?, ?)",
+                [(path, node_id, text) for node_id, text in nodes]
+            )
+        else:
+            self.conn.executemany(
+                "INSERT INTO nodes_plain(path, node_id, text, norm) VALUES (?, ?, ?, ?)",
+                [(path, node_id, text, _plain_words(text)) for node_id, text in nodes]
+            )
+
+    # -------------------------------
+    # CONSULTA
+    # -------------------------------
+    def search(self, query, limit=200):
+        """
+        Busca por prefixo de todos os termos.
+
+        Returns:
+            list: (caminho, id do nó, trecho) em ordem de relevância
+        """
+        terms = re.findall(r"\w+", normalize(query))
+        if not terms:
+            return []
+        if self.fts:
+            match = " ".join(f'"{t}"*' for t in terms)
+            try:
+                rows = self.conn.execute(
+                    "SELECT path, node_id, snippet(nodes, 2, '[', ']', '…', 10) FROM nodes"
+                    " WHERE nodes MATCH ? ORDER BY bm25(nodes) LIMIT ?",
+                    (match, limit)
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                print(f"Aviso: consulta inválida no índice: {e}")
+                return []
+        else:
+            # Início de palavra: o espaço antes do termo casa com o separador
+            # de _plain_words (ou com o espaço acrescentado ao início)
+            where = " AND ".join("(' ' || norm) LIKE ? ESCAPE '\\'" for _ in terms)
+            patterns = ["% " + t.replace("_", "\\_") + "%" for t in terms]
+            rows = self.conn.execute(
+                f"SELECT path, node_id, substr(text, 1, 80) FROM nodes_plain WHERE {where} LIMIT ?",
+                patterns + [limit]
+            ).fetchall()
+        return [(path, node_id, snippet) for path, node_id, snippet in rows]
+
+    def file_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+
+class ProjectIndexWorker(QThread):
+    """Atualiza o índice em segundo plano (conexão SQLite própria da thread)."""
+    progress = Signal(int, int, str)
+    finished_update = Signal(dict)
+
+    def __init__(self, db_path=None, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        index = ProjectIndex(self.db_path)
+        try:
+            stats = index.update(
+                progress=lambda done, total, path: self.progress.emit(done, total, path),
+                should_stop=lambda: self._stop
+            )
+        finally:
+            index.close()
+        self.finished_update.emit(stats)
@@ -0,0 +1,322 @@
+"""
+Estatísticas da cena mantidas por contadores incrementais.
+
+Os itens avisam o serviço ao entrar e sair da cena (itemChange) e os nós
+também ao mudar de tipo ou de sombra; nenhuma consulta varre a cena.
+O serviço fica associado à cena como o índice de busca (attached_stats /
+stats_for) e notifica ouvintes a cada alteração. Observadores (por exemplo
+o SceneSnapshot do filtro) recebem cada evento de item, sem adiamento,
+para manter os próprios índices.
+"""
+import os
+from collections import Counter
+from contextlib import contextmanager
+
+
+class SceneStatistics:
+    """Contadores de nós por tipo, sombras, conexões, bytes de mídia e graus."""
+
+    def __init__(self):
+        self._listeners = []
+        self._observers = []
+        self._deferred = 0
+        self._pending = False
+        self.clear()
+
+    def clear(self):
+        """Zera os contadores (usado antes de scene.clear())."""
+        self._forward("clear")
+        self._node_types = {}        # chave do nó → tipo
+        self._shadows = set()        # chaves dos nós com sombra
+        self._text_nodes = set()     # chaves dos nós com texto (pesquisáveis)
+        self._searchable_media = set()
+        self.type_counts = Counter()
+        self.connection_count = 0
+        self._degree = Counter()     # chave do extremo → conexões na cena
+        self._incident = {}          # chave do extremo → {id da conexão: conexão}
+        self.degree_histogram = Counter()
+        self._media_bytes = {}       # chave da mídia → bytes contabilizados
+        self.media_bytes = 0
+        self._notify()
+
+    # -------------------------------
+    # OUVINTES
+    # -------------------------------
+    def add_listener(self, callback):
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def add_observer(self, observer):
+        """
+        Observador dos eventos de item: métodos node_added, node_removed,
+        node_type_changed, node_color_changed, connection_added,
+        connection_removed e clear, chamados na hora (fora do adiamento).
+        """
+        if observer not in self._observers:
+            self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def _forward(self, event, *args):
+        for observer in list(self._observers):
+            try:
+                getattr(observer, event)(*args)
+            except Exception as e:
+                print(f"Erro ao repassar {event} das estatísticas: {e}")
+
+    @contextmanager
+    def deferred(self):
+        """Acumula as notificações e emite uma só ao final (edição em lote)."""
+        self._deferred += 1
+        try:
+            yield
+        finally:
+            self._deferred -= 1
+            if not self._deferred and self._pending:
+                self._notify()
+
+    def _notify(self):
+        if self._deferred:
+            self._pending = True
+            return
+        self._pending = False
+        for callback in list(self._listeners):
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Erro ao notificar estatísticas: {e}")
+
+    # -------------------------------
+    # NÓS
+    # -------------------------------
+    def node_added(self, node):
+        self._forward("node_added", node)
+        key = id(node)
+        if key in self._node_types:
+            return
+        self._node_types[key] = node.node_type
+        self.type_counts[node.node_type] += 1
+        if node.has_shadow:
+            self._shadows.add(key)
+        if node.text.toPlainText().strip():
+            self._text_nodes.add(key)
+        self.degree_histogram[self._degree[key]] += 1
+        self._notify()
+
+    def node_removed(self, node):
+        self._forward("node_removed", node)
+        key = id(node)
+        node_type = self._node_types.pop(key, None)
+        if node_type is None:
+            return
+        self._decrement(self.type_counts, node_type)
+        self._shadows.discard(key)
+        self._text_nodes.discard(key)
+        self._decrement(self.degree_histogram, self._degree[key])
+        if not self._degree[key]:
+            del self._degree[key]
+        self._notify()
+
+    def node_type_changed(self, node, old_type, new_type):
+        self._forward("node_type_changed", node, old_type, new_type)
+        key = id(node)
+        if key not in self._node_types or old_type == new_type:
+            return
+        self._node_types[key] = new_type
+        self._decrement(self.type_counts, old_type)
+        self.type_counts[new_type] += 1
+        self._notify()
+
+    def node_color_changed(self, node):
+        """Cor personalizada mudou; não há contador, só os observadores."""
+        self._forward("node_color_changed", node)
+
+    def node_text_changed(self, node):
+        """Chamado a cada edição; só notifica quando o nó passa a ter/deixar de ter texto."""
+        key = id(node)
+        if key not in self._node_types:
+            return
+        has_text = bool(node.text.toPlainText().strip())
+        if has_text == (key in self._text_nodes):
+            return
+        if has_text:
+            self._text_nodes.add(key)
+        else:
+            self._text_nodes.discard(key)
+        self._notify()
+
+    def node_shadow_changed(self, node, has_shadow):
+        key = id(node)
+        if key not in self._node_types:
+            return
+        if has_shadow:
+            self._shadows.add(key)
+        else:
+            self._shadows.discard(key)
+        self._notify()
+
+    # -------------------------------
+    # CONEXÕES
+    # -------------------------------
+    def connection_added(self, connection):
+        self._forward("connection_added", connection)
+        self.connection_count += 1
+        for end in (connection.source, connection.target):
+            self._shift_degree(id(end), +1)
+            self._incident.setdefault(id(end), {})[id(connection)] = connection
+        self._notify()
+
+    def connection_removed(self, connection):
+        self._forward("connection_removed", connection)
+        self.connection_count = max(0, self.connection_count - 1)
+        for end in (connection.source, connection.target):
+            self._shift_degree(id(end), -1)
+            incident = self._incident.get(id(end))
+            if incident is not None:
+                incident.pop(id(connection), None)
+                if not incident:
+                    del self._incident[id(end)]
+        self._notify()
+
+    def _shift_degree(self, key, delta):
+        old = self._degree[key]
+        new = max(0, old + delta)
+        if key in self._node_types:
+            self._decrement(self.degree_histogram, old)
+            self.degree_histogram[new] += 1
+        if new or key in self._node_types:
+            self._degree[key] = new
+        else:
+            del self._degree[key]
+
+    # -------------------------------
+    # MÍDIA
+    # -------------------------------
+    def media_added(self, item):
+        key = id(item)
+        if key in self._media_bytes:
+            return
+        size = media_size(item)
+        self._media_bytes[key] = size
+        if getattr(item, "_entries", None):
+            # Slideshow de imagens: legendas pesquisáveis
+            self._searchable_media.add(key)
+        self.media_bytes += size
+        self._notify()
+
+    def media_entries_changed(self, item):
+        """Imagens adicionadas/removidas de um slideshow já na cena."""
+        key = id(item)
+        if key not in self._media_bytes:
+            return
+        searchable = bool(getattr(item, "_entries", None))
+        if searchable == (key in self._searchable_media):
+            return
+        if searchable:
+            self._searchable_media.add(key)
+        else:
+            self._searchable_media.discard(key)
+        self._notify()
+
+    def media_removed(self, item):
+        size = self._media_bytes.pop(id(item), None)
+        if size is None:
+            return
+        self._searchable_media.discard(id(item))
+        self.media_bytes -= size
+        self._notify()
+
+    @staticmethod
+    def _decrement(counter, key):
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+    # -------------------------------
+    # CONSULTA
+    # -------------------------------
+    def connections_of(self, item):
+        """Conexões na cena com o item como origem ou destino (sem varrer a cena)."""
+        return list(self._incident.get(id(item), {}).values())
+
+    @property
+    def node_count(self):
+        return len(self._node_types)
+
+    @property
+    def shadow_count(self):
+        return len(self._shadows)
+
+    @property
+    def media_count(self):
+        return len(self._media_bytes)
+
+    @property
+    def item_count(self):
+        return self.node_count + self.connection_count + self.media_count
+
+    @property
+    def has_searchable(self):
+        return bool(self._text_nodes or self._searchable_media)
+
+    def snapshot(self):
+        """Cópia dos contadores (mesmas chaves de ItemFilter.get_statistics)."""
+        return {
+            "total_items": self.node_count,
+            "type_breakdown": dict(self.type_counts),
+            "items_with_shadow": self.shadow_count,
+            "items_without_shadow": self.node_count - self.shadow_count,
+            "connections": self.connection_count,
+            "media_items": self.media_count,
+            "media_bytes": self.media_bytes,
+            "degree_histogram": dict(sorted(self.degree_histogram.items())),
+        }
+
+
+def media_size(item):
+    """Bytes dos arquivos de origem da mídia, ou da imagem em memória."""
+    sources = getattr(item, "_sources", None) or [getattr(item, "source", "")]
+    total = 0
+    for source in sources:
+        try:
+            if isinstance(source, str) and os.path.isfile(source):
+                total += os.path.getsize(source)
+        except OSError:
+            pass
+    if not total:
+        pix = getattr(item, "_pix", None)
+        if pix is not None and not pix.isNull():
+            total = pix.width() * pix.height() * pix.depth() // 8
+    return total
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def attached_stats(scene):
+    """Estatísticas já associadas à cena, ou None (não cria)."""
+    if scene is None:
+        return None
+    return getattr(scene, "_scene_stats", None)
+
+
+def stats_for(scene):
+    """
+    Estatísticas da cena. Devem ser criadas com a cena ainda vazia: os
+    contadores só enxergam itens que entram depois.
+    """
+    stats = attached_stats(scene)
+    if stats is None:
+        stats = SceneStatistics()
+        scene._scene_stats = stats
+    return stats
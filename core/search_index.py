@@ -0,0 +1,361 @@
+"""
+Índice invertido de texto dos nós da cena.
+
+Os textos são normalizados sem acentos e sem caixa (busca por "acao"
+encontra "Ação"), quebrados em termos e guardados em listas invertidas
+termo → nós. O índice é mantido de forma incremental: nós entram e saem
+pelo itemChange do StyledNode e edições apenas marcam o nó como sujo,
+sendo re-indexado na próxima consulta.
+
+Consultas:
+    termo           prefixo ("mapa" encontra "mapas", "mapeamento" não)
+    "duas palavras" frase exata (termos consecutivos)
+    termo~          aproximada (até 1 ou 2 letras de diferença)
+Termos sem nenhuma ocorrência caem automaticamente na busca aproximada.
+"""
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+
+_TOKEN_RE = re.compile(r"\w+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Pesos de ranking por tipo de casamento
+_SCORE_EXACT = 3.0
+_SCORE_PREFIX = 2.0
+_SCORE_FUZZY = 1.0
+
+
+def normalize(text):
+    """Minúsculas e sem acentos (NFKD sem marcas combinantes)."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _fuzzy_limit(term):
+    return 1 if len(term) <= 5 else 2
+
+
+def _fuzzy_words(term, vocab, limit):
+    """
+    Palavras do vocabulário ordenado cujo início (até len(term) + limit
+    letras) está a no máximo `limit` edições de `term`.
+
+    Percorre o vocabulário como uma trie: palavras vizinhas reaproveitam o
+    estado da distância de edição do prefixo comum, e um prefixo que já
+    passou do limite descarta de uma vez todas as palavras que começam com
+    ele. Cada letra avança a coluna da distância inteira de uma vez
+    (Myers/Hyyrö: variações verticais +1/-1 em bits).
+    """
+    m = len(term)
+    max_len = m + limit
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    peq = {}
+    for j, ch in enumerate(term):
+        peq[ch] = peq.get(ch, 0) | (1 << j)
+
+    # states[d]: (variações +1, variações -1, distância) após d letras
+    states = [(mask, 0, m)]
+    prev_head = ""
+    found = []
+    i = 0
+    while i < len(vocab):
+        head = vocab[i][:max_len]
+        common = 0
+        while common < len(head) and common < len(prev_head) and head[common] == prev_head[common]:
+            common += 1
+        del states[common + 1:]
+        pv, mv, score = states[-1]
+        pruned = False
+        for depth in range(common, len(head)):
+            eq = peq.get(head[depth], 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            if ph & last:
+                score += 1
+            elif mh & last:
+                score -= 1
+            ph = ((ph << 1) | 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | (~(xv | ph) & mask)
+            mv = ph & xv
+            states.append((pv, mv, score))
+            # Menor valor possível da coluna: linhas a mais de `limit` da
+            # diagonal já passaram do limite; nas outras, a distância cai no
+            # máximo uma unidade por variação +1 abaixo do fim
+            low = depth + 1 - limit
+            if score - (pv >> low if low > 0 else pv).bit_count() > limit:
+                prev_head = head[:depth + 1]
+                i = bisect_left(vocab, prev_head + "\U0010ffff", i)
+                pruned = True
+                break
+        if pruned:
+            continue
+        # Palavras seguintes com o mesmo início têm a mesma distância
+        end = i + 1
+        if len(head) == max_len:
+            end = bisect_left(vocab, head + "\U0010ffff", end)
+        if score <= limit:
+            found.extend(vocab[i:end])
+        prev_head = head
+        i = end
+    return found
+
+
+class SearchIndex:
+    """Índice invertido dos StyledNode de uma cena."""
+
+    def __init__(self, scene=None):
+        self._nodes = {}      # chave → nó
+        self._tokens = {}     # chave → lista de termos (na ordem do texto)
+        self._postings = {}   # termo → {chave: ocorrências}
+        self._dirty = set()
+        self._vocab = []
+        self._vocab_dirty = False
+        self._fuzzy_cache = {}  # (termo, limite) -> palavras; vale até o vocabulário mudar
+        self._last_query = None
+        self._last_keys = None
+        if scene is not None:
+            self.rebuild(scene)
+
+    # -------------------------------
+    # MANUTENÇÃO
+    # -------------------------------
+    def rebuild(self, scene):
+        from items.shapes import StyledNode
+        self.clear()
+        for item in scene.items():
+            if isinstance(item, StyledNode):
+                self.add(item)
+        self._flush()
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def clear(self):
+        """Esquece todos os nós (usado antes de scene.clear())."""
+        self._nodes.clear()
+        self._tokens.clear()
+        self._postings.clear()
+        self._dirty.clear()
+        self._vocab = []
+        self._vocab_dirty = False
+        self._fuzzy_cache.clear()
+        self._invalidate_cache()
+
+    def add(self, node):
+        key = id(node)
+        self._nodes[key] = node
+        self._dirty.add(key)
+        self._invalidate_cache()
+
+    def remove(self, node):
+        key = id(node)
+        if key not in self._nodes:
+            return
+        self._unindex(key)
+        del self._nodes[key]
+        self._dirty.discard(key)
+        self._invalidate_cache()
+
+    def mark_dirty(self, node):
+        """Texto do nó mudou; será re-indexado na próxima consulta."""
+        key = id(node)
+        if key in self._nodes:
+            self._dirty.add(key)
+            self._invalidate_cache()
+
+    def _invalidate_cache(self):
+        self._last_query = None
+        self._last_keys = None
+
+    def _unindex(self, key):
+        for token in set(self._tokens.pop(key, ())):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[token]
+                    self._vocab_dirty = True
+
+    def _flush(self):
+        """Re-indexa apenas os nós sujos."""
+        if not self._dirty:
+            return
+        for key in self._dirty:
+            self._unindex(key)
+            node = self._nodes.get(key)
+            if node is None:
+                continue
+            try:
+                tokens = tokenize(node.get_text())
+            except RuntimeError:
+                # Nó destruído sem passar por remove()
+                del self._nodes[key]
+                continue
+            self._tokens[key] = tokens
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._vocab_dirty = True
+                postings[key] = postings.get(key, 0) + 1
+        self._dirty.clear()
+
+    def _sorted_vocab(self):
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+            self._fuzzy_cache.clear()
+        return self._vocab
+
+    # -------------------------------
+    # CONSULTA
+    # -------------------------------
+    def _expand(self, term):
+        """
+        Termos do vocabulário que casam com `term` e o peso de cada um.
+
+        Returns:
+            tuple: ({termo: peso}, se a busca aproximada foi usada)
+        """
+        fuzzy = term.endswith("~")
+        term = term.rstrip("~")
+        if not term:
+            return {}, False
+        vocab = self._sorted_vocab()
+        matches = {}
+        if not fuzzy:
+            i = bisect_left(vocab, term)
+            while i < len(vocab) and vocab[i].startswith(term):
+                word = vocab[i]
+                matches[word] = _SCORE_EXACT if word == term else _SCORE_PREFIX
+                i += 1
+        if matches:
+            return matches, False
+        # Memorizada: cada tecla digitada depois de um termo aproximado o expande de novo
+        key = (term, _fuzzy_limit(term))
+        words = self._fuzzy_cache.get(key)
+        if words is None:
+            words = self._fuzzy_cache[key] = _fuzzy_words(term, vocab, key[1])
+        for word in words:
+            matches[word] = _SCORE_FUZZY
+        return matches, True
+
+    def _phrase_keys(self, words, candidates):
+        n = len(words)
+        found = set()
+        for key in candidates:
+            tokens = self._tokens.get(key, ())
+            for i in range(len(tokens) - n + 1):
+                if tokens[i:i + n] == words:
+                    found.add(key)
+                    break
+        return found
+
+    def _match(self, expanded, phrases, restrict):
+        """
+        Nós que casam com todos os termos (já expandidos) e frases, dentro
+        de `restrict` (ou de todos, com None).
+
+        Returns:
+            tuple: (chaves, pontuação por chave)
+        """
+        n_docs = max(1, len(self._nodes))
+        scores = {}
+        keys = restrict
+        for matches, _fuzzy in expanded:
+            hits = {}
+            for word, weight in matches.items():
+                postings = self._postings[word]
+                idf = math.log(1 + n_docs / len(postings))
+                for key, count in postings.items():
+                    if keys is None or key in keys:
+                        hits[key] = max(hits.get(key, 0.0), weight * idf * (1 + math.log(count)))
+            keys = set(hits)
+            for key, score in hits.items():
+                scores[key] = scores.get(key, 0.0) + score
+            if not keys:
+                break
+
+        for words in phrases:
+            candidates = keys
+            if candidates is None:
+                candidates = set(self._postings.get(words[0], {}))
+                for word in words[1:]:
+                    candidates &= set(self._postings.get(word, {}))
+            keys = self._phrase_keys(words, candidates)
+            for key in keys:
+                scores[key] = scores.get(key, 0.0) + _SCORE_EXACT * len(words)
+
+        return keys or set(), scores
+
+    def search(self, query, limit=None):
+        """
+        Retorna os nós que casam com todos os termos da consulta, do mais
+        relevante para o menos relevante.
+        """
+        self._flush()
+        norm = normalize(query).strip()
+        if not norm:
+            return []
+
+        terms, phrases = [], []
+        for phrase, term in _QUERY_RE.findall(norm):
+            if phrase:
+                words = _TOKEN_RE.findall(phrase)
+                if len(words) == 1:
+                    terms.append(words[0])
+                elif words:
+                    phrases.append(words)
+            else:
+                words = _TOKEN_RE.findall(term)
+                suffix = "~" if term.endswith("~") else ""
+                terms.extend(w + suffix for w in words)
+
+        # Todos os termos são expandidos antes de intersectar: é preciso saber
+        # se algum cai na busca aproximada mesmo quando o resultado zera antes
+        expanded = [self._expand(term) for term in terms]
+        fuzzy = any(used for _matches, used in expanded)
+
+        # Busca incremental: a consulta anterior é prefixo desta. Só vale com
+        # termos casados por prefixo (um termo aproximado pode casar nós fora
+        # do resultado anterior: "map" -> "mapx" ~ "max") e sem aspas nem ~,
+        # que mudam o sentido da consulta enquanto são digitados
+        plain = bool(terms) and not fuzzy and '"' not in norm and "~" not in norm
+        previous = None
+        if plain and self._last_keys is not None and norm.startswith(self._last_query):
+            previous = self._last_keys
+        keys, scores = self._match(expanded, phrases, previous)
+
+        self._last_query = norm
+        self._last_keys = keys if plain else None
+
+        ranked = sorted(keys, key=lambda k: (-scores.get(k, 0.0), len(self._tokens.get(k, ()))))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self._nodes[k] for k in ranked]
+
+
+def attached_index(scene):
+    """Índice já associado à cena, ou None (não cria)."""
+    if scene is None:
+        return None
+    return getattr(scene, "_search_index", None)
+
+
+def search_index_for(scene):
+    """Índice da cena, construído na primeira chamada."""
+    index = attached_index(scene)
+    if index is None:
+        index = SearchIndex(scene)
+        scene._search_index = index
+    return index
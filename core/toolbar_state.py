@@ -0,0 +1,94 @@
+"""
+Estado (habilitado/desabilitado) das ações da barra de ferramentas.
+
+Recalculado a partir de sinais (seleção, foco, área de transferência,
+seleção de texto, contadores da cena) e no máximo uma vez por volta do
+laço de eventos: vários sinais na mesma volta geram um único recálculo.
+Nenhum recálculo varre a cena; o que depende do conteúdo inteiro vem dos
+contadores incrementais de core.scene_stats.
+"""
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtWidgets import QApplication, QGraphicsTextItem
+
+from core.clipboard import mime_has_subgraph
+
+
+class ToolbarStateModel(QObject):
+    """Deriva o estado das ações e entrega só o que mudou a `apply`."""
+
+    def __init__(self, scene, stats, node_type, media_type, apply, parent=None):
+        super().__init__(parent)
+        self.scene = scene
+        self.stats = stats
+        self.node_type = node_type
+        self.media_type = media_type
+        self.apply = apply
+        self.focus_active = False
+        self._state = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.recompute)
+
+        clipboard = QApplication.clipboard()
+        self._has_clipboard_text = bool(clipboard.text())
+        self._has_clipboard_subgraph = mime_has_subgraph(clipboard.mimeData())
+        clipboard.dataChanged.connect(self._on_clipboard_changed)
+
+        scene.selectionChanged.connect(self.schedule)
+        scene.focusItemChanged.connect(self.schedule)
+        stats.add_listener(lambda _stats: self.schedule())
+
+    def schedule(self, *args):
+        """Slot para qualquer sinal: agenda um recálculo (coalescido)."""
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _on_clipboard_changed(self):
+        clipboard = QApplication.clipboard()
+        self._has_clipboard_text = bool(clipboard.text())
+        self._has_clipboard_subgraph = mime_has_subgraph(clipboard.mimeData())
+        self.schedule()
+
+    def compute(self):
+        try:
+            sel = self.scene.selectedItems()
+            focus_item = self.scene.focusItem()
+        except RuntimeError:
+            return None
+
+        nodes = [i for i in sel if isinstance(i, self.node_type)]
+        objects = [i for i in sel if isinstance(i, (self.node_type, self.media_type))]
+        has_media_selected = len(objects) > len(nodes)
+        is_text_in_node = isinstance(focus_item, QGraphicsTextItem) and \
+            isinstance(focus_item.parentItem(), self.node_type)
+        text_has_selection = isinstance(focus_item, QGraphicsTextItem) and \
+            focus_item.textCursor().hasSelection()
+
+        return {
+            # Ocultar: sementes do modo foco, ou reexibir com o modo ativo
+            "hide": self.focus_active or bool(objects),
+            "title": len(nodes) == 1,
+            # Fonte/Cores: nó selecionado ou foco no texto de um nó, sem mídia
+            "font": (bool(nodes) or is_text_in_node) and not has_media_selected,
+            "colors": (bool(nodes) or is_text_in_node) and not has_media_selected,
+            "export": self.stats.item_count > 0,
+            "align": len(objects) >= 2,
+            "copy": text_has_selection or bool(objects),
+            # Colar: subgrafo copiado (sempre) ou texto com destino
+            "paste": self._has_clipboard_subgraph or
+                     (self._has_clipboard_text and (is_text_in_node or bool(nodes))),
+            "connect": len(objects) >= 2,
+            "delete": bool(sel),
+            "search": self.stats.has_searchable,
+        }
+
+    def recompute(self):
+        state = self.compute()
+        if state is None:
+            return
+        changed = {k: v for k, v in state.items() if self._state.get(k) != v}
+        self._state = state
+        if changed:
+            self.apply(changed)
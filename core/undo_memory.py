@@ -0,0 +1,216 @@
+"""
+Memória do histórico de desfazer.
+
+Os comandos de texto guardam o HTML "depois" comprimido (zlib) e o
+"antes" apenas como o trecho que difere dele (prefixo e sufixo comuns são
+reaproveitados). UndoMemoryCap mantém a soma do custo dos comandos da pilha e,
+acima do limite, despeja os dados dos comandos mais antigos em um arquivo
+temporário: continuam desfazíveis, mas deixam de ocupar memória.
+"""
+import os
+import tempfile
+import zlib
+
+# Limites padrão do histórico (número de passos e memória em bytes)
+UNDO_COUNT_LIMIT = 500
+UNDO_MEMORY_LIMIT = 16 * 1024 * 1024
+
+# Custo fixo estimado de um comando (objeto Python + wrapper Qt)
+_COMMAND_OVERHEAD = 256
+
+
+class SpillStore:
+    """Arquivo temporário só de acréscimo para blobs despejados."""
+
+    def __init__(self):
+        self._file = None
+
+    def write(self, blob):
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="amarelo-undo-")
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(blob)
+        return offset, len(blob)
+
+    def read(self, offset, length):
+        self._file.seek(offset)
+        return self._file.read(length)
+
+
+_spill_store = SpillStore()
+
+
+class CompactText:
+    """Texto comprimido em memória, ou despejado no SpillStore."""
+    __slots__ = ("_blob", "_spilled")
+
+    def __init__(self, text):
+        self._blob = zlib.compress(text.encode("utf-8"), 6)
+        self._spilled = None
+
+    @property
+    def memory_cost(self):
+        return len(self._blob) if self._blob is not None else 0
+
+    def get(self):
+        blob = self._blob if self._blob is not None else _spill_store.read(*self._spilled)
+        return zlib.decompress(blob).decode("utf-8")
+
+    def spill(self):
+        """Move o blob para o disco; retorna os bytes liberados."""
+        if self._blob is None:
+            return 0
+        freed = len(self._blob)
+        try:
+            self._spilled = _spill_store.write(self._blob)
+        except OSError as e:
+            print(f"Aviso: não foi possível compactar o histórico: {e}")
+            return 0
+        self._blob = None
+        return freed
+
+
+def _common_affixes(a, b):
+    """Tamanhos do prefixo e do sufixo comuns, sem sobreposição."""
+    prefix = len(os.path.commonprefix([a, b]))
+    limit = min(len(a), len(b)) - prefix
+    suffix = len(os.path.commonprefix([a[::-1][:limit], b[::-1][:limit]]))
+    return prefix, suffix
+
+
+class HtmlChange:
+    """Par antes/depois de HTML guardado como 'depois' + diferença para o 'antes'."""
+
+    def __init__(self, old_html, new_html):
+        self._prefix, self._suffix = _common_affixes(old_html, new_html)
+        self._new = CompactText(new_html)
+        self._old_middle = CompactText(old_html[self._prefix:len(old_html) - self._suffix])
+
+    @property
+    def new_html(self):
+        return self._new.get()
+
+    @property
+    def old_html(self):
+        new = self._new.get()
+        return new[:self._prefix] + self._old_middle.get() + new[len(new) - self._suffix:]
+
+    @property
+    def memory_cost(self):
+        return self._new.memory_cost + self._old_middle.memory_cost
+
+    def spill(self):
+        return self._new.spill() + self._old_middle.spill()
+
+
+def _children(cmd):
+    """Filhos do comando: os do Qt (macros) e os de um BatchCommand."""
+    children = [cmd.child(i) for i in range(cmd.childCount())]
+    children.extend(getattr(cmd, "commands", ()))
+    return children
+
+
+def command_cost(cmd):
+    """Custo estimado do comando e dos filhos (calculado uma vez por comando)."""
+    cost = getattr(cmd, "_undo_cost", None)
+    if cost is None:
+        payload = getattr(cmd, "payload", None)
+        cost = _COMMAND_OVERHEAD + (payload.memory_cost if payload is not None else 0)
+        for child in _children(cmd):
+            cost += command_cost(child)
+        try:
+            cmd._undo_cost = cost
+        except AttributeError:
+            pass
+    return cost
+
+
+def _spill_command(cmd):
+    freed = 0
+    payload = getattr(cmd, "payload", None)
+    if payload is not None:
+        freed += payload.spill()
+    for child in _children(cmd):
+        freed += _spill_command(child)
+    if freed:
+        cmd._undo_cost = max(_COMMAND_OVERHEAD, command_cost(cmd) - freed)
+    return freed
+
+
+class UndoMemoryCap:
+    """Mantém a memória da pilha abaixo do limite despejando os comandos mais antigos."""
+
+    def __init__(self, stack, limit=UNDO_MEMORY_LIMIT):
+        self.stack = stack
+        self.limit = limit
+        self._entries = []  # (comando, custo) na ordem da pilha
+        self._total = 0
+        self._spilled = 0  # comandos do início já despejados
+        stack.indexChanged.connect(self._on_index_changed)
+        stack.destroyed.connect(self._detach)
+
+    def _detach(self, *_args):
+        self.stack = None
+        self._entries = []
+        self._total = 0
+        self._spilled = 0
+
+    def total_cost(self):
+        if self.stack is not None:
+            self._sync()
+        return self._total
+
+    def _sync(self):
+        """
+        Acompanha a pilha sem somar tudo de novo: a pilha só muda nas
+        pontas (mais antigos descartados pelo undoLimit, ramificação
+        descartada e comandos novos no topo).
+        """
+        stack = self.stack
+        entries = self._entries
+        count = stack.count()
+
+        drop = len(entries)
+        if count:
+            first = stack.command(0)
+            drop = next((i for i, (cmd, _cost) in enumerate(entries) if cmd is first), len(entries))
+        self._total -= sum(cost for _cmd, cost in entries[:drop])
+        del entries[:drop]
+        self._spilled = max(0, self._spilled - drop)
+
+        keep = min(len(entries), count)
+        while keep and entries[keep - 1][0] is not stack.command(keep - 1):
+            keep -= 1
+        self._total -= sum(cost for _cmd, cost in entries[keep:])
+        del entries[keep:]
+        self._spilled = min(self._spilled, keep)
+
+        for i in range(keep, count):
+            cmd = stack.command(i)
+            cost = command_cost(cmd)
+            entries.append((cmd, cost))
+            self._total += cost
+
+    def _on_index_changed(self, _index):
+        if self.stack is None:
+            return
+        try:
+            self._sync()
+            current = self.stack.index()
+        except RuntimeError:
+            # Pilha destruída (o destrutor do QUndoStack ainda emite indexChanged)
+            self._detach()
+            return
+        if self._total <= self.limit:
+            return
+        # Nunca compacta o passo atual: é o mais provável de ser desfeito
+        for i in range(self._spilled, max(0, current - 1)):
+            cmd, cost = self._entries[i]
+            if _spill_command(cmd):
+                new_cost = command_cost(cmd)
+                self._entries[i] = (cmd, new_cost)
+                self._total -= cost - new_cost
+            self._spilled = i + 1
+            if self._total <= self.limit:
+                break
@@ -1,4 +1,6 @@
-from PySide6.QtWidgets import QGraphicsLineItem, QGraphicsScene
+from bisect import bisect_left, bisect_right
+
+from PySide6.QtWidgets import QGraphicsLineItem, QGraphicsScene, QGraphicsPathItem
 from PySide6.QtCore import Qt, QLineF, QPointF
 from PySide6.QtGui import QPen, QColor
 
@@ -13,94 +15,281 @@ class AlignmentGuide(QGraphicsLineItem):
             scene.addItem(self)
 
 
+class EdgeIndex:
+    """
+    Bordas dos itens parados da cena em listas ordenadas, uma por eixo
+    (esquerda, direita, centro-x, topo, base, centro-y). Montado uma vez no
+    início do arrasto; cada consulta é uma busca binária.
+    """
+
+    KEYS = ("left", "right", "center_x", "top", "bottom", "center_y")
+    # Máximo de vizinhos examinados na busca de espaçamento
+    MAX_SCAN = 64
+
+    def __init__(self, rects):
+        self.rects = list(rects)
+        self.columns = {}
+        self.owners = {}
+        getters = {
+            "left": lambda r: r.left(),
+            "right": lambda r: r.right(),
+            "center_x": lambda r: r.center().x(),
+            "top": lambda r: r.top(),
+            "bottom": lambda r: r.bottom(),
+            "center_y": lambda r: r.center().y(),
+        }
+        for key, get in getters.items():
+            pairs = sorted((get(r), i) for i, r in enumerate(self.rects))
+            self.columns[key] = [v for v, _ in pairs]
+            self.owners[key] = [i for _, i in pairs]
+
+    def __len__(self):
+        return len(self.rects)
+
+    def nearest(self, key, value, threshold):
+        """Valor mais próximo de `value` na coluna, se estiver a menos de `threshold`."""
+        values = self.columns[key]
+        i = bisect_left(values, value)
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < len(values):
+                diff = abs(values[j] - value)
+                if diff < threshold and (best is None or diff < abs(best - value)):
+                    best = values[j]
+        return best
+
+    def neighbour(self, rect, side):
+        """
+        Item mais próximo do lado indicado ('left', 'right', 'above', 'below')
+        que se sobrepõe ao retângulo no outro eixo.
+        """
+        if side == "left":
+            key, limit, step, overlap = "right", rect.left(), -1, self._overlaps_y
+        elif side == "right":
+            key, limit, step, overlap = "left", rect.right(), 1, self._overlaps_y
+        elif side == "above":
+            key, limit, step, overlap = "bottom", rect.top(), -1, self._overlaps_x
+        else:
+            key, limit, step, overlap = "top", rect.bottom(), 1, self._overlaps_x
+        values = self.columns[key]
+        owners = self.owners[key]
+        if step < 0:
+            j = bisect_right(values, limit) - 1
+        else:
+            j = bisect_left(values, limit)
+        for _ in range(self.MAX_SCAN):
+            if not 0 <= j < len(values):
+                break
+            other = self.rects[owners[j]]
+            if overlap(rect, other):
+                return other
+            j += step
+        return None
+
+    @staticmethod
+    def _overlaps_y(a, b):
+        return a.top() < b.bottom() and b.top() < a.bottom()
+
+    @staticmethod
+    def _overlaps_x(a, b):
+        return a.left() < b.right() and b.left() < a.right()
+
+
+# Gerenciador com arrasto em andamento (há no máximo um por vez)
+_active_drag = None
+
+
+def snap_position(item, value):
+    """
+    Ajusta a posição proposta em ItemPositionChange com o deslocamento de
+    snap do arrasto em andamento. Fora de um arrasto devolve `value` intacto.
+    """
+    if _active_drag is None:
+        return value
+    offset = _active_drag.snap_offset_for(item)
+    return value + offset if offset is not None else value
+
+
 class AlignmentGuidesManager:
     """Gerencia as linhas de alinhamento visual"""
-    
+
     SNAP_THRESHOLD = 10  # pixels para considerar alinhado
-    
+
     def __init__(self, scene):
         self.scene = scene
-        self.guides = []
-    
+        self.guides = []  # pool: criadas uma vez, depois só movidas/ocultadas
+        self._index = None
+        self._excluded = set()
+        # Snap: grade opcional (0 = desligada) e deslocamento do tique atual
+        self.grid_size = 0
+        self._moving_rect = None
+        self._snap_offset = None
+
+    # -------------------------------
+    # ÍNDICE DE BORDAS
+    # -------------------------------
+    def begin_drag(self, moving_items):
+        """Indexa as bordas de todos os itens que NÃO estão sendo arrastados."""
+        global _active_drag
+        moving_items = list(moving_items)
+        self._excluded = {id(item) for item in moving_items}
+        self._moving_rect = None
+        for item in moving_items:
+            r = item.sceneBoundingRect()
+            self._moving_rect = r if self._moving_rect is None else self._moving_rect.united(r)
+        self._snap_offset = None
+        _active_drag = self
+        rects = []
+        for item in self.scene.items():
+            if item.parentItem() is not None or id(item) in self._excluded:
+                continue
+            if isinstance(item, (AlignmentGuide, QGraphicsPathItem)) or not item.isVisible():
+                continue
+            rects.append(item.sceneBoundingRect())
+        self._index = EdgeIndex(rects)
+
+    def end_drag(self):
+        """Descarta o índice e retira as guias da cena (continuam no pool)."""
+        global _active_drag
+        if _active_drag is self:
+            _active_drag = None
+        self._index = None
+        self._excluded = set()
+        self._moving_rect = None
+        self._snap_offset = None
+        for guide in self._live_guides():
+            if guide.scene() is not None:
+                guide.scene().removeItem(guide)
+
+    def _ensure_index(self, moving_item):
+        if self._index is None or id(moving_item) not in self._excluded:
+            selected = [it for it in self.scene.selectedItems() if it.parentItem() is None]
+            self.begin_drag(set(selected) | {moving_item})
+        return self._index
+
+    # -------------------------------
+    # SNAP
+    # -------------------------------
+    def prepare_snap(self, delta, enabled=True):
+        """
+        Calcula o deslocamento de snap do tique atual para toda a seleção
+        (retângulo inicial da seleção transladado por `delta`). Os itens o
+        aplicam em ItemPositionChange via snap_position().
+        """
+        self._snap_offset = None
+        if not enabled or self._index is None or self._moving_rect is None:
+            return None
+        rect = self._moving_rect.translated(delta)
+        dx = self._snap_axis(rect, horizontal=True)
+        dy = self._snap_axis(rect, horizontal=False)
+        if dx or dy:
+            self._snap_offset = QPointF(dx, dy)
+        return self._snap_offset
+
+    def snap_offset_for(self, item):
+        if self._snap_offset is None or id(item) not in self._excluded:
+            return None
+        return self._snap_offset
+
+    def _snap_axis(self, rect, horizontal):
+        """Menor correção em um eixo: guias, espaçamento igual ou grade."""
+        index = self._index
+        t = self.SNAP_THRESHOLD
+        if horizontal:
+            features = (("left", rect.left()), ("right", rect.right()), ("center_x", rect.center().x()))
+            start, end, before, after = rect.left(), rect.right(), "left", "right"
+        else:
+            features = (("top", rect.top()), ("bottom", rect.bottom()), ("center_y", rect.center().y()))
+            start, end, before, after = rect.top(), rect.bottom(), "above", "below"
+
+        candidates = []
+        # 1. Alinhamento de bordas/centros
+        for key, value in features:
+            hit = index.nearest(key, value, t)
+            if hit is not None:
+                candidates.append(hit - value)
+
+        # 2. Espaçamento igual entre vizinhos
+        def span(r):
+            return (r.left(), r.right()) if horizontal else (r.top(), r.bottom())
+
+        prev = index.neighbour(rect, before)
+        nxt = index.neighbour(rect, after)
+        if prev is not None and nxt is not None:
+            # Centralizar entre os dois vizinhos
+            gap = (span(nxt)[0] - span(prev)[1] - (end - start)) / 2
+            if gap > 0:
+                candidates.append(span(prev)[1] + gap - start)
+        if prev is not None:
+            prev2 = index.neighbour(prev, before)
+            if prev2 is not None:
+                gap = span(prev)[0] - span(prev2)[1]
+                if gap > 0:
+                    candidates.append(span(prev)[1] + gap - start)
+        if nxt is not None:
+            nxt2 = index.neighbour(nxt, after)
+            if nxt2 is not None:
+                gap = span(nxt2)[0] - span(nxt)[1]
+                if gap > 0:
+                    candidates.append(span(nxt)[0] - gap - end)
+
+        near = [c for c in candidates if abs(c) < t]
+        if near:
+            return min(near, key=abs)
+
+        # 3. Grade (opcional): sempre ajusta a borda inicial
+        if self.grid_size > 0:
+            return round(start / self.grid_size) * self.grid_size - start
+        return 0.0
+
     def clear_guides(self):
-        """Remove todas as linhas de guia"""
+        """Oculta todas as linhas de guia"""
+        for guide in self._live_guides():
+            guide.setVisible(False)
+
+    def _live_guides(self):
+        """Guias do pool que ainda existem (scene.clear() destrói as que estão na cena)."""
+        alive = []
         for guide in self.guides:
-            self.scene.removeItem(guide)
-        self.guides = []
-    
+            try:
+                guide.scene()
+                alive.append(guide)
+            except RuntimeError:
+                pass
+        self.guides = alive
+        return alive
+
     def get_alignment_lines(self, moving_item):
         """Calcula as linhas de alinhamento para um item em movimento"""
+        index = self._ensure_index(moving_item)
+        r = moving_item.sceneBoundingRect()
+        scene_rect = self.scene.sceneRect()
         lines = []
-        
-        moving_rect = moving_item.sceneBoundingRect()
-        moving_left = moving_rect.left()
-        moving_right = moving_rect.right()
-        moving_top = moving_rect.top()
-        moving_bottom = moving_rect.bottom()
-        moving_center_x = moving_rect.center().x()
-        moving_center_y = moving_rect.center().y()
-        
-        # Coletar todos os itens para comparação
-        other_items = [item for item in self.scene.items() if item != moving_item and hasattr(item, 'sceneBoundingRect')]
-        
-        for other_item in other_items:
-            other_rect = other_item.sceneBoundingRect()
-            other_left = other_rect.left()
-            other_right = other_rect.right()
-            other_top = other_rect.top()
-            other_bottom = other_rect.bottom()
-            other_center_x = other_rect.center().x()
-            other_center_y = other_rect.center().y()
-            
-            # Alinhamento VERTICAL (esquerda)
-            if abs(moving_left - other_left) < self.SNAP_THRESHOLD:
-                x = moving_left
-                scene_rect = self.scene.sceneRect()
-                line = QLineF(x, scene_rect.top(), x, scene_rect.bottom())
-                lines.append(line)
-            
-            # Alinhamento VERTICAL (direita)
-            if abs(moving_right - other_right) < self.SNAP_THRESHOLD:
-                x = moving_right
-                scene_rect = self.scene.sceneRect()
-                line = QLineF(x, scene_rect.top(), x, scene_rect.bottom())
-                lines.append(line)
-            
-            # Alinhamento VERTICAL (centro)
-            if abs(moving_center_x - other_center_x) < self.SNAP_THRESHOLD:
-                x = moving_center_x
-                scene_rect = self.scene.sceneRect()
-                line = QLineF(x, scene_rect.top(), x, scene_rect.bottom())
-                lines.append(line)
-            
-            # Alinhamento HORIZONTAL (topo)
-            if abs(moving_top - other_top) < self.SNAP_THRESHOLD:
-                y = moving_top
-                scene_rect = self.scene.sceneRect()
-                line = QLineF(scene_rect.left(), y, scene_rect.right(), y)
-                lines.append(line)
-            
-            # Alinhamento HORIZONTAL (base)
-            if abs(moving_bottom - other_bottom) < self.SNAP_THRESHOLD:
-                y = moving_bottom
-                scene_rect = self.scene.sceneRect()
-                line = QLineF(scene_rect.left(), y, scene_rect.right(), y)
-                lines.append(line)
-            
-            # Alinhamento HORIZONTAL (centro)
-            if abs(moving_center_y - other_center_y) < self.SNAP_THRESHOLD:
-                y = moving_center_y
-                scene_rect = self.scene.sceneRect()
-                line = QLineF(scene_rect.left(), y, scene_rect.right(), y)
-                lines.append(line)
-        
+
+        # Alinhamento VERTICAL (esquerda, direita, centro)
+        for key, x in (("left", r.left()), ("right", r.right()), ("center_x", r.center().x())):
+            if index.nearest(key, x, self.SNAP_THRESHOLD) is not None:
+                lines.append(QLineF(x, scene_rect.top(), x, scene_rect.bottom()))
+
+        # Alinhamento HORIZONTAL (topo, base, centro)
+        for key, y in (("top", r.top()), ("bottom", r.bottom()), ("center_y", r.center().y())):
+            if index.nearest(key, y, self.SNAP_THRESHOLD) is not None:
+                lines.append(QLineF(scene_rect.left(), y, scene_rect.right(), y))
+
         return lines
-    
+
     def show_guides(self, moving_item):
         """Exibe as linhas de guia para um item"""
-        self.clear_guides()
         lines = self.get_alignment_lines(moving_item)
-        
-        for line in lines:
-            guide = AlignmentGuide(line, self.scene)
-            self.guides.append(guide)
+        guides = self._live_guides()
+        while len(guides) < len(lines):
+            guides.append(AlignmentGuide(QLineF(), self.scene))
+
+        for guide, line in zip(guides, lines):
+            if guide.scene() is not self.scene:
+                self.scene.addItem(guide)
+            if guide.line() != line:
+                guide.setLine(line)
+            guide.setVisible(True)
+        for guide in guides[len(lines):]:
+            guide.setVisible(False)
@@ -157,9 +157,9 @@ class MindMapNode(QGraphicsRectItem):
         if change == QGraphicsItem.ItemPositionHasChanged:
             if self.scene():
                 try:
-                    from core.connection import SmartConnection
-                    for item in self.scene().items():
-                        if isinstance(item, SmartConnection) and item.target == self:
+                    from core.connection import connections_of
+                    for item in connections_of(self):
+                        if item.target is self:
                             item.prepareGeometryChange()
                             item.update_path()
                 except: pass
@@ -49,12 +49,12 @@ class GroupNode(QGraphicsRectItem):
         if not self.scene():
             return
         try:
-            from core.connection import SmartConnection
-            items_to_update = set(self.child_items)
-            items_to_update.add(self)
-            for conn in self.scene().items():
-                if isinstance(conn, SmartConnection):
-                    if conn.target in items_to_update:
+            from core.connection import connections_of
+            seen = set()
+            for item in list(self.child_items) + [self]:
+                for conn in connections_of(item):
+                    if conn.target is item and id(conn) not in seen:
+                        seen.add(id(conn))
                         conn.prepareGeometryChange()
                         conn.update_path()
         except:
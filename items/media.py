@@ -1,11 +1,11 @@
-from PySide6.QtWidgets import QGraphicsObject, QWidget, QHBoxLayout, QPushButton, QLabel, QGraphicsProxyWidget, QVBoxLayout, QMenu, QFileDialog, QSlider, QGraphicsDropShadowEffect
+from PySide6.QtWidgets import QGraphicsObject, QGraphicsItem, QWidget, QHBoxLayout, QPushButton, QLabel, QGraphicsProxyWidget, QVBoxLayout, QMenu, QFileDialog, QSlider, QGraphicsDropShadowEffect
 from PySide6.QtCore import QObject, QEvent
 from PySide6.QtGui import QPixmap, QImage, QPainter, QAction, QColor
 from PySide6.QtCore import QRectF, Qt, QTimer
 from PySide6.QtGui import QMovie
 from .shapes import Handle
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PySide6.QtMultimediaWidgets import QVideoWidget
+from core.scene_stats import attached_stats
+from core.app_context import get_app_context
 from PySide6.QtGui import QUndoCommand
 from PySide6.QtWidgets import QApplication
 
@@ -66,6 +66,18 @@ class MediaItem(QGraphicsObject):
         shadow.setColor(QColor(0, 0, 0, 100))
         self.setGraphicsEffect(shadow)
 
+    def itemChange(self, change, value):
+        # Bytes de mídia nas estatísticas da cena
+        if change == QGraphicsItem.ItemSceneChange:
+            stats = attached_stats(self.scene())
+            if stats is not None:
+                stats.media_removed(self)
+        elif change == QGraphicsItem.ItemSceneHasChanged:
+            stats = attached_stats(value)
+            if stats is not None:
+                stats.media_added(self)
+        return super().itemChange(change, value)
+
     def boundingRect(self):
         return QRectF(0, 0, 0, 0)
 
@@ -94,7 +106,8 @@ class MediaImageItem(MediaItem):
     def __init__(self, image: QImage, source: str = "", parent: QObject = None):
         super().__init__(parent)
         self._movie = None
-        self._pix = QPixmap.fromImage(image) if not image.isNull() else QPixmap()
+        # Pixmap compartilhado com outros itens/janelas da mesma origem
+        self._pix = get_app_context().images.pixmap(image, source)
         # Tentar inicializar QMovie para GIF/WEBP quando source é arquivo local
         try:
             if source and isinstance(source, str):
@@ -192,13 +205,17 @@ class MediaImageItem(MediaItem):
         from PySide6.QtWidgets import QGraphicsItem
         if change == QGraphicsItem.ItemSelectedChange:
             self._set_handles_visible(bool(value))
+        if change == QGraphicsItem.ItemPositionChange:
+            from items.alignment_guides import snap_position
+            value = snap_position(self, value)
         if change == QGraphicsItem.ItemPositionHasChanged:
             if self.scene():
                 try:
-                    from core.connection import SmartConnection
-                    for item in self.scene().items():
-                        if isinstance(item, SmartConnection) and (item.source == self or item.target == self):
-                            item.update_path()
+                    from core.connection import connections_of, routing_suspended
+                    if routing_suspended():
+                        return super().itemChange(change, value)
+                    for item in connections_of(self):
+                        item.update_path()
                 except:
                     pass
         return super().itemChange(change, value)
@@ -231,6 +248,9 @@ class MediaAVSliderItem(MediaItem):
         }
         self._set_handles_visible(False)
 
+        # QtMultimedia só é carregado quando o primeiro áudio/vídeo é criado
+        from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+        from PySide6.QtMultimediaWidgets import QVideoWidget
         self._audio = QAudioOutput()
         self._player = QMediaPlayer()
         self._player.setAudioOutput(self._audio)
@@ -520,13 +540,17 @@ class MediaAVSliderItem(MediaItem):
         from PySide6.QtWidgets import QGraphicsItem
         if change == QGraphicsItem.ItemSelectedChange:
             self._set_handles_visible(bool(value))
+        if change == QGraphicsItem.ItemPositionChange:
+            from items.alignment_guides import snap_position
+            value = snap_position(self, value)
         if change == QGraphicsItem.ItemPositionHasChanged:
             if self.scene():
                 try:
-                    from core.connection import SmartConnection
-                    for item in self.scene().items():
-                        if isinstance(item, SmartConnection) and (item.source == self or item.target == self):
-                            item.update_path()
+                    from core.connection import connections_of, routing_suspended
+                    if routing_suspended():
+                        return super().itemChange(change, value)
+                    for item in connections_of(self):
+                        item.update_path()
                 except:
                     pass
         return super().itemChange(change, value)
@@ -553,6 +577,7 @@ class MediaAVItem(MediaItem):
         self._set_handles_visible(False)
 
         # Player setup - apenas áudio
+        from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
         self._audio = QAudioOutput()
         self._player = QMediaPlayer()
         self._player.setAudioOutput(self._audio)
@@ -565,9 +590,10 @@ class MediaAVItem(MediaItem):
         self._video_label.setMinimumSize(320, 180)
         self._video_label.setText("Carregando...")
         
-        # Timer para atualizar frames
+        # Timer para atualizar frames; o método é buscado a cada disparo para
+        # valer a instrumentação ligada depois (core.instrumentation)
         self._video_timer = QTimer(self)
-        self._video_timer.timeout.connect(self._update_video_frame)
+        self._video_timer.timeout.connect(lambda: self._update_video_frame())
 
         # Controls usando QLabel clicável
         from PySide6.QtWidgets import QHBoxLayout as HBoxLay
@@ -795,13 +821,17 @@ class MediaAVItem(MediaItem):
         from PySide6.QtWidgets import QGraphicsItem
         if change == QGraphicsItem.ItemSelectedChange:
             self._set_handles_visible(bool(value))
+        if change == QGraphicsItem.ItemPositionChange:
+            from items.alignment_guides import snap_position
+            value = snap_position(self, value)
         if change == QGraphicsItem.ItemPositionHasChanged:
             if self.scene():
                 try:
-                    from core.connection import SmartConnection
-                    for item in self.scene().items():
-                        if isinstance(item, SmartConnection) and (item.source == self or item.target == self):
-                            item.update_path()
+                    from core.connection import connections_of, routing_suspended
+                    if routing_suspended():
+                        return super().itemChange(change, value)
+                    for item in connections_of(self):
+                        item.update_path()
                 except:
                     pass
         return super().itemChange(change, value)
@@ -814,13 +844,13 @@ class MediaSliderImageItem(MediaItem):
     def __init__(self, images: list[QImage], sources: list[str] | None = None, parent: QObject = None):
         super().__init__(parent)
         self._entries = []  # cada entrada: {"pix": QPixmap, "movie": QMovie|None, "source": str}
+        images_cache = get_app_context().images
         for idx, img in enumerate(images):
-            pix = QPixmap.fromImage(img) if not img.isNull() else QPixmap()
+            source = sources[idx] if sources and idx < len(sources) else ""
+            pix = images_cache.pixmap(img, source)
             movie = None
-            source = ""
             try:
-                if sources and idx < len(sources):
-                    source = sources[idx]
+                if source:
                     low = str(source).lower()
                     if low.endswith((".gif", ".webp")):
                         mv = QMovie(source)
@@ -1245,13 +1275,17 @@ class MediaSliderImageItem(MediaItem):
         from PySide6.QtWidgets import QGraphicsItem
         if change == QGraphicsItem.ItemSelectedChange:
             self._set_handles_visible(bool(value))
+        if change == QGraphicsItem.ItemPositionChange:
+            from items.alignment_guides import snap_position
+            value = snap_position(self, value)
         if change == QGraphicsItem.ItemPositionHasChanged:
             if self.scene():
                 try:
-                    from core.connection import SmartConnection
-                    for item in self.scene().items():
-                        if isinstance(item, SmartConnection) and (item.source == self or item.target == self):
-                            item.update_path()
+                    from core.connection import connections_of, routing_suspended
+                    if routing_suspended():
+                        return super().itemChange(change, value)
+                    for item in connections_of(self):
+                        item.update_path()
                 except:
                     pass
         return super().itemChange(change, value)
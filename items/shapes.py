@@ -2,15 +2,60 @@ from PySide6.QtWidgets import (
     QGraphicsRectItem, QGraphicsTextItem, QApplication, QGraphicsDropShadowEffect,
     QGraphicsItem, QGraphicsProxyWidget
 )
-from PySide6.QtCore import Qt, QRectF, QPointF, QObject, Signal
+from PySide6.QtCore import Qt, QRectF, QPointF, QObject, Signal, QTimer
 from PySide6.QtGui import (
     QColor, QBrush, QLinearGradient, QFont, QPen, QPainter, QPainterPath,
     QTextCursor, QTextOption
 )
 from .node_styles import NODE_COLORS, NODE_STATE
+from .text_layout import TextLayoutCache
+from .alignment_guides import snap_position
+from core.search_index import attached_index
+from core.scene_stats import attached_stats
 
 MIN_W, MIN_H = 80, 50
 
+# Intervalo de agrupamento das mudanças de geometria causadas por digitação (~1 quadro)
+GEOMETRY_FRAME_MS = 16
+
+
+class _TextGeometryBatcher(QObject):
+    """Aplica o auto-dimensionamento dos nós no máximo uma vez por quadro."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(GEOMETRY_FRAME_MS)
+        self._timer.timeout.connect(self.flush)
+
+    def request(self, node):
+        self._pending[id(node)] = node
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        self._timer.stop()
+        pending, self._pending = self._pending, {}
+        for node in pending.values():
+            try:
+                node._adjust_rect_to_text()
+            except RuntimeError:
+                # Nó já destruído
+                pass
+
+
+_geometry_batcher = None
+
+
+def _get_geometry_batcher():
+    global _geometry_batcher
+    if _geometry_batcher is None:
+        _geometry_batcher = _TextGeometryBatcher()
+    return _geometry_batcher
+
+
 
 class SelectionAwareTextItem(QGraphicsTextItem):
     """QGraphicsTextItem que emite sinais quando há seleção de texto"""
@@ -158,7 +203,11 @@ class StyledNode(QGraphicsRectItem):
         text_option.setAlignment(Qt.AlignJustify)
         self.text.document().setDefaultTextOption(text_option)
 
-        self.text.document().contentsChanged.connect(self._adjust_rect_to_text)
+        # Tamanho ideal do texto memorizado por revisão do documento
+        self._text_layout = TextLayoutCache(self.text.document())
+        self._text_pos_key = None
+
+        self.text.document().contentsChanged.connect(self._on_text_contents_changed)
         self._center_text_vertical()
 
         # Media proxy/widget (inicialmente nenhum)
@@ -176,23 +225,13 @@ class StyledNode(QGraphicsRectItem):
         """Centraliza o texto verticalmente no objeto"""
         r = self.rect()
         
-        # Salvar cursor para preservar posição/seleção durante adjustSize
-        saved_cursor = self.text.textCursor()
-        
-        # Salvar a largura atual do texto
-        current_text_width = self.text.textWidth()
-        
-        # Forçar atualização do layout do texto (altura)
-        self.text.adjustSize()
+        if self.text.textWidth() <= 0:
+            # Sem largura definida: fixa a largura ideal (uma única diagramação)
+            saved_cursor = self.text.textCursor()
+            self.text.adjustSize()
+            self.text.setTextCursor(saved_cursor)
         
-        # Se tinhamos uma largura definida, restaurá-la
-        if current_text_width > 0:
-            self.text.setTextWidth(current_text_width)
-        
-        # Restaurar cursor
-        self.text.setTextCursor(saved_cursor)
-        
-        # Obter dimensões reais do texto
+        # Com largura fixa o layout do documento já está atualizado
         text_rect = self.text.boundingRect()
         th = text_rect.height()
         tw = text_rect.width()
@@ -215,10 +254,33 @@ class StyledNode(QGraphicsRectItem):
         y = max(5, y)
         
         # Aplicar posição
-        self.text.setPos(x, y)
-        
-        # Forçar atualização visual
-        self.text.update()
+        self._text_pos_key = self._text_layout_key()
+        if self.text.pos() != QPointF(x, y):
+            self.text.setPos(x, y)
+            self.text.update()
+
+    def _text_layout_key(self):
+        """Tudo o que influencia a posição do texto dentro do nó"""
+        r = self.rect()
+        doc = self.text.document()
+        return (r.width(), r.height(), self._is_title, self.text.textWidth(),
+                doc.revision(), doc.characterCount(), doc.defaultFont().key())
+
+    def _on_text_contents_changed(self):
+        # Índice de busca: só marca o nó, re-indexado na próxima consulta
+        index = attached_index(self.scene())
+        if index is not None:
+            index.mark_dirty(self)
+        stats = attached_stats(self.scene())
+        if stats is not None:
+            stats.node_text_changed(self)
+
+        if self.scene() is None:
+            # Fora da cena (criação/carregamento): ajusta imediatamente
+            self._adjust_rect_to_text()
+        else:
+            # Digitação: agrupa as mudanças de geometria por quadro
+            _get_geometry_batcher().request(self)
 
     def _adjust_rect_to_text(self):
         if self._is_title:
@@ -226,18 +288,9 @@ class StyledNode(QGraphicsRectItem):
             return
         doc = self.text.document()
         if not doc.isEmpty():
-            self.prepareGeometryChange()
-            
-            # Temporariamente remover a largura fixa para calcular o tamanho real do texto
-            old_text_width = self.text.textWidth()
-            self.text.setTextWidth(-1)  # -1 = sem limite de largura
-            
-            # Forçar atualização do layout
-            doc.adjustSize()
-            ideal = doc.size()
-            
-            # Restaurar a largura do texto
-            self.text.setTextWidth(old_text_width)
+            # Tamanho real do texto (sem wrapping forçado), medido pelo cache:
+            # só o bloco editado é re-medido e o documento visível não é tocado
+            ideal = self._text_layout.ideal_size()
             
             r = self.rect()
             # Calcular nova largura baseada no conteúdo real (sem wrapping forçado)
@@ -245,6 +298,7 @@ class StyledNode(QGraphicsRectItem):
             new_h = max(MIN_H, ideal.height() + 30)
             
             if new_w != r.width() or new_h != r.height():
+                self.prepareGeometryChange()
                 super().setRect(0, 0, new_w, new_h)
                 self.text.setTextWidth(max(20, new_w - 20))
                 self._center_text_vertical()
@@ -252,6 +306,16 @@ class StyledNode(QGraphicsRectItem):
                 self._update_media_proxy_geometry()
                 self.width = new_w
                 self.height = new_h
+                self._defer_connection_routing()
+            elif self._text_pos_key != self._text_layout_key():
+                self._center_text_vertical()
+
+    def _defer_connection_routing(self):
+        """Linha reta provisória já; roteamento completo quando a digitação pausar."""
+        if self.scene() is None:
+            return
+        from core.connection import connections_of, get_route_scheduler
+        get_route_scheduler().defer(connections_of(self))
 
     def _update_handle_positions(self):
         r = self.rect()
@@ -323,6 +387,21 @@ class StyledNode(QGraphicsRectItem):
         self.height = self.rect().height()
 
     def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemSceneChange:
+            # Saindo da cena atual: deixa o índice de busca dela
+            index = attached_index(self.scene())
+            if index is not None:
+                index.remove(self)
+            stats = attached_stats(self.scene())
+            if stats is not None:
+                stats.node_removed(self)
+        if change == QGraphicsItem.ItemSceneHasChanged:
+            index = attached_index(value)
+            if index is not None:
+                index.add(self)
+            stats = attached_stats(value)
+            if stats is not None:
+                stats.node_added(self)
         if change == QGraphicsItem.ItemSelectedChange:
             self._set_handles_visible(bool(value))
             # Quando selecionado, tornar o texto editável mas NÃO dar foco automaticamente
@@ -337,16 +416,18 @@ class StyledNode(QGraphicsRectItem):
                 self.text.setTextInteractionFlags(Qt.NoTextInteraction)
                 self.text.clearFocus()
         if change == QGraphicsRectItem.ItemPositionChange:
-            main = QApplication.activeWindow()
-            if hasattr(main, "alinhar_ativo") and main.alinhar_ativo:
-                pos = value
+            # Snap (guias, espaçamento, grade): deslocamento único da seleção
+            value = snap_position(self, value)
         if change == QGraphicsItem.ItemPositionHasChanged:
             # Atualizar APENAS conexões onde este nó é o destino
             if self.scene():
                 try:
-                    from core.connection import SmartConnection
-                    for item in self.scene().items():
-                        if isinstance(item, SmartConnection) and item.target == self:
+                    from core.connection import connections_of, routing_suspended
+                    if routing_suspended():
+                        return super().itemChange(change, value)
+                    # Índice de incidência das estatísticas: não varre a cena a cada passo do arraste
+                    for item in connections_of(self):
+                        if item.target is self:
                             item.prepareGeometryChange()
                             item.update_path()
                 except:
@@ -355,8 +436,9 @@ class StyledNode(QGraphicsRectItem):
 
     def paint(self, painter, option, widget=None):
         """Renderiza o nó com a imagem incorporada se houver"""
-        # Garantir que o texto esteja centralizado antes de desenhar
-        self._center_text_vertical()
+        # Recentralizar apenas se algo que afeta o layout mudou
+        if self._text_pos_key != self._text_layout_key():
+            self._center_text_vertical()
         
         if self._is_title:
             painter.setRenderHint(QPainter.Antialiasing)
@@ -420,6 +502,41 @@ class StyledNode(QGraphicsRectItem):
     # -------------------------------
     # CORES E ESTILOS
     # -------------------------------
+    # Tipo e sombra avisam as estatísticas da cena a cada alteração
+    @property
+    def node_type(self):
+        return self._node_type
+
+    @node_type.setter
+    def node_type(self, value):
+        old = getattr(self, "_node_type", None)
+        self._node_type = value
+        stats = attached_stats(self.scene())
+        if stats is not None:
+            stats.node_type_changed(self, old, value)
+
+    @property
+    def custom_color(self):
+        return self._custom_color
+
+    @custom_color.setter
+    def custom_color(self, value):
+        self._custom_color = value
+        stats = attached_stats(self.scene())
+        if stats is not None:
+            stats.node_color_changed(self)
+
+    @property
+    def has_shadow(self):
+        return self._has_shadow
+
+    @has_shadow.setter
+    def has_shadow(self, value):
+        self._has_shadow = value
+        stats = attached_stats(self.scene())
+        if stats is not None:
+            stats.node_shadow_changed(self, value)
+
     def update_color(self):
         if self.node_type in NODE_COLORS:
             colors = NODE_COLORS[self.node_type]
@@ -0,0 +1,166 @@
+"""
+Cache de layout de texto para o auto-dimensionamento dos nós.
+
+O tamanho ideal (sem quebra de linha) de um documento é a soma das medidas
+naturais de cada bloco (parágrafo). As medidas por bloco ficam em um cache
+LRU compartilhado, indexado pelo conteúdo e pela formatação do bloco: ao
+digitar, apenas o bloco alterado é medido de novo com QTextLayout, e o
+documento visível nunca precisa ser re-diagramado com largura -1.
+
+Por documento, o resultado é memorizado por (revisão, fonte, largura).
+"""
+from collections import OrderedDict
+
+from PySide6.QtCore import QSizeF
+from PySide6.QtGui import QTextLayout, QTextOption, QFontMetricsF
+
+# Caractere usado pelo Qt para objetos embutidos (imagens) no texto
+_OBJECT_REPLACEMENT = "\ufffc"
+_UNBOUNDED_WIDTH = 1e7
+
+
+class BlockMetricsCache:
+    """LRU de (largura, altura) naturais por bloco de texto."""
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def measure(self, block, base_font, text_option):
+        """Retorna (largura, altura) do bloco sem quebra automática."""
+        text = block.text()
+        formats = block.textFormats()
+        key = (
+            text,
+            base_font.key(),
+            text_option.tabStopDistance(),
+            tuple((r.start, r.length, r.format.font().key()) for r in formats),
+        )
+        size = self._entries.get(key)
+        if size is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return size
+
+        self.misses += 1
+        size = self._layout_block(text, formats, base_font, text_option)
+        self._entries[key] = size
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return size
+
+    @staticmethod
+    def _layout_block(text, formats, base_font, text_option):
+        if not text:
+            return (0.0, QFontMetricsF(base_font).height())
+
+        option = QTextOption(text_option)
+        option.setWrapMode(QTextOption.NoWrap)
+
+        layout = QTextLayout(text, base_font)
+        layout.setTextOption(option)
+        layout.setFormats(formats)
+        layout.beginLayout()
+        width = 0.0
+        height = 0.0
+        while True:
+            # Quebras forçadas (Shift+Enter) geram várias linhas por bloco
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(_UNBOUNDED_WIDTH)
+            width = max(width, line.naturalTextWidth())
+            height += line.height()
+        layout.endLayout()
+        return (width, height)
+
+
+# Cache compartilhado entre todos os nós: blocos iguais são medidos uma vez
+block_metrics = BlockMetricsCache()
+
+
+class TextLayoutCache:
+    """Tamanho ideal de um QTextDocument, memorizado e incremental."""
+
+    def __init__(self, document, blocks=None):
+        self.document = document
+        self.blocks = blocks if blocks is not None else block_metrics
+        self._key = None
+        self._size = QSizeF()
+
+    def invalidate(self):
+        self._key = None
+
+    def ideal_size(self, width=-1):
+        """
+        Tamanho do documento diagramado com a largura dada (-1 = sem quebra).
+        Não altera a largura nem o layout do documento original.
+        """
+        doc = self.document
+        font = doc.defaultFont()
+        key = (doc.revision(), doc.characterCount(), doc.blockCount(), font.key(), width)
+        if key == self._key:
+            return QSizeF(self._size)
+
+        if width < 0 and self._is_simple(doc):
+            size = self._sum_blocks(doc, font)
+        elif width > 0 and doc.textWidth() == width:
+            size = doc.size()
+        else:
+            size = self._measure_clone(doc, width)
+
+        self._key = key
+        self._size = QSizeF(size)
+        return QSizeF(size)
+
+    def _sum_blocks(self, doc, font):
+        option = doc.defaultTextOption()
+        indent_width = doc.indentWidth()
+        width = 0.0
+        height = 0.0
+        block = doc.begin()
+        while block.isValid():
+            bw, bh = self.blocks.measure(block, font, option)
+            fmt = block.blockFormat()
+            bw += (fmt.leftMargin() + fmt.rightMargin()
+                   + fmt.indent() * indent_width + fmt.textIndent())
+            width = max(width, bw)
+            height += bh + fmt.topMargin() + fmt.bottomMargin()
+            block = block.next()
+        margin = doc.documentMargin()
+        return QSizeF(width + 2 * margin, height + 2 * margin)
+
+    @staticmethod
+    def _is_simple(doc):
+        """Documentos com tabelas, listas, imagens ou entrelinha customizada
+        usam o caminho completo do QTextDocument."""
+        if doc.rootFrame().childFrames():
+            return False
+        block = doc.begin()
+        while block.isValid():
+            if block.textList() is not None:
+                return False
+            if block.blockFormat().lineHeightType() != 0:  # SingleHeight
+                return False
+            if _OBJECT_REPLACEMENT in block.text():
+                return False
+            block = block.next()
+        return True
+
+    @staticmethod
+    def _measure_clone(doc, width):
+        clone = doc.clone()
+        clone.setTextWidth(width)
+        if width < 0:
+            clone.adjustSize()
+        size = clone.size()
+        clone.deleteLater()
+        return size
@@ -1,14 +1,19 @@
 import sys
 import os
 import json
+import time
+
+from core.diagnostics import profiler
+profiler.begin("import main")
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QGraphicsView, QGraphicsScene,
     QToolBar, QFileDialog, QFrame, QFontDialog, QColorDialog,
     QMessageBox, QGraphicsTextItem, QDialog, QInputDialog,
-    QVBoxLayout, QHBoxLayout, QListWidget, QPushButton, QLabel
+    QVBoxLayout, QHBoxLayout, QListWidget, QPushButton, QLabel,
+    QProgressDialog
 )
-from PySide6.QtCore import Qt, QSize, QPointF, QRectF, QTimer
+from PySide6.QtCore import Qt, QSize, QPointF, QRectF, QTimer, QVariantAnimation, QEasingCurve
 from PySide6.QtGui import (
     QPainter, QColor, QAction, QWheelEvent,
     QUndoStack, QImage, QUndoCommand, QFont,
@@ -24,20 +29,51 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 from core.icon_manager import IconManager
 from core.persistence import PersistenceManager
 from core.item_filter import ItemFilter
-from core.positioning import find_best_position_radial
 from core.dialogs import FontStyleDialog, ColorPickerDialog
+from core.export import TiledPngExporter, TiledExportWorker, export_scene_svg, export_scene_pdf
+from core.scene_stats import stats_for, format_bytes
+from core.focus import DEFAULT_FOCUS_DEPTH, apply_focus, restore_focus
+from core.batch_edit import BatchEdit
+from core.clipboard import selection_to_mime, mime_has_subgraph, subgraph_from_mime, subgraph_bounds, build_subgraph
+from core.toolbar_state import ToolbarStateModel
+from core.undo_memory import HtmlChange, UndoMemoryCap, UNDO_COUNT_LIMIT, UNDO_MEMORY_LIMIT
+from core.instrumentation import metrics as perf_metrics, PerformanceHud, enable_from_env
+from core.app_context import get_app_context
 IconManager.set_icons_base(BASE_DIR)
 
 from items.shapes import StyledNode, Handle
 from items.group_item import GroupNode
-from core.connection import SmartConnection
+from core.connection import SmartConnection, get_route_scheduler, routing_suspended
 from items.alignment_guides import AlignmentGuidesManager
 from items.media import MediaItem
 from items.media import MediaImageItem
 from items.media import MediaSliderImageItem
 from items.media import MediaAVItem
 from items.media import MediaAVSliderItem
-import urllib.request
+# numpy (core.positioning, core.layout), sqlite3 (core.project_index),
+# shapely/scipy (core.connection), QtMultimedia e cv2 (items.media) e
+# urllib são importados no primeiro uso; ver bench/bench_startup.py.
+
+# Layout automático: acima deste número de itens, aplica sem animação
+LAYOUT_ANIMATION_MAX_ITEMS = 1500
+LAYOUT_ANIMATION_MS = 400
+
+# Tamanho da grade de snap (Ctrl+G)
+GRID_SIZE = 20
+
+# Máximo de resultados listados no diálogo Procurar
+SEARCH_RESULTS_LIMIT = 500
+
+# Atraso para redesenhar o painel de estatísticas após rajadas de alterações
+STATS_REFRESH_MS = 100
+
+# Desfazer: ids de fusão dos comandos de movimento e janela de fusão
+MOVE_COMMAND_ID = 1001
+MOVE_ITEMS_COMMAND_ID = 1002
+MOVE_MERGE_MS = 500
+
+# Deslocamento dos objetos colados quando os originais estão visíveis
+PASTE_OFFSET = 40
 
 
 # ======================================================
@@ -114,13 +150,35 @@ THEMES = {
     },
 }
 
+# Template QSS (lido uma vez) e folhas já geradas, por cores do tema
+_qss_template = None
+_qss_cache = {}
+
+
+def _load_qss_template():
+    global _qss_template
+    if _qss_template is None:
+        qss_path = os.path.join(BASE_DIR, "assets", "styles.qss")
+        try:
+            with open(qss_path, "r", encoding="utf-8") as f:
+                _qss_template = f.read()
+        except OSError:
+            _qss_template = ""
+    return _qss_template
+
+
 def generate_qss(theme):
-    """Gera o QSS a partir do template e do dicionário de cores do tema."""
-    qss_path = os.path.join(BASE_DIR, "assets", "styles.qss")
-    if not os.path.exists(qss_path):
+    """Gera o QSS a partir do template e do dicionário de cores do tema (memoizado)."""
+    key = tuple(sorted(theme.items()))
+    qss = _qss_cache.get(key)
+    if qss is None:
+        qss = _qss_cache[key] = _compile_qss(_load_qss_template(), theme)
+    return qss
+
+
+def _compile_qss(qss, theme):
+    if not qss:
         return ""
-    with open(qss_path, "r", encoding="utf-8") as f:
-        qss = f.read()
     replacements = {
         "{{PRIMARY}}": theme["primary"],
         "{{PRIMARY_LIGHT}}": theme["primary_light"],
@@ -172,18 +230,28 @@ class ChangeTextHtmlCommand(QUndoCommand):
     def __init__(self, item, old_html, new_html, description="Alterar texto"):
         super().__init__(description)
         self.item = item
-        self.old_html = old_html
-        self.new_html = new_html
+        # HTML compacto: "depois" comprimido e "antes" como diferença
+        self.payload = HtmlChange(old_html, new_html)
+
+    @property
+    def old_html(self):
+        return self.payload.old_html
+
+    @property
+    def new_html(self):
+        return self.payload.new_html
 
     def redo(self):
-        self.item.text.setHtml(self.new_html)
+        html = self.new_html
+        self.item.text.setHtml(html)
         # Forçar atualização da fonte do widget baseada no HTML
-        self._update_font_from_html(self.new_html)
+        self._update_font_from_html(html)
 
     def undo(self):
-        self.item.text.setHtml(self.old_html)
+        html = self.old_html
+        self.item.text.setHtml(html)
         # Forçar atualização da fonte do widget baseada no HTML
-        self._update_font_from_html(self.old_html)
+        self._update_font_from_html(html)
     
     def _update_font_from_html(self, html):
         """Extrai informações de fonte do HTML e aplica ao widget"""
@@ -231,8 +299,8 @@ class AddItemCommand(QUndoCommand):
         if isinstance(self.item, StyledNode) and self.window:
             if hasattr(self.item.text, 'selectionChanged'):
                 self.item.text.selectionChanged.connect(self.window.update_button_states)
-        # Se for uma conexão, atualizar o caminho
-        if hasattr(self.item, 'update_path'):
+        # Se for uma conexão, atualizar o caminho (em lote: recalculado ao final)
+        if hasattr(self.item, 'update_path') and not routing_suspended():
             self.item.update_path()
 
     def undo(self):
@@ -256,13 +324,47 @@ class RemoveItemCommand(QUndoCommand):
         self.scene.addItem(self.item)
 
 
+class PasteItemsCommand(QUndoCommand):
+    """Comando único para colar um subgrafo (nós, mídias e conexões): as
+    conexões são roteadas uma vez, depois que todos os itens estão na cena."""
+    def __init__(self, scene, items, connections, description="Colar objetos"):
+        super().__init__(description)
+        self.scene = scene
+        self.items = items
+        self.connections = connections
+
+    def redo(self):
+        with get_route_scheduler().suspend():
+            for item in self.items:
+                self.scene.addItem(item)
+            for conn in self.connections:
+                self.scene.addItem(conn)
+        for conn in self.connections:
+            conn.update_path()
+
+    def undo(self):
+        for conn in self.connections:
+            self.scene.removeItem(conn)
+        for item in self.items:
+            if hasattr(item, 'stop_video'):
+                item.stop_video()
+            self.scene.removeItem(item)
+
+
 class PasteTextCommand(QUndoCommand):
     """Comando para colar texto em um nó"""
     def __init__(self, node, old_html, new_html, description="Colar texto"):
         super().__init__(description)
         self.node = node
-        self.old_html = old_html
-        self.new_html = new_html
+        self.payload = HtmlChange(old_html, new_html)
+
+    @property
+    def old_html(self):
+        return self.payload.old_html
+
+    @property
+    def new_html(self):
+        return self.payload.new_html
 
     def redo(self):
         self.node.text.setHtml(self.new_html)
@@ -272,12 +374,26 @@ class PasteTextCommand(QUndoCommand):
 
 
 class MoveItemCommand(QUndoCommand):
-    """Comando para mover um item na cena"""
-    def __init__(self, item, old_pos, new_pos, description="Mover objeto"):
-        super().__init__(description)
+    """Comando para mover um item na cena. Movimentos seguidos do mesmo item
+    (dentro de MOVE_MERGE_MS) se fundem em um único passo de desfazer."""
+    def __init__(self, item, old_pos, new_pos, description="Mover objeto", parent=None):
+        super().__init__(description, parent)
         self.item = item
         self.old_pos = old_pos
         self.new_pos = new_pos
+        self.timestamp = time.monotonic()
+
+    def id(self):
+        return MOVE_COMMAND_ID
+
+    def mergeWith(self, other):
+        if not isinstance(other, MoveItemCommand) or other.item is not self.item:
+            return False
+        if other.old_pos != self.new_pos or other.timestamp - self.timestamp > MOVE_MERGE_MS / 1000:
+            return False
+        self.new_pos = other.new_pos
+        self.timestamp = other.timestamp
+        return True
 
     def redo(self):
         self.item.prepareGeometryChange()
@@ -294,7 +410,7 @@ class MoveItemCommand(QUndoCommand):
             self.item.scene().update()
     
     def _update_connections(self):
-        if self.item.scene():
+        if self.item.scene() and not routing_suspended():
             try:
                 from core.connection import SmartConnection
                 for conn in self.item.scene().items():
@@ -303,6 +419,65 @@ class MoveItemCommand(QUndoCommand):
             except:
                 pass
 
+class MoveItemsCommand(QUndoCommand):
+    """Macro de MoveItemCommand para vários itens (arrasto, alinhamento,
+    layout): um único passo de desfazer, com as conexões recalculadas uma
+    única vez ao final em vez de a cada item movido."""
+    def __init__(self, scene, moves, description="Mover objetos"):
+        super().__init__(description)
+        self.scene = scene
+        self.items = [item for item, _old, _new in moves]
+        self.moves = [
+            MoveItemCommand(item, old_pos, new_pos, description, parent=self)
+            for item, old_pos, new_pos in moves
+        ]
+        self.timestamp = time.monotonic()
+
+    def id(self):
+        return MOVE_ITEMS_COMMAND_ID
+
+    def mergeWith(self, other):
+        # Mesmo conjunto de itens movido de novo logo em seguida
+        if not isinstance(other, MoveItemsCommand) or other.text() != self.text():
+            return False
+        if other.timestamp - self.timestamp > MOVE_MERGE_MS / 1000 or len(other.moves) != len(self.moves):
+            return False
+        continued = {id(m.item): m for m in other.moves}
+        for move in self.moves:
+            nxt = continued.get(id(move.item))
+            if nxt is None or nxt.old_pos != move.new_pos:
+                return False
+        for move in self.moves:
+            move.new_pos = continued[id(move.item)].new_pos
+        self.timestamp = other.timestamp
+        return True
+
+    def redo(self):
+        with get_route_scheduler().suspend():
+            super().redo()
+        self._reroute()
+
+    def undo(self):
+        with get_route_scheduler().suspend():
+            super().undo()
+        self._reroute()
+
+    def _reroute(self):
+        moved = {id(item) for item in self.items}
+        for conn in self.scene.items():
+            if isinstance(conn, SmartConnection) and (id(conn.source) in moved or id(conn.target) in moved):
+                conn.prepareGeometryChange()
+                conn.update_path()
+        self.scene.update()
+
+class ApplyLayoutCommand(MoveItemsCommand):
+    """Movimentos de um layout automático (não se funde com arrastos)."""
+    def __init__(self, scene, moves, description="Reorganizar mapa"):
+        super().__init__(scene, moves, description)
+
+    def id(self):
+        return -1
+
 class ReplaceMediaCommand(QUndoCommand):
     """Comando para substituir um item de mídia por outro"""
     def __init__(self, scene, old_item, new_item, description="Substituir mídia"):
@@ -368,14 +543,13 @@ class ApplyStyleFilteredCommand(QUndoCommand):
     def redo(self):
         for item in self.items:
             item.set_node_type(self.new_style)
-            item.update_brush()
 
     def undo(self):
         for i, item in enumerate(self.items):
             state = self.old_states[i]
-            item.node_type = state['node_type']
-            item.custom_color = state['custom_color']
-            item.update_brush()
+            item.set_node_type(state['node_type'])
+            if state['custom_color']:
+                item.set_background(QColor(state['custom_color']))
 
 
 
@@ -466,6 +640,13 @@ class InfiniteCanvas(QGraphicsView):
         """Define o stack de Undo/Redo"""
         self.undo_stack = undo_stack
 
+    def paintEvent(self, event):
+        if not perf_metrics.enabled:
+            super().paintEvent(event)
+            return
+        with perf_metrics.frame():
+            super().paintEvent(event)
+
     def wheelEvent(self, event: QWheelEvent):
         factor = 1.15 if event.angleDelta().y() > 0 else 0.85
         self.scale(factor, factor)
@@ -617,9 +798,20 @@ class InfiniteCanvas(QGraphicsView):
                 if distance < 5:  # Threshold de 5 pixels para considerar drag
                     return
                 self._is_dragging = True
+                # Indexa as bordas dos itens parados uma única vez por arrasto
+                self.alignment_guides.begin_drag(
+                    [item for item in self._item_positions if item.isSelected()] + [self._dragging_item]
+                )
             
             # Mover TODOS os itens selecionados
             delta = current_pos - self._drag_start_pos
+
+            # Snap: um único deslocamento para toda a seleção, aplicado pelos
+            # próprios itens em ItemPositionChange (Alt desativa)
+            main_window = QApplication.activeWindow()
+            snap_enabled = (getattr(main_window, "alinhar_ativo", False)
+                            and not event.modifiers() & Qt.AltModifier)
+            self.alignment_guides.prepare_snap(delta, snap_enabled)
             
             # Preparar mudança de geometria para todos os itens selecionados
             for item, original_pos in self._item_positions.items():
@@ -636,7 +828,6 @@ class InfiniteCanvas(QGraphicsView):
             self.scene().update()
             
             # Mostrar linhas de alinhamento para o item sendo arrastado se estiver ativo
-            main_window = QApplication.activeWindow()
             if hasattr(main_window, "alinhar_ativo") and main_window.alinhar_ativo:
                 self.alignment_guides.show_guides(self._dragging_item)
             else:
@@ -646,8 +837,8 @@ class InfiniteCanvas(QGraphicsView):
         super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event):
-        # Limpar linhas de alinhamento
-        self.alignment_guides.clear_guides()
+        # Limpar linhas de alinhamento e o índice de bordas do arrasto
+        self.alignment_guides.end_drag()
         
         # Se estava arrastando uma conexão
         if self._dragging_connection and event.button() == Qt.LeftButton:
@@ -669,10 +860,17 @@ class InfiniteCanvas(QGraphicsView):
                 # Rastrear movimento para undo/redo
                 main_window = QApplication.activeWindow()
                 if hasattr(main_window, 'undo_stack'):
-                    for item, original_pos in self._item_positions.items():
-                        if item.isSelected() and item.pos() != original_pos:
-                            cmd = MoveItemCommand(item, original_pos, item.pos(), "Mover objeto")
-                            main_window.undo_stack.push(cmd)
+                    moves = [
+                        (item, original_pos, item.pos())
+                        for item, original_pos in self._item_positions.items()
+                        if item.isSelected() and item.pos() != original_pos
+                    ]
+                    if len(moves) == 1:
+                        item, old_pos, new_pos = moves[0]
+                        main_window.undo_stack.push(MoveItemCommand(item, old_pos, new_pos, "Mover objeto"))
+                    elif moves:
+                        # Vários itens: um único passo de desfazer
+                        main_window.undo_stack.push(MoveItemsCommand(self.scene(), moves, "Mover objetos"))
             
             # Resetar estado de drag
             self._dragging_item = None
@@ -762,22 +960,32 @@ class AmareloMainWindow(QMainWindow):
         self.setWindowIcon(IconManager.load_icon("Arquivos.png"))
 
         self.undo_stack = QUndoStack(self)
+        # Limites do histórico: passos (só pode ser definido com a pilha vazia) e memória
+        self.undo_stack.setUndoLimit(UNDO_COUNT_LIMIT)
+        self.undo_memory_cap = UndoMemoryCap(self.undo_stack, UNDO_MEMORY_LIMIT)
         self.current_file = None
         self.groups = []
         
         # Gerenciador de persistência
         self.persistence = PersistenceManager()
         
+        # Recursos compartilhados entre as janelas (imagens, autosave, índice de projetos)
+        self.context = get_app_context()
+        self.context.register_window(self)
+
         # Autosave configuration
         self.autosave_enabled = False
-        self.autosave_timer = QTimer()
-        self.autosave_timer.timeout.connect(self._autosave)
-        self.autosave_timer.setInterval(2000)  # Auto-save a cada 2 segundos
-        self.autosave_timer.start()
         
+        # Layout automático em andamento
+        self._layout_worker = None
+
+        # Exportação PNG em andamento (thread própria)
+        self._export_worker = None
+
         # Hide mode - controlled by button
         self.hide_mode_active = False
         self.hide_mode_hidden_items = []
+        self.focus_depth = DEFAULT_FOCUS_DEPTH
         
         # Conectar sinais para detectar mudanças
         self.undo_stack.indexChanged.connect(self._on_undo_stack_changed)
@@ -785,6 +993,9 @@ class AmareloMainWindow(QMainWindow):
 
         # Alinhar ativo por padrão
         self.alinhar_ativo = True
+
+        # Layout incremental: ao adicionar um filho, os vizinhos abrem espaço
+        self.layout_incremental = True
         
         # Tema atual
         self.current_theme_name = "Padrão"
@@ -793,10 +1004,26 @@ class AmareloMainWindow(QMainWindow):
         self.view = InfiniteCanvas(self.scene, self)
         self.view.set_undo_stack(self.undo_stack)
         self.setCentralWidget(self.view)
+
+        # HUD de desempenho (instrumentação ligada por AMARELO_INSTRUMENT ou Ctrl+Shift+P)
+        self.performance_hud = PerformanceHud(self.view)
+        if enable_from_env():
+            self.performance_hud.show()
         
         # Filtro de itens
         self.item_filter = ItemFilter(self.scene)
 
+        # Estatísticas incrementais (criadas com a cena vazia) e painel na barra de status
+        self.scene_stats = stats_for(self.scene)
+        self.stats_label = QLabel()
+        self.statusBar().addPermanentWidget(self.stats_label)
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setSingleShot(True)
+        self._stats_timer.setInterval(STATS_REFRESH_MS)
+        self._stats_timer.timeout.connect(self.update_stats_panel)
+        self.scene_stats.add_listener(lambda _stats: self._stats_timer.start())
+        self.update_stats_panel()
+
         # Atalhos customizados
         self.custom_shortcuts = {
             "Novo": "Ctrl+N",
@@ -812,24 +1039,34 @@ class AmareloMainWindow(QMainWindow):
             "Mídia": "",
             "Conectar": "C",
             "Ocultar": "Ctrl+O",
+            "Profundidade do foco": "Ctrl+Shift+O",
             "Excluir": "Delete",
             "Fonte": "",
             "Cores": "",
             "Alinhar": "D",
+            "Reorganizar": "Ctrl+L",
+            "Grade": "Ctrl+G",
             "Temas": "",
             "Localizar": "Ctrl+F",
+            "Procurar em projetos": "Ctrl+Shift+F",
+            "Desempenho": "Ctrl+Shift+P",
+            "Relatório de desempenho": "Ctrl+Shift+E",
         }
         
         self.load_shortcuts_from_file()
         
-        self.load_styles()
-        self.setup_toolbar()
+        with profiler.span("theme/QSS"):
+            self.load_styles()
+        with profiler.span("toolbar/icons"):
+            self.setup_toolbar()
 
-        self.scene.selectionChanged.connect(self.update_button_states)
-        self.scene.changed.connect(self.update_button_states)
+        # Estado da barra: derivado de sinais e contadores, uma vez por volta do laço
+        self.toolbar_state = ToolbarStateModel(
+            self.scene, self.scene_stats, StyledNode, MediaItem, self._apply_toolbar_state, self
+        )
         # Conecta sinais de seleção de texto em itens existentes
         self._connect_text_signals()
-        self.update_button_states()
+        self.toolbar_state.recompute()
 
     def _connect_text_signals(self):
         """Conecta sinais de seleção de texto em todos os itens StyledNode"""
@@ -846,10 +1083,18 @@ class AmareloMainWindow(QMainWindow):
         """Detecta mudanças no undo/redo para acionar autosave"""
         if self.autosave_enabled and index != self._last_autosave_index:
             self._last_autosave_index = index
-            # Resetar timer para evitar saves muito frequentes
-            self.autosave_timer.stop()
-            self.autosave_timer.start()
+            # Agendador compartilhado: grava 2 s após a última alteração
+            self.context.autosave.mark_dirty(self)
     
+    def closeEvent(self, event):
+        # Não perde o autosave pendente ao fechar a janela
+        self.context.autosave.flush(self)
+        if self._export_worker is not None:
+            # A thread não pode ser destruída com a janela ainda rodando
+            self._export_worker.requestInterruption()
+            self._export_worker.wait()
+        super().closeEvent(event)
+
     def _autosave(self):
         """Executa autosave se houver mudanças e arquivo existir"""
         if self.current_file and self.undo_stack.canUndo():
@@ -1058,7 +1303,7 @@ class AmareloMainWindow(QMainWindow):
         # Save button - autosave always on after file is created
         self.act_save = make_action("Salvar.png", "Salvar alterações", self.save_project, "Salvar")
         
-        self.act_export = make_action("Exportar.png", "Exportar como imagem", self.export_png)
+        self.act_export = make_action("Exportar.png", "Exportar como imagem (PNG, SVG ou PDF)", self.export_scene)
 
         tb.addSeparator()
 
@@ -1088,6 +1333,22 @@ class AmareloMainWindow(QMainWindow):
         
         # Botão ocultar/reexibir
         self.act_hide = make_action("Ocultar.png", "Ocultar ou reexibir objetos", self.toggle_hide_mode, "Ocultar")
+
+        # Profundidade do modo foco: ação da janela (atalho), sem botão na barra
+        self.act_focus_depth = QAction("Profundidade do foco", self)
+        self.act_focus_depth.setShortcut(self.custom_shortcuts.get("Profundidade do foco", ""))
+        self.act_focus_depth.triggered.connect(self.set_focus_depth)
+        self.addAction(self.act_focus_depth)
+
+        # Instrumentação: HUD e relatório, também sem botão na barra
+        self.act_performance_hud = QAction("Desempenho", self)
+        self.act_performance_hud.setShortcut(self.custom_shortcuts.get("Desempenho", ""))
+        self.act_performance_hud.triggered.connect(self.toggle_performance_hud)
+        self.addAction(self.act_performance_hud)
+        self.act_performance_report = QAction("Relatório de desempenho", self)
+        self.act_performance_report.setShortcut(self.custom_shortcuts.get("Relatório de desempenho", ""))
+        self.act_performance_report.triggered.connect(self.export_performance_report)
+        self.addAction(self.act_performance_report)
         
         self.act_delete = make_action("Excluir.png", "Excluir", self.delete_selected, "Excluir")
 
@@ -1101,11 +1362,30 @@ class AmareloMainWindow(QMainWindow):
         self.act_align = make_action("Alinhar.png", "Alinhar objetos", self.align_objects, "Alinhar")
         self.act_themes = make_action("Temas.png", "Temas", self.show_themes_dialog, "Temas")
 
+        # Layout automático: ação da janela (atalho), sem botão na barra
+        self.act_layout = QAction("Reorganizar mapa", self)
+        self.act_layout.setShortcut(self.custom_shortcuts.get("Reorganizar", ""))
+        self.act_layout.triggered.connect(self.auto_layout)
+        self.addAction(self.act_layout)
+
+        # Snap à grade: liga/desliga pelo atalho
+        self.act_grid = QAction("Snap à grade", self)
+        self.act_grid.setCheckable(True)
+        self.act_grid.setShortcut(self.custom_shortcuts.get("Grade", ""))
+        self.act_grid.toggled.connect(self.toggle_grid_snap)
+        self.addAction(self.act_grid)
+
         tb.addSeparator()
 
         # Botão Localizar
         self.act_search = make_action("Localizar.png", "Localizar", self.show_search_dialog, "Localizar")
 
+        # Busca em todos os projetos das pastas indexadas (atalho, sem botão)
+        self.act_project_search = QAction("Procurar em projetos", self)
+        self.act_project_search.setShortcut(self.custom_shortcuts.get("Procurar em projetos", ""))
+        self.act_project_search.triggered.connect(self.show_project_search_dialog)
+        self.addAction(self.act_project_search)
+
         # Botão Teclas de Atalho
         make_action("TecladeAtalho.png", "Teclas de atalho", self.show_shortcuts_dialog)
 
@@ -1119,149 +1399,119 @@ class AmareloMainWindow(QMainWindow):
     # HIDE MODE
     # --------------------------------------------------
     def toggle_hide_mode(self):
-        """Alterna modo de ocultar/reexibir objetos"""
+        """Alterna o modo foco: oculta o que está fora da vizinhança dos selecionados"""
         if self.hide_mode_active:
-            # Reexibir todos os objetos ocultos
-            self.hide_mode_active = False
-            for item in self.hide_mode_hidden_items:
-                item.setVisible(True)
-            self.hide_mode_hidden_items = []
-            # Alternar ícone para Ocultar
-            if hasattr(self, 'act_hide'):
-                self.act_hide.setIcon(IconManager.load_icon("Ocultar.png", "O"))
-        else:
-            # Ocultar objetos não conectados ao selecionado
-            sel = self.scene.selectedItems()
-            styled_nodes = [item for item in sel if isinstance(item, StyledNode)]
-            
-            if len(styled_nodes) != 1:
-                return
-            
-            selected_node = styled_nodes[0]
-            self.hide_mode_active = True
-            self.hide_mode_hidden_items = []
-            
-            # Encontrar nós conectados
-            connected_nodes = {selected_node}
-            connected_connections = set()
-            
-            for conn in self.scene.items():
-                if isinstance(conn, SmartConnection):
-                    if conn.source == selected_node:
-                        connected_nodes.add(conn.target)
-                        connected_connections.add(conn)
-                    elif conn.target == selected_node:
-                        connected_nodes.add(conn.source)
-                        connected_connections.add(conn)
-            
-            # Ocultar nós não conectados
-            for item in self.scene.items():
-                if isinstance(item, (StyledNode, MediaItem)) and item not in connected_nodes:
-                    if item.isVisible():
-                        item.setVisible(False)
-                        self.hide_mode_hidden_items.append(item)
-            
-            # Ocultar conexões não conectadas ao nó selecionado
-            for conn in self.scene.items():
-                if isinstance(conn, SmartConnection) and conn not in connected_connections:
-                    if conn.isVisible():
-                        conn.setVisible(False)
-                        self.hide_mode_hidden_items.append(conn)
-            
-            # Alternar ícone para Reexibir
-            if hasattr(self, 'act_hide'):
-                self.act_hide.setIcon(IconManager.load_icon("Reexibir.png", "R"))
-    
+            self.reveal_all_items()
+            return
+
+        seeds = [item for item in self.scene.selectedItems() if isinstance(item, (StyledNode, MediaItem))]
+        if not seeds:
+            return
+
+        self.hide_mode_active = True
+        self.hide_mode_hidden_items = apply_focus(
+            self.scene, self.view, seeds, self.focus_depth, (StyledNode, MediaItem)
+        )
+
+        # Alternar ícone para Reexibir
+        if hasattr(self, 'act_hide'):
+            self.act_hide.setIcon(IconManager.load_icon("Reexibir.png", "R"))
+        self.update_button_states()
+
     def reveal_all_items(self):
         """Reexibe todos os objetos ocultos"""
         if self.hide_mode_active:
             self.hide_mode_active = False
-            for item in self.hide_mode_hidden_items:
-                item.setVisible(True)
+            restore_focus(self.scene, self.view, self.hide_mode_hidden_items)
             self.hide_mode_hidden_items = []
             if hasattr(self, 'act_hide'):
                 self.act_hide.setIcon(IconManager.load_icon("Ocultar.png", "O"))
-    
+            self.update_button_states()
+
+    def set_focus_depth(self):
+        """Pergunta quantos saltos de vizinhança o modo foco mantém visíveis"""
+        depth, ok = QInputDialog.getInt(
+            self, "Modo foco", "Vizinhos até quantas conexões de distância:",
+            self.focus_depth, 1, 99
+        )
+        if not ok:
+            return
+        self.focus_depth = depth
+        if self.hide_mode_active:
+            # Reaplica com a nova profundidade, a partir da seleção atual
+            self.reveal_all_items()
+            self.toggle_hide_mode()
+
     # --------------------------------------------------
-    # ESTADOS
+    # DESEMPENHO
     # --------------------------------------------------
-    def update_button_states(self):
-        try:
-            sel = self.scene.selectedItems()
-        except RuntimeError:
+    def toggle_performance_hud(self):
+        """Liga a instrumentação e mostra o HUD, ou desliga os dois"""
+        if self.performance_hud.isVisible():
+            self.performance_hud.hide()
+            perf_metrics.disable()
+            self.statusBar().showMessage("Instrumentação desligada", 3000)
+        else:
+            perf_metrics.enable()
+            self.performance_hud.show()
+            self.performance_hud.raise_()
+            self.statusBar().showMessage("Instrumentação ligada", 3000)
+
+    def export_performance_report(self):
+        """Salva em JSON as métricas coletadas desde que a instrumentação foi ligada"""
+        if not perf_metrics.frame_count and not any(m.calls for m in perf_metrics.metrics.values()):
+            QMessageBox.information(
+                self, "Relatório de desempenho",
+                "Nenhuma métrica coletada. Ligue a instrumentação com Ctrl+Shift+P e use o mapa."
+            )
             return
-        
-        styled_nodes = [item for item in sel if isinstance(item, StyledNode)]
-        
-        # Habilitar/desabilitar botão ocultar
-        if hasattr(self, 'act_hide'):
-            self.act_hide.setEnabled(len(styled_nodes) == 1)
-        
-        # Botão Título: habilitado apenas com 1 nó selecionado
-        if hasattr(self, 'act_title'):
-            self.act_title.setEnabled(len(styled_nodes) == 1)
-        
-        has_sel = bool(self.scene.selectedItems())
-        has_items = bool(self.scene.items())
-        
-        # Verificar se há um nó selecionado
-        has_styled_node = any(isinstance(item, StyledNode) for item in sel)
-        # Verificar se há mídia selecionada
-        has_media_selected = any(isinstance(item, MediaItem) for item in sel)
-        
-        # Verificar se há foco em um texto dentro de um nó
-        focus_item = self.scene.focusItem()
-        is_text_in_node = isinstance(focus_item, QGraphicsTextItem) and isinstance(focus_item.parentItem(), StyledNode)
-        
-        # Botões Fonte e Cores habilitados se:
-        # - Há um nó selecionado, OU
-        # - Há foco em um texto dentro de um nó
-        can_format = (has_styled_node or is_text_in_node) and not has_media_selected
-
-        self.act_font.setEnabled(can_format)
-        self.act_colors.setEnabled(can_format)
-        self.act_export.setEnabled(has_items)
-
-        # Botão Alinhar: habilitado se há 2+ objetos (StyledNode ou MediaItem)
-        alignable = [i for i in sel if isinstance(i, (StyledNode, MediaItem))]
-        self.act_align.setEnabled(len(alignable) >= 2)
-
-        # Botão Copiar: habilitado se há texto com seleção
-        # - Texto com seleção em foco, OU
-        # - Nó selecionado (copia o texto do nó)
-        can_copy = False
-        if focus_item and isinstance(focus_item, QGraphicsTextItem):
-            if focus_item.textCursor().hasSelection():
-                can_copy = True
-        if has_styled_node:
-            can_copy = True
-        self.act_copy.setEnabled(can_copy)
-
-        # Botão Colar: habilitado se há texto no clipboard E (foco em texto OU nó selecionado)
-        clipboard_text = QApplication.clipboard().text()
-        can_paste = bool(clipboard_text) and (is_text_in_node or has_styled_node)
-        self.act_paste.setEnabled(can_paste)
-
-        # Botão Conectar: habilitado se há 2+ objetos selecionados (StyledNode ou MediaItem)
-        connectable_items = [i for i in sel if isinstance(i, (StyledNode, MediaItem))]
-        self.act_connect.setEnabled(len(connectable_items) >= 2)
-
-        # Botão Excluir: habilitado se há 1+ objeto selecionado
-        self.act_delete.setEnabled(has_sel)
-
-        # Botão Localizar: habilitado se há pelo menos um objeto com conteúdo textual
-        can_search = False
-        for item in self.scene.items():
-            if isinstance(item, StyledNode):
-                text = item.get_text()
-                if text and text.strip():
-                    can_search = True
-                    break
-            elif isinstance(item, MediaSliderImageItem):
-                if hasattr(item, '_entries') and len(item._entries) > 0:
-                    can_search = True
-                    break
-        self.act_search.setEnabled(can_search)
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Salvar relatório de desempenho", "desempenho.json", "JSON (*.json)"
+        )
+        if not path:
+            return
+        try:
+            perf_metrics.write_report(path)
+            self.statusBar().showMessage(f"Relatório salvo em {path}", 5000)
+        except OSError as e:
+            QMessageBox.critical(self, "Erro", f"Falha ao salvar o relatório: {e}")
+
+    # --------------------------------------------------
+    # ESTADOS
+    # --------------------------------------------------
+    def update_stats_panel(self):
+        """Resumo das estatísticas na barra de status (só lê os contadores)"""
+        stats = self.scene_stats
+        text = f"{stats.node_count} objetos · {stats.connection_count} conexões"
+        if stats.media_count:
+            text += f" · {stats.media_count} mídias ({format_bytes(stats.media_bytes)})"
+        self.stats_label.setText(text)
+        types = ", ".join(f"{t}: {n}" for t, n in sorted(stats.type_counts.items()))
+        degrees = ", ".join(f"{d}: {n}" for d, n in sorted(stats.degree_histogram.items()))
+        self.stats_label.setToolTip(
+            f"Por tipo — {types or 'nenhum'}\n"
+            f"Com sombra: {stats.shadow_count}\n"
+            f"Conexões por objeto (grau: objetos) — {degrees or 'nenhum'}"
+        )
+
+    def update_button_states(self, *args):
+        """Agenda o recálculo do estado da barra (coalescido)"""
+        if hasattr(self, 'toolbar_state'):
+            self.toolbar_state.focus_active = self.hide_mode_active
+            self.toolbar_state.schedule()
+
+    def _apply_toolbar_state(self, changed):
+        """Aplica às ações apenas os estados que mudaram"""
+        actions = {
+            "hide": "act_hide", "title": "act_title", "font": "act_font",
+            "colors": "act_colors", "export": "act_export", "align": "act_align",
+            "copy": "act_copy", "paste": "act_paste", "connect": "act_connect",
+            "delete": "act_delete", "search": "act_search",
+        }
+        for key, enabled in changed.items():
+            action = getattr(self, actions[key], None)
+            if action is not None:
+                action.setEnabled(enabled)
 
     def insert_media(self):
         sel = [i for i in self.scene.selectedItems() if isinstance(i, (MediaSliderImageItem, MediaAVSliderItem, MediaImageItem, MediaAVItem))]
@@ -1297,7 +1547,7 @@ class AmareloMainWindow(QMainWindow):
             images = []
             av_sources = []
             for p in paths:
-                img = QImage(p)
+                img = self.context.images.load(p)
                 if not img.isNull():
                     images.append((img, p))
                 else:
@@ -1349,6 +1599,7 @@ class AmareloMainWindow(QMainWindow):
                     video_urls.append(u)
                 else:
                     try:
+                        import urllib.request
                         with urllib.request.urlopen(u) as resp:
                             data = resp.read()
                         img = QImage()
@@ -1419,7 +1670,7 @@ class AmareloMainWindow(QMainWindow):
             # Converter para slider
             images = []
             for p in paths:
-                img = QImage(p)
+                img = self.context.images.load(p)
                 if not img.isNull():
                     images.append((img, p))
             
@@ -1527,11 +1778,12 @@ class AmareloMainWindow(QMainWindow):
             if not paths:
                 return
             for p in paths:
-                img = QImage(p)
+                img = self.context.images.load(p)
                 if not img.isNull():
-                    pix = QPixmap.fromImage(img)
+                    pix = self.context.images.pixmap(img, p)
                     slider._entries.append({"pix": pix, "source": p, "movie": None})
                     list_widget.addItem(p)
+            self.scene_stats.media_entries_changed(slider)
             slider._update_label()
             slider._rebuild_playlist_widget()
             slider.update()
@@ -1541,6 +1793,7 @@ class AmareloMainWindow(QMainWindow):
             if row >= 0 and row < len(slider._entries):
                 slider._entries.pop(row)
                 list_widget.takeItem(row)
+                self.scene_stats.media_entries_changed(slider)
                 slider._update_label()
                 slider._rebuild_playlist_widget()
                 slider.update()
@@ -1699,9 +1952,18 @@ class AmareloMainWindow(QMainWindow):
     # FUNCIONALIDADES
     # --------------------------------------------------
     def new_window(self):
-        """Abre uma nova janela completamente independente."""
-        from PySide6.QtCore import QProcess
-        QProcess.startDetached(sys.executable, [__file__])
+        """Abre uma nova janela vazia."""
+        self._open_window().show()
+
+    def _open_window(self):
+        """
+        Nova janela no mesmo processo: ícones, QSS, imagens e autosave vêm
+        do AppContext, então a criação é quase imediata.
+        """
+        window = AmareloMainWindow()
+        # O AppContext mantém a janela viva até ela ser fechada
+        window.setAttribute(Qt.WA_DeleteOnClose)
+        return window
 
 
     def set_node_style(self, style_type):
@@ -1710,13 +1972,11 @@ class AmareloMainWindow(QMainWindow):
         if not sel:
             return
 
-        self.undo_stack.beginMacro(f"Mudar estilo para {style_type}")
-        for item in sel:
-            old_state = {'node_type': item.node_type, 'custom_color': item.custom_color}
-            new_state = {'node_type': style_type, 'custom_color': None}
-            cmd = ChangeNodeStyleCommand(item, old_state, new_state)
-            self.undo_stack.push(cmd)
-        self.undo_stack.endMacro()
+        with BatchEdit(self.scene, self.view, self.undo_stack, f"Mudar estilo para {style_type}") as batch:
+            for item in sel:
+                old_state = {'node_type': item.node_type, 'custom_color': item.custom_color}
+                new_state = {'node_type': style_type, 'custom_color': None}
+                batch.push(ChangeNodeStyleCommand(item, old_state, new_state))
     
     def select_all_by_type(self, node_type: str):
         """Seleciona todos os nós de um tipo específico"""
@@ -1730,22 +1990,38 @@ class AmareloMainWindow(QMainWindow):
         """Aplica estilo a todos os itens filtrados"""
         items = [item for item in self.item_filter.get_filtered_items() if isinstance(item, StyledNode)]
         if items:
-            cmd = ApplyStyleFilteredCommand(items, style_type, self.scene)
-            self.undo_stack.push(cmd)
+            # Um único comando; o lote só evita redesenhos e notificações por item
+            with BatchEdit(self.scene, self.view, self.undo_stack) as batch:
+                batch.push(ApplyStyleFilteredCommand(items, style_type, self.scene))
 
     def add_object(self):
         sel = self.scene.selectedItems()
 
         if len(sel) == 1 and isinstance(sel[0], (StyledNode, MediaItem)):
             source = sel[0]
+            from core.positioning import find_best_position_radial
             
             new_pos = find_best_position_radial(source, self.scene)
             
-            node = StyledNode(new_pos.x(), new_pos.y())
-            self.undo_stack.push(AddItemCommand(self.scene, node, "Adicionar objeto", self))
-            connection = SmartConnection(source, node)
-            self.undo_stack.push(AddItemCommand(self.scene, connection, "Conectar objeto", self))
-            connection.update_path()
+            # Inserir, conectar e acomodar os vizinhos: um só Ctrl+Z
+            self.undo_stack.beginMacro("Adicionar objeto")
+            try:
+                node = StyledNode(new_pos.x(), new_pos.y())
+                self.undo_stack.push(AddItemCommand(self.scene, node, "Adicionar objeto", self))
+                connection = SmartConnection(source, node)
+                self.undo_stack.push(AddItemCommand(self.scene, connection, "Conectar objeto", self))
+                connection.update_path()
+
+                if self.layout_incremental:
+                    from core.layout import relax_neighbourhood
+                    moves = [
+                        (item, item.pos(), item.pos() + QPointF(dx, dy))
+                        for item, dx, dy in relax_neighbourhood(self.scene, node, fixed=[source])
+                    ]
+                    if moves:
+                        self.undo_stack.push(ApplyLayoutCommand(self.scene, moves, "Acomodar vizinhos"))
+            finally:
+                self.undo_stack.endMacro()
         else:
             pos = self.view.mapToScene(self.view.viewport().rect().center())
             node = StyledNode(pos.x(), pos.y())
@@ -1825,53 +2101,49 @@ class AmareloMainWindow(QMainWindow):
 
     def delete_selected(self):
         to_remove = list(self.scene.selectedItems())
-        seen_conn = set()
-        
-        for item in to_remove:
-            if isinstance(item, SmartConnection):
-                # Remover conexão diretamente se selecionada
-                if item not in seen_conn:
-                    seen_conn.add(item)
-                    self.undo_stack.push(RemoveItemCommand(self.scene, item, "Remover conexão"))
-            elif isinstance(item, (StyledNode, MediaItem)):
-                # Remover conexões conectadas ao nó
-                for conn in self.scene.items():
-                    if isinstance(conn, SmartConnection) and conn not in seen_conn and (conn.source == item or conn.target == item):
-                        seen_conn.add(conn)
-                        self.undo_stack.push(RemoveItemCommand(self.scene, conn, "Remover conexão"))
-                # Remover o nó ou mídia
-                self.undo_stack.push(RemoveItemCommand(self.scene, item, "Remover objeto"))
+        if not to_remove:
+            return
+        removed_objects = {id(item) for item in to_remove if isinstance(item, (StyledNode, MediaItem))}
+
+        with BatchEdit(self.scene, self.view, self.undo_stack, "Excluir objetos") as batch:
+            # Conexões: selecionadas ou presas a um objeto excluído (uma varredura)
+            for conn in self.scene.items():
+                if not isinstance(conn, SmartConnection):
+                    continue
+                if conn.isSelected() or id(conn.source) in removed_objects or id(conn.target) in removed_objects:
+                    batch.push(RemoveItemCommand(self.scene, conn, "Remover conexão"))
+            for item in to_remove:
+                if id(item) in removed_objects:
+                    # Remover o nó ou mídia
+                    batch.push(RemoveItemCommand(self.scene, item, "Remover objeto"))
 
     def connect_nodes(self):
         """Conecta ou desconecta objetos selecionados"""
         sel = [i for i in self.scene.selectedItems() if isinstance(i, (StyledNode, MediaItem))]
-        
-        # Verificar se já existem conexões entre os objetos selecionados
+        if len(sel) < 2:
+            return
+
+        # Conexões existentes indexadas pelo par de extremos (uma varredura)
+        existing = {}
+        for item in self.scene.items():
+            if isinstance(item, SmartConnection):
+                existing[frozenset((id(item.source), id(item.target)))] = item
+
         connections_to_remove = []
-        
-        for i in range(len(sel) - 1):
-            source = sel[i]
-            target = sel[i + 1]
-            
-            # Procurar por conexão existente entre source e target
-            existing_connection = None
-            for item in self.scene.items():
-                if isinstance(item, SmartConnection):
-                    if (item.source == source and item.target == target) or \
-                       (item.source == target and item.target == source):
-                        existing_connection = item
-                        break
-            
-            if existing_connection:
-                connections_to_remove.append(existing_connection)
-            else:
-                # Criar nova conexão
-                connection = SmartConnection(source, target)
-                self.undo_stack.push(AddItemCommand(self.scene, connection, "Conectar nós", self))
-        
-        # Remover conexões existentes (desconectar)
-        for conn in connections_to_remove:
-            self.undo_stack.push(RemoveItemCommand(self.scene, conn, "Desconectar nós"))
+        with BatchEdit(self.scene, self.view, self.undo_stack, "Conectar nós") as batch:
+            for source, target in zip(sel, sel[1:]):
+                existing_connection = existing.get(frozenset((id(source), id(target))))
+                if existing_connection:
+                    connections_to_remove.append(existing_connection)
+                else:
+                    # Criar nova conexão
+                    connection = SmartConnection(source, target)
+                    batch.push(AddItemCommand(self.scene, connection, "Conectar nós", self))
+                    batch.reroute(connection)
+
+            # Remover conexões existentes (desconectar)
+            for conn in connections_to_remove:
+                batch.push(RemoveItemCommand(self.scene, conn, "Desconectar nós"))
 
     def copy_content(self):
         # 1. Tenta copiar de item de texto em foco
@@ -1880,8 +2152,18 @@ class AmareloMainWindow(QMainWindow):
             QApplication.clipboard().setText(focus_item.textCursor().selectedText())
             return
 
-        # 2. Copia texto do nó selecionado
-        sel = [i for i in self.scene.selectedItems() if isinstance(i, StyledNode)]
+        # 2. Objetos selecionados: subgrafo (nós, mídias e conexões entre eles)
+        objects = [i for i in self.scene.selectedItems() if isinstance(i, (StyledNode, MediaItem))]
+        sel = [i for i in objects if isinstance(i, StyledNode)]
+        # (um único nó com trecho de texto selecionado copia só o trecho, abaixo)
+        single_text_selection = len(objects) == 1 and sel and sel[0].text.textCursor().hasSelection()
+        if objects and not single_text_selection:
+            mime = selection_to_mime(objects, self.persistence)
+            if mime is not None:
+                QApplication.clipboard().setMimeData(mime)
+                return
+
+        # 3. Copia o texto selecionado dentro do nó
         if not sel:
             return
         node = sel[0]
@@ -1893,12 +2175,19 @@ class AmareloMainWindow(QMainWindow):
             QApplication.clipboard().setText(node.get_text())
 
     def paste_content(self):
+        mime = QApplication.clipboard().mimeData()
         text = QApplication.clipboard().text()
+        focus_item = self.scene.focusItem()
+        editing_text = isinstance(focus_item, QGraphicsTextItem) and isinstance(focus_item.parentItem(), StyledNode)
+
+        # Subgrafo copiado (fora da edição de texto): recria os objetos
+        if not editing_text and mime_has_subgraph(mime):
+            self.paste_subgraph(subgraph_from_mime(mime))
+            return
         if not text:
             return
 
         # 1. Tenta colar em item de texto em foco
-        focus_item = self.scene.focusItem()
         if isinstance(focus_item, QGraphicsTextItem):
             parent = focus_item.parentItem()
             if isinstance(parent, StyledNode):
@@ -1928,6 +2217,27 @@ class AmareloMainWindow(QMainWindow):
         self.undo_stack.push(PasteTextCommand(node, old_html, new_html, "Colar texto"))
         self.update_button_states()
 
+    def paste_subgraph(self, data):
+        """Cola os objetos copiados em um único comando, deslocados da origem"""
+        if not data:
+            return
+        bounds = subgraph_bounds(data)
+        visible = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        if visible.intersects(bounds):
+            offset = QPointF(PASTE_OFFSET, PASTE_OFFSET)
+        else:
+            # Originais fora da tela: cola no centro da área visível
+            offset = visible.center() - bounds.center()
+
+        items, connections = build_subgraph(data, self.persistence, offset, self)
+        if not items:
+            return
+        with BatchEdit(self.scene, self.view, self.undo_stack) as batch:
+            batch.push(PasteItemsCommand(self.scene, items, connections))
+            self.scene.clearSelection()
+            for item in items:
+                item.setSelected(True)
+
     def change_font(self):
         # Determinar o nó alvo
         target_node = None
@@ -2058,8 +2368,8 @@ class AmareloMainWindow(QMainWindow):
     def toggle_shadow(self):
         items = [item for item in self.scene.selectedItems() if isinstance(item, StyledNode)]
         if items:
-            cmd = ToggleShadowCommand(items)
-            self.undo_stack.push(cmd)
+            with BatchEdit(self.scene, self.view, self.undo_stack) as batch:
+                batch.push(ToggleShadowCommand(items))
 
     # --------------------------------------------------
     # ALINHAR OBJETOS
@@ -2132,9 +2442,136 @@ class AmareloMainWindow(QMainWindow):
                 current_x += rect[2] + spacing
 
         self.scene.update()
-        for item in sel:
-            if item in old_positions and item.pos() != old_positions[item]:
-                self.undo_stack.push(MoveItemCommand(item, old_positions[item], item.pos(), "Alinhar objetos"))
+        moves = [
+            (item, old_positions[item], item.pos())
+            for item in sel
+            if item in old_positions and item.pos() != old_positions[item]
+        ]
+        if moves:
+            self.undo_stack.push(MoveItemsCommand(self.scene, moves, "Alinhar objetos"))
+
+    def toggle_grid_snap(self, enabled):
+        """Liga/desliga o snap à grade durante o arrasto de objetos."""
+        self.view.alignment_guides.grid_size = GRID_SIZE if enabled else 0
+        self.statusBar().showMessage(
+            f"Snap à grade {'ativado' if enabled else 'desativado'} ({GRID_SIZE}px)", 2000
+        )
+
+    # --------------------------------------------------
+    # LAYOUT AUTOMÁTICO
+    # --------------------------------------------------
+    def auto_layout(self):
+        """Reorganiza o mapa (ou os objetos selecionados) com um algoritmo de layout."""
+        if self._layout_worker is not None:
+            return
+        from core.layout import LAYOUTS, LayoutWorker, build_layout_graph
+
+        keys = list(LAYOUTS.keys())
+        names = [LAYOUTS[k][0] for k in keys]
+        name, ok = QInputDialog.getItem(self, "Reorganizar mapa", "Algoritmo:", names, 0, False)
+        if not ok:
+            return
+        key = keys[names.index(name)]
+
+        sel = [item for item in self.scene.selectedItems()
+               if isinstance(item, (StyledNode, MediaItem)) and item.parentItem() is None]
+        graph = build_layout_graph(self.scene, sel if len(sel) > 1 else None)
+        if len(graph) < 2:
+            return
+
+        self.statusBar().showMessage(f"Calculando layout ({name})...")
+        worker = LayoutWorker(key, graph, self)
+        worker.finished_layout.connect(lambda centers: self._apply_layout(graph, centers))
+        worker.failed.connect(lambda msg: self.statusBar().showMessage(f"Falha no layout: {msg}", 5000))
+        worker.finished.connect(self._on_layout_worker_done)
+        self._layout_worker = worker
+        worker.start()
+
+    def _on_layout_worker_done(self):
+        if self._layout_worker is not None:
+            self._layout_worker.deleteLater()
+        self._layout_worker = None
+
+    def _apply_layout(self, graph, new_centers):
+        """Anima os itens até as novas posições e registra um único undo."""
+        self.statusBar().clearMessage()
+
+        def alive(item):
+            # Itens excluídos (ou destruídos por um novo arquivo) desde a captura do grafo
+            try:
+                return item.scene() is self.scene
+            except RuntimeError:
+                return False
+
+        delta = new_centers - graph.centers
+        moves = []
+        for item, (dx, dy) in zip(graph.items, delta):
+            if abs(dx) < 0.5 and abs(dy) < 0.5 or not alive(item):
+                continue
+            old = item.pos()
+            moves.append((item, old, QPointF(old.x() + dx, old.y() + dy)))
+        if not moves:
+            return
+
+        if len(moves) > LAYOUT_ANIMATION_MAX_ITEMS:
+            self.undo_stack.push(ApplyLayoutCommand(self.scene, moves))
+            return
+
+        moved = {id(item) for item, _old, _new in moves}
+        connections = [c for c in self.scene.items()
+                       if isinstance(c, SmartConnection) and (id(c.source) in moved or id(c.target) in moved)]
+        scheduler = get_route_scheduler()
+        placed = {}  # id do item → última posição dada pela animação
+
+        def step(t):
+            with scheduler.suspend():
+                for item, old, new in moves:
+                    pos = old + (new - old) * t
+                    item.setPos(pos)
+                    placed[id(item)] = pos
+            # Linhas retas durante a animação; rotas completas no commit
+            for conn in connections:
+                conn.set_placeholder_path()
+
+        anim = QVariantAnimation(self)
+        anim.setDuration(LAYOUT_ANIMATION_MS)
+        anim.setStartValue(0.0)
+        anim.setEndValue(1.0)
+        anim.setEasingCurve(QEasingCurve.InOutCubic)
+
+        def finish(cancelled):
+            # O arrasto fica bloqueado durante a animação; qualquer outra
+            # edição (excluir, desfazer, abrir arquivo) cancela o layout
+            self.undo_stack.indexChanged.disconnect(on_edit)
+            self.view.setInteractive(True)
+            anim.valueChanged.disconnect(step)
+            anim.stop()
+            anim.deleteLater()
+            live = [move for move in moves if alive(move[0])]
+            if not cancelled:
+                self.undo_stack.push(ApplyLayoutCommand(self.scene, live))
+                return
+            with scheduler.suspend():
+                for item, old, _new in live:
+                    # Só volta quem a edição não reposicionou
+                    if item.pos() == placed.get(id(item)):
+                        item.setPos(old)
+            for conn in connections:
+                try:
+                    if conn.scene() is self.scene:
+                        conn.update_path()
+                except RuntimeError:
+                    pass
+            self.statusBar().showMessage("Layout cancelado pela edição", 3000)
+
+        def on_edit(_index):
+            finish(True)
+
+        anim.valueChanged.connect(step)
+        anim.finished.connect(lambda: finish(False))
+        self.undo_stack.indexChanged.connect(on_edit)
+        self.view.setInteractive(False)
+        anim.start()
 
     def _update_window_title(self):
         """Atualiza a barra de título: nome.amind - Amarelo Mind ou Amarelo Mind"""
@@ -2177,7 +2614,9 @@ class AmareloMainWindow(QMainWindow):
         self.autosave_enabled = True
         self._last_autosave_index = self.undo_stack.index()
         
-        if self.persistence.load_from_file(path, self.scene, self):
+        with profiler.span("load file"):
+            loaded = self.persistence.load_from_file(path, self.scene, self)
+        if loaded:
             self._update_window_title()
             self._update_custom_colors_from_scene()
             return True
@@ -2218,7 +2657,7 @@ class AmareloMainWindow(QMainWindow):
                     QMessageBox.critical(self, "Erro", f"Falha ao carregar o projeto: {os.path.basename(path)}")
             else:
                 # Abre os arquivos subsequentes em novas janelas
-                new_win = AmareloMainWindow()
+                new_win = self._open_window()
                 new_win.current_file = path
                 if new_win.persistence.load_from_file(path, new_win.scene, new_win):
                     new_win._update_window_title()
@@ -2227,37 +2666,95 @@ class AmareloMainWindow(QMainWindow):
                     QMessageBox.critical(new_win, "Erro", f"Falha ao carregar o projeto: {os.path.basename(path)}")
 
 
-    def export_png(self):
+    def export_scene(self):
+        """Exporta a cena como PNG (raster) ou SVG/PDF (vetorial)"""
         if not self.scene.items():
             return
 
-        path, _ = QFileDialog.getSaveFileName(
-            self, "Exportar PNG", "", "PNG (*.png)"
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Exportar", "", "PNG (*.png);;SVG (*.svg);;PDF (*.pdf)"
         )
         if not path:
             return
 
-        rect = self.scene.itemsBoundingRect().adjusted(-30, -30, 30, 30)
-        w, h = max(1, int(rect.width())), max(1, int(rect.height()))
-
-        image = QImage(w, h, QImage.Format_ARGB32)
-        image.fill(QColor("#0f1621"))
-
-        painter = QPainter(image)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.TextAntialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
-        self.scene.render(
-            painter,
-            QRectF(0, 0, w, h),
-            rect,
-            Qt.IgnoreAspectRatio
+        # Rotas adiadas pela digitação entram finalizadas na exportação
+        get_route_scheduler().flush()
+
+        lower = path.lower()
+        if lower.endswith(".svg") or (selected_filter.startswith("SVG") and not lower.endswith((".png", ".pdf"))):
+            self.export_svg(path)
+        elif lower.endswith(".pdf") or (selected_filter.startswith("PDF") and not lower.endswith(".png")):
+            self.export_pdf(path)
+        else:
+            self.export_png(path)
+
+    def export_svg(self, path):
+        if not path.lower().endswith(".svg"):
+            path += ".svg"
+        if not export_scene_svg(self.scene, path):
+            QMessageBox.critical(self, "Erro", "Falha ao exportar o SVG.")
+
+    def export_pdf(self, path):
+        if not path.lower().endswith(".pdf"):
+            path += ".pdf"
+        answer = QMessageBox.question(
+            self, "Exportar PDF",
+            "Dividir o mapa em páginas A4 para impressão?\n"
+            "(Não = uma única página do tamanho do mapa)",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.No
+        )
+        if answer == QMessageBox.Cancel:
+            return
+        if not export_scene_pdf(self.scene, path, page_tiling=(answer == QMessageBox.Yes)):
+            QMessageBox.critical(self, "Erro", "Falha ao exportar o PDF.")
+
+    def export_png(self, path):
+        if self._export_worker is not None:
+            QMessageBox.information(self, "Exportar PNG", "Já existe uma exportação em andamento.")
+            return
+        scale, ok = QInputDialog.getDouble(
+            self, "Exportar PNG", "Escala (1.0 = 96 dpi):", 1.0, 0.1, 8.0, 2
         )
-        painter.end()
+        if not ok:
+            return
 
         if not path.lower().endswith(".png"):
             path += ".png"
-        image.save(path)
+
+        # Renderização em tiles (memória limitada mesmo para mapas enormes) fora
+        # da thread da interface: a cena é gravada aqui em um QPicture e o
+        # worker rasteriza e comprime as faixas
+        exporter = TiledPngExporter.from_snapshot(self.scene, scale=scale)
+        w, h = exporter.output_size()
+
+        progress_dialog = QProgressDialog(f"Exportando {w}×{h} px...", "Cancelar", 0, 100, self)
+        progress_dialog.setWindowTitle("Exportar PNG")
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+
+        worker = TiledExportWorker(exporter, path, self)
+
+        def on_progress(done, total):
+            progress_dialog.setMaximum(total)
+            progress_dialog.setValue(done)
+
+        def on_done(ok, _path):
+            cancelled = progress_dialog.wasCanceled()
+            progress_dialog.close()
+            if not ok and not cancelled:
+                QMessageBox.critical(self, "Erro", "Falha ao exportar a imagem.")
+
+        worker.progress.connect(on_progress)
+        worker.finished_export.connect(on_done)
+        progress_dialog.canceled.connect(worker.requestInterruption)
+        worker.finished.connect(self._on_export_worker_done)
+        self._export_worker = worker
+        worker.start()
+
+    def _on_export_worker_done(self):
+        if self._export_worker is not None:
+            self._export_worker.deleteLater()
+        self._export_worker = None
 
     def show_search_dialog(self):
         """Abre diálogo de pesquisa e busca no arquivo atual"""
@@ -2271,7 +2768,10 @@ class AmareloMainWindow(QMainWindow):
         layout = QVBoxLayout()
         
         # Campo de pesquisa
-        search_label = QLabel("Digite o texto para procurar:")
+        search_label = QLabel(
+            'Digite o texto para procurar (use "aspas" para frases e ~ para busca aproximada).\n'
+            'Filtros: tipo:Azul  cor:#ff0000  grau:>=2  ligado:texto  midia:sim  sombra:sim  regiao:x,y,l,a'
+        )
         layout.addWidget(search_label)
         
         search_input = QLineEdit()
@@ -2311,47 +2811,44 @@ class AmareloMainWindow(QMainWindow):
         search_results = []
         current_index = -1
         
-        # Função de busca
-        def do_search():
+        # Função de busca: texto pelo índice invertido (prefixo, "frase", termo~)
+        # combinável com filtros tipo:, cor:, grau:, ligado:, midia:, sombra:, regiao:
+        def refresh_results():
             nonlocal search_results, current_index
             results_list.clear()
-            search_results.clear()
+            search_results = self.item_filter.query(search_input.text(), limit=SEARCH_RESULTS_LIMIT)
             current_index = -1
             
-            search_text = search_input.text().lower()
-            
-            if not search_text:
+            if not search_input.text().strip():
                 counter_label.setText("0 de 0 resultados")
                 prev_btn.setEnabled(False)
                 next_btn.setEnabled(False)
-                return
+                return False
+            
+            for item in search_results:
+                # Criar item na lista com preview do texto
+                text = item.get_text()
+                preview = text[:50] + "..." if len(text) > 50 else text
+                list_item = QListWidgetItem(preview)
+                list_item.setData(Qt.UserRole, item)  # Guardar referência ao objeto
+                results_list.addItem(list_item)
             
-            # Buscar em todos os nós
-            for item in self.scene.items():
-                if isinstance(item, StyledNode):
-                    text = item.get_text().lower()
-                    if search_text in text:
-                        # Criar item na lista com preview do texto
-                        preview = item.get_text()[:50] + "..." if len(item.get_text()) > 50 else item.get_text()
-                        list_item = QListWidgetItem(preview)
-                        list_item.setData(Qt.UserRole, item)  # Guardar referência ao objeto
-                        results_list.addItem(list_item)
-                        search_results.append(item)
-            
-            # Atualizar contador
             total = len(search_results)
-            if total > 0:
-                counter_label.setText(f"1 de {total} resultados")
-                current_index = 0
-                results_list.setCurrentRow(0)
-                go_to_result(0)
-                prev_btn.setEnabled(total > 1)
-                next_btn.setEnabled(total > 1)
-            else:
+            if total == 0:
                 results_list.addItem("Nenhum resultado encontrado")
                 counter_label.setText("0 de 0 resultados")
                 prev_btn.setEnabled(False)
                 next_btn.setEnabled(False)
+                return False
+            counter_label.setText(f"{total} resultados")
+            prev_btn.setEnabled(False)
+            next_btn.setEnabled(total > 1)
+            return True
+
+        def do_search():
+            # Enter/botão: atualiza e vai para o melhor resultado
+            if refresh_results():
+                go_to_result(0)
         
         # Função para ir para um resultado específico
         def go_to_result(index):
@@ -2407,6 +2904,8 @@ class AmareloMainWindow(QMainWindow):
         # Conectar sinais
         search_btn.clicked.connect(do_search)
         search_input.returnPressed.connect(do_search)
+        # Resultados atualizados enquanto digita (sem mover a visão)
+        search_input.textChanged.connect(lambda _text: refresh_results())
         prev_btn.clicked.connect(go_previous)
         next_btn.clicked.connect(go_next)
         results_list.itemClicked.connect(lambda item: go_to_result(results_list.row(item)))
@@ -2417,6 +2916,158 @@ class AmareloMainWindow(QMainWindow):
         dialog.exec()
 
 
+    def show_project_search_dialog(self):
+        """Procura nos nós de todos os .amind das pastas indexadas"""
+        import sqlite3
+        from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel, QListWidget, QListWidgetItem
+
+        try:
+            index = self.context.project_index()
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Falha ao abrir o índice de projetos: {e}")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Procurar em projetos")
+        dialog.setMinimumSize(520, 460)
+
+        layout = QVBoxLayout(dialog)
+
+        # Pastas indexadas
+        layout.addWidget(QLabel("Pastas indexadas:"))
+        folders_list = QListWidget()
+        folders_list.setMaximumHeight(90)
+        layout.addWidget(folders_list)
+
+        folder_btns = QHBoxLayout()
+        add_folder_btn = QPushButton("Adicionar pasta...")
+        remove_folder_btn = QPushButton("Remover pasta")
+        update_btn = QPushButton("Atualizar índice")
+        folder_btns.addWidget(add_folder_btn)
+        folder_btns.addWidget(remove_folder_btn)
+        folder_btns.addWidget(update_btn)
+        layout.addLayout(folder_btns)
+
+        status_label = QLabel()
+        layout.addWidget(status_label)
+
+        search_input = QLineEdit()
+        search_input.setPlaceholderText("Procurar em todos os projetos...")
+        layout.addWidget(search_input)
+
+        results_list = QListWidget()
+        layout.addWidget(results_list)
+
+        def refresh_folders():
+            folders_list.clear()
+            folders_list.addItems(index.folders())
+            status_label.setText(f"{index.file_count()} projeto(s) no índice")
+
+        def refresh_results():
+            results_list.clear()
+            for path, node_id, snippet in index.search(search_input.text(), limit=SEARCH_RESULTS_LIMIT):
+                list_item = QListWidgetItem(f"{os.path.basename(path)} — {snippet}")
+                list_item.setToolTip(path)
+                list_item.setData(Qt.UserRole, (path, node_id))
+                results_list.addItem(list_item)
+
+        worker_slots = []  # (sinal, slot) ligados ao worker de atualização
+
+        def start_update():
+            update_btn.setEnabled(False)
+
+            def on_progress(done, total, path):
+                try:
+                    status_label.setText(f"Indexando {done + 1} de {total}: {os.path.basename(path)}")
+                except RuntimeError:
+                    pass  # Diálogo já fechado
+
+            def on_done(stats):
+                try:
+                    update_btn.setEnabled(True)
+                    refresh_folders()
+                    status_label.setText(
+                        f"{index.file_count()} projeto(s) no índice — "
+                        f"{stats['indexed']} atualizado(s), {stats['removed']} removido(s)"
+                    )
+                    refresh_results()
+                except (RuntimeError, sqlite3.ProgrammingError):
+                    pass  # Diálogo ou índice já fechado
+
+            # Uma atualização por processo; outra janela pode já tê-la iniciado
+            worker = self.context.start_project_index_update(on_progress, on_done)
+            worker_slots.append((worker.progress, on_progress))
+            worker_slots.append((worker.finished_update, on_done))
+
+        def disconnect_worker(_result=None):
+            # A atualização continua após o diálogo fechar; ele deixa de ouvi-la
+            for signal, slot in worker_slots:
+                try:
+                    signal.disconnect(slot)
+                except (RuntimeError, TypeError):
+                    pass  # Worker já terminado e destruído
+            worker_slots.clear()
+
+        def add_folder():
+            folder = QFileDialog.getExistingDirectory(dialog, "Adicionar pasta ao índice")
+            if folder:
+                index.add_folder(folder)
+                refresh_folders()
+                start_update()
+
+        def remove_folder():
+            current = folders_list.currentItem()
+            if current:
+                index.remove_folder(current.text())
+                refresh_folders()
+                start_update()
+
+        def open_result(list_item):
+            data = list_item.data(Qt.UserRole)
+            if data:
+                dialog.accept()
+                self.open_project_node(*data)
+
+        add_folder_btn.clicked.connect(add_folder)
+        remove_folder_btn.clicked.connect(remove_folder)
+        update_btn.clicked.connect(start_update)
+        search_input.textChanged.connect(lambda _text: refresh_results())
+        search_input.returnPressed.connect(
+            lambda: results_list.count() and open_result(results_list.item(0))
+        )
+        results_list.itemActivated.connect(open_result)
+        results_list.itemDoubleClicked.connect(open_result)
+        dialog.finished.connect(disconnect_worker)
+
+        refresh_folders()
+        # Atualização incremental ao abrir: só arquivos com mtime/tamanho novos
+        if index.folders():
+            start_update()
+        search_input.setFocus()
+        dialog.exec()
+
+    def open_project_node(self, path, node_id):
+        """Abre o projeto (nesta janela se for o mesmo ou se estiver vazia) e centraliza o nó"""
+        window = self
+        same_file = self.current_file and os.path.abspath(self.current_file) == os.path.abspath(path)
+        if not same_file:
+            if self.scene.items():
+                window = self._open_window()
+                window.show()
+            if not window.load_file(path):
+                return
+        node = window.persistence.nodes_map.get(node_id)
+        try:
+            if node is None or node.scene() is not window.scene:
+                return
+        except RuntimeError:
+            return  # Nó excluído desde o carregamento
+        window.scene.clearSelection()
+        window.view.resetTransform()
+        window.view.centerOn(node)
+        node.setSelected(True)
+        window.activateWindow()
+
     def show_shortcuts_dialog(self):
         """Abre diálogo para visualizar e editar teclas de atalho"""
         from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, 
@@ -2428,10 +3079,11 @@ class AmareloMainWindow(QMainWindow):
             "Novo", "Abrir", "Salvar", "Exportar",
             "Desfazer", "Refazer",
             "Copiar", "Colar",
-            "Adicionar", "Título", "Mídia", "Conectar", "Ocultar", "Excluir",
+            "Adicionar", "Título", "Mídia", "Conectar", "Ocultar", "Profundidade do foco", "Excluir",
             "Fonte", "Cores",
-            "Alinhar", "Temas",
-            "Localizar"
+            "Alinhar", "Reorganizar", "Grade", "Temas",
+            "Localizar", "Procurar em projetos",
+            "Desempenho", "Relatório de desempenho"
         ]
         
         dialog = QDialog(self)
@@ -2605,13 +3257,24 @@ class AmareloMainWindow(QMainWindow):
             
             if hasattr(self, 'act_align'):
                 self.act_align.setShortcut(self.custom_shortcuts.get("Alinhar", ""))
+            if hasattr(self, 'act_layout'):
+                self.act_layout.setShortcut(self.custom_shortcuts.get("Reorganizar", ""))
+            if hasattr(self, 'act_grid'):
+                self.act_grid.setShortcut(self.custom_shortcuts.get("Grade", ""))
             if hasattr(self, 'act_themes'):
                 self.act_themes.setShortcut(self.custom_shortcuts.get("Temas", ""))
             
             self.act_search.setShortcut(self.custom_shortcuts.get("Localizar", ""))
+            if hasattr(self, 'act_project_search'):
+                self.act_project_search.setShortcut(self.custom_shortcuts.get("Procurar em projetos", ""))
             
             if hasattr(self, 'act_hide'):
                 self.act_hide.setShortcut(self.custom_shortcuts.get("Ocultar", ""))
+            if hasattr(self, 'act_focus_depth'):
+                self.act_focus_depth.setShortcut(self.custom_shortcuts.get("Profundidade do foco", ""))
+            if hasattr(self, 'act_performance_hud'):
+                self.act_performance_hud.setShortcut(self.custom_shortcuts.get("Desempenho", ""))
+                self.act_performance_report.setShortcut(self.custom_shortcuts.get("Relatório de desempenho", ""))
         
         save_btn = QPushButton("Salvar")
         save_btn.clicked.connect(apply_shortcuts)
@@ -2652,6 +3315,9 @@ class AmareloMainWindow(QMainWindow):
 <ul>
 <li>Selecione dois nós e clique em <b>Conectar</b> para criar uma conexão</li>
 <li>As conexões são automáticas e se ajustam quando você move os nós</li>
+<li>Com objetos selecionados, <b>Ocultar</b> mostra apenas a vizinhança deles; <b>Ctrl+Shift+O</b> define até quantas conexões de distância</li>
+<li>Ao arrastar, os objetos se encaixam nas guias e no espaçamento dos vizinhos (segure <b>Alt</b> para mover livremente); <b>Ctrl+G</b> liga o snap à grade</li>
+<li>Pressione <b>Ctrl+L</b> para reorganizar o mapa (árvore, radial ou por forças); com vários objetos selecionados, apenas eles são reorganizados</li>
 </ul>
 
 <h3>🎨 Personalizando</h3>
@@ -2672,12 +3338,14 @@ class AmareloMainWindow(QMainWindow):
 <ul>
 <li>Clique no botão <b>Teclas de atalho</b> para personalizar os atalhos</li>
 <li>Os atalhos são salvos automaticamente</li>
+<li><b>Ctrl+Shift+P</b> mostra o painel de desempenho (FPS, ms por quadro, rotas recalculadas por segundo e itens pintados); <b>Ctrl+Shift+E</b> exporta o relatório detalhado em JSON</li>
 </ul>
 
 <h3>💾 Salvando e exportando</h3>
 <ul>
 <li>Use <b>Salvar</b> para salvar seu trabalho</li>
-<li>Use <b>Exportar</b> para exportar como imagem PNG</li>
+<li>Use <b>Exportar</b> para exportar como imagem PNG, SVG ou PDF</li>
+<li>Pressione <b>Ctrl+Shift+F</b> para procurar em todos os projetos das pastas indexadas; clique duas vezes em um resultado para abrir o arquivo no nó encontrado</li>
 </ul>
 """
         
@@ -2905,13 +3573,17 @@ class AmareloMainWindow(QMainWindow):
         dialog.exec()
 
 
+profiler.end("import main")
+
+
   # ======================================================
   # MAIN
   # ======================================================
   # MAIN
   # ======================================================
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    with profiler.span("QApplication"):
+        app = QApplication(sys.argv)
     
     # Estilo global e configuração
     app.setStyle("Fusion")
@@ -2926,7 +3598,9 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Aviso: Não foi possível registrar ícone .amind: {e}")
     
-    window = AmareloMainWindow()
+    with profiler.span("main window"):
+        window = AmareloMainWindow()
+    profiler.watch_first_paint(window)
     window.showMaximized()
     
     sys.exit(app.exec())
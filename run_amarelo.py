@@ -22,12 +22,15 @@ if base_dir not in sys.path:
 icons_dir = os.path.join(base_dir, "assets", "icons")
 os.environ["AMARELO_ICON_PATH"] = icons_dir
 
+from core.diagnostics import profiler
+
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QIcon
 
 import main
 
-app = QApplication.instance() or QApplication(sys.argv)
+with profiler.span("QApplication"):
+    app = QApplication.instance() or QApplication(sys.argv)
 
 app.setApplicationName("AmareloMind")
 app.setApplicationDisplayName("Amarelo Mind")
@@ -42,11 +45,13 @@ if len(sys.argv) > 1:
     if file_path.endswith('.amind') and os.path.exists(file_path):
         file_to_load = file_path
 
-window = main.AmareloMainWindow()
+with profiler.span("main window"):
+    window = main.AmareloMainWindow()
 
 if file_to_load:
     window.load_file(file_to_load)
 
+profiler.watch_first_paint(window)
 window.showMaximized()
 
 sys.exit(app.exec())
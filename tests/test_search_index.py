@@ -0,0 +1,48 @@
+"""
+Busca incremental do SearchIndex: digitar a consulta letra a letra deve
+dar o mesmo resultado que a consulta feita de uma vez em um índice novo.
+"""
+from core.search_index import SearchIndex
+
+
+class FakeNode:
+    def __init__(self, text):
+        self.text = text
+
+    def get_text(self):
+        return self.text
+
+
+def _index(texts):
+    index = SearchIndex()
+    for text in texts:
+        index.add(FakeNode(text))
+    return index
+
+
+def _texts(nodes):
+    return sorted(node.text for node in nodes)
+
+
+def _assert_incremental(texts, queries):
+    typed = _index(texts)
+    for query in queries:
+        assert _texts(typed.search(query)) == _texts(_index(texts).search(query)), query
+
+
+def test_phrase_typed_letter_by_letter():
+    texts = ["mapa casa verde", "mapa azul", "casa"]
+    query = '"mapa casa"'
+    _assert_incremental(texts, [query[:i] for i in range(1, len(query) + 1)])
+    assert _texts(_index(texts).search(query)) == ["mapa casa verde"]
+
+
+def test_fuzzy_term_after_empty_result():
+    texts = ["cão cor", "cão cur", "cão bar", "carro"]
+    typed = _index(texts)
+    assert typed.search("cão car") == []
+    assert _texts(typed.search("cão car~")) == ["cão bar", "cão cor", "cão cur"]
+
+
+def test_fuzzy_fallback_after_prefix_narrowing():
+    _assert_incremental(["max", "mapa"], ["ma", "map", "mapx"])